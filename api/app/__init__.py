@@ -0,0 +1,4 @@
+import time
+
+# Start of app imports, the origin of the startup timings in app.startup
+IMPORT_STARTED = time.perf_counter()
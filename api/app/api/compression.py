@@ -0,0 +1,205 @@
+import gzip
+import importlib.util
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional
+
+from fastapi import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.compression_config import CompressionConfig, compression_config
+from app.metrics import stage_timer
+from app.services.lru_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+GZIP = "gzip"
+BROTLI = "br"
+ZSTD = "zstd"
+
+
+def _gzip(content: bytes, config: CompressionConfig) -> bytes:
+    # A fixed mtime keeps the output, and so cached bodies, deterministic
+    return gzip.compress(content, compresslevel=config.gzip_level, mtime=0)
+
+
+def _brotli(content: bytes, config: CompressionConfig) -> bytes:
+    import brotli
+
+    return brotli.compress(content, quality=config.brotli_quality)
+
+
+def _zstd(content: bytes, config: CompressionConfig) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=config.zstd_level).compress(content)
+
+
+_COMPRESSORS: Dict[str, Callable[[bytes, CompressionConfig], bytes]] = {
+    GZIP: _gzip,
+    BROTLI: _brotli,
+    ZSTD: _zstd,
+}
+
+# Optional packages the encodings need
+_MODULES = {BROTLI: "brotli", ZSTD: "zstandard"}
+
+
+@lru_cache(maxsize=None)
+def available(encoding: str) -> bool:
+    """Whether this server can produce an encoding"""
+    if encoding not in _COMPRESSORS:
+        return False
+    module = _MODULES.get(encoding)
+    if module is None or importlib.util.find_spec(module) is not None:
+        return True
+    logger.warning(
+        "%s is not installed (the compression extra), %s responses disabled",
+        module,
+        encoding,
+    )
+    return False
+
+
+def _weights(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def negotiate_encoding(
+    accept_encoding: Optional[str], config: CompressionConfig = compression_config
+) -> Optional[str]:
+    """
+    The Content-Encoding to send for an Accept-Encoding header, or None
+
+    Picks the available encoding the client weights highest, breaking ties by
+    the configured order; None means the body is sent as is.
+    """
+    if not accept_encoding:
+        return None
+    weights = _weights(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in config.encodings:
+        if not available(encoding):
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(
+    content: bytes, encoding: str, config: CompressionConfig = compression_config
+) -> bytes:
+    with stage_timer("compression"):
+        return _COMPRESSORS[encoding](content, config)
+
+
+class EncodedBody(NamedTuple):
+    """A response body as sent, and its Content-Encoding (None if identity)"""
+
+    content: bytes
+    encoding: Optional[str]
+
+
+def encode_body(
+    content: bytes,
+    encoding: Optional[str],
+    config: CompressionConfig = compression_config,
+) -> EncodedBody:
+    """Compress a body unless it is too small to be worth it"""
+    if encoding is None or len(content) < config.minimum_size:
+        return EncodedBody(content, None)
+    return EncodedBody(compress(content, encoding, config), encoding)
+
+
+def encoded_response(
+    body: EncodedBody, media_type: str, headers: Dict[str, str]
+) -> Response:
+    if body.encoding is not None:
+        headers = {**headers, "Content-Encoding": body.encoding}
+    return Response(content=body.content, media_type=media_type, headers=headers)
+
+
+# Encoded /api/stocks bodies by ETag, so repeat requests skip encoding and
+# compression; ETags are content hashes, so entries never go out of date
+encoded_bodies = TTLCache(
+    max_entries=compression_config.cache_max_entries, ttl=compression_config.cache_ttl
+)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses in the encoding the client prefers
+
+    Only whole bodies are compressed: streamed responses (server-sent events,
+    NDJSON) pass through so each chunk still reaches the client as soon as it
+    is produced, as do responses that set their own Content-Encoding. ETags
+    of compressed responses become weak, since the bytes differ from the
+    identity response they describe.
+    """
+
+    def __init__(self, app: ASGIApp, config: CompressionConfig = compression_config):
+        self.app = app
+        self.config = config
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding"), self.config
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            pending, start = start, None
+            headers = MutableHeaders(raw=pending["headers"])
+            body = message.get("body", b"")
+            if message.get("more_body") or "content-encoding" in headers:
+                await send(pending)
+                await send(message)
+                return
+
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.config.minimum_size:
+                body = compress(body, encoding, self.config)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+            await send(pending)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,106 @@
+from typing import Callable, List, Optional
+
+import pandas as pd
+from fastapi import HTTPException, Response
+
+from app.metrics import stage_timer
+from app.services.serialization import (
+    FORECAST_COLUMNS,
+    STOCK_COLUMNS,
+    UnsupportedFormatError,
+    forecast_frame_to_json,
+    frame_to_arrow,
+    frame_to_columnar_json,
+    frame_to_msgpack,
+    stock_frame_to_json,
+)
+
+JSON = "json"
+COLUMNAR = "columnar"
+ARROW = "arrow"
+MSGPACK = "msgpack"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    COLUMNAR: "application/json",
+    ARROW: "application/vnd.apache.arrow.stream",
+    MSGPACK: "application/msgpack",
+}
+
+# Binary formats can also be picked with the Accept header
+ACCEPT_FORMATS = {
+    "application/vnd.apache.arrow.stream": ARROW,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+}
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """Pick a response format from the format query parameter or Accept header"""
+    if requested:
+        requested = requested.lower()
+        if requested not in MEDIA_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format '{requested}'. "
+                f"Use one of: {', '.join(MEDIA_TYPES)}",
+            )
+        return requested
+
+    if accept:
+        for media_type in accept.split(","):
+            media_type = media_type.split(";")[0].strip().lower()
+            if media_type in ACCEPT_FORMATS:
+                return ACCEPT_FORMATS[media_type]
+
+    return JSON
+
+
+def _frame_response(
+    df: pd.DataFrame,
+    response_format: str,
+    columns: List[str],
+    date_column: str,
+    to_json: Callable[[pd.DataFrame], bytes],
+) -> Response:
+    try:
+        with stage_timer("response_encoding"):
+            if response_format == COLUMNAR:
+                content = frame_to_columnar_json(df, columns, date_column)
+            elif response_format == MSGPACK:
+                content = frame_to_msgpack(df, columns, date_column)
+            elif response_format == ARROW:
+                content = frame_to_arrow(df, columns)
+            else:
+                content = to_json(df)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    return Response(
+        content=content,
+        media_type=MEDIA_TYPES[response_format],
+        headers={"Vary": "Accept"},
+    )
+
+
+def stock_response(df: pd.DataFrame, response_format: str = JSON) -> Response:
+    """Encode an OHLCV frame in the negotiated format"""
+    return _frame_response(
+        df, response_format, STOCK_COLUMNS, "Date", stock_frame_to_json
+    )
+
+
+def forecast_response(
+    df: pd.DataFrame,
+    response_format: str = JSON,
+    columns: Optional[List[str]] = None,
+) -> Response:
+    """Encode a forecast frame in the negotiated format, optionally trimmed"""
+    columns = columns or FORECAST_COLUMNS
+    return _frame_response(
+        df,
+        response_format,
+        columns,
+        "ds",
+        lambda df: forecast_frame_to_json(df, columns),
+    )
@@ -0,0 +1,60 @@
+import hashlib
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config.cache_config import cache_config
+from app.services.segment_store import settled_before
+from app.services.yf_service import open_range_ttl
+
+
+def frame_etag(df: pd.DataFrame, variant: str) -> str:
+    """
+    Strong ETag for a frame encoded one way
+
+    Hashes the frame's column buffers rather than the encoded body, so it can
+    be checked before the response is serialized. variant names everything
+    else that shapes the body, e.g. the response format.
+    """
+    digest = hashlib.blake2b(variant.encode(), digest_size=16)
+    for col in df.columns:
+        digest.update(col.encode())
+        digest.update(np.ascontiguousarray(df[col].to_numpy()).tobytes())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names this ETag (weakly compared)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def stock_cache_control(
+    interval: str, end_unix: int, now: Optional[int] = None
+) -> str:
+    """
+    Cache-Control for bars up to end_unix
+
+    Once every bar in the range has settled the response only changes if the
+    data is corrected upstream, so it can be reused for CACHE_HTTP_MAX_AGE;
+    ranges reaching recent bars only for as long as the server caches them.
+    """
+    now = int(time.time()) if now is None else now
+    if end_unix <= settled_before(now):
+        return f"public, max-age={cache_config.http_max_age}"
+    return f"public, max-age={open_range_ttl(interval)}"
+
+
+def cache_headers(etag: str, cache_control: str) -> Dict[str, str]:
+    # Vary matches the negotiated response, so 304s carry it too
+    return {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept, Accept-Encoding",
+    }
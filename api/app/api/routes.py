@@ -1,11 +1,51 @@
-import time
-from typing import List, Optional
+import json
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Query
+import pandas as pd
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+import app.services.downsample as downsample
 import app.services.forecast_service as forecast_service
 import app.services.yf_service as yf_service
+from app.api.compression import (
+    encode_body,
+    encoded_bodies,
+    encoded_response,
+    negotiate_encoding,
+)
+from app.api.formats import (
+    MEDIA_TYPES,
+    forecast_response,
+    negotiate_format,
+    stock_response,
+)
+from app.api.http_cache import (
+    cache_headers,
+    etag_matches,
+    frame_etag,
+    stock_cache_control,
+)
+from app.config.forecast_config import forecast_config
+from app.config.yf_config import yf_config
+from app.metrics import stage_timer
+from app.services.forecast_engine import ForecastQueueFullError, ForecastTimeoutError
+from app.services.forecast_jobs import (
+    DONE,
+    FAILED,
+    PING,
+    ForecastJob,
+    forecast_jobs,
+)
+from app.services.serialization import (
+    FORECAST_COLUMNS,
+    forecast_frame_to_json,
+    stock_frames_to_json,
+    stock_rows_to_frame,
+)
+from app.startup import startup_timer
 from app.types.forecast_data import ForecastRow
 from app.types.stock_data import StockDataRow
 
@@ -15,6 +55,144 @@ router = APIRouter()
 class ForecastRequest(BaseModel):
     stock_data: List[StockDataRow]
     days: Optional[int] = 30
+    model: Optional[str] = forecast_service.PROPHET
+
+
+class ForecastBatchRequest(BaseModel):
+    # Tickers whose history is fetched server-side, between the dates below
+    tickers: List[str] = []
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    interval: Optional[str] = "1d"
+    # Uploaded series by name, for data the server cannot fetch
+    series: Dict[str, List[StockDataRow]] = {}
+    days: Optional[int] = 30
+    model: Optional[str] = forecast_service.PROPHET
+    future_only: bool = False
+    fields: Optional[List[str]] = None
+
+
+class StockBatchRequest(BaseModel):
+    tickers: List[str]
+    start_date: str
+    end_date: str
+    interval: Optional[str] = "1d"
+
+
+MODEL_DESCRIPTION = (
+    "Forecasting engine: prophet (default) or linear, a least-squares trend "
+    "with weekly seasonality that answers in milliseconds"
+)
+
+MAX_POINTS_DESCRIPTION = (
+    "Return at most this many rows, downsampled for charting (at least 3)"
+)
+
+FUTURE_ONLY_DESCRIPTION = (
+    "Return only the forecast horizon, not the rows fitted to the history"
+)
+
+FIELDS_DESCRIPTION = (
+    "Comma-separated ForecastRow fields to return, e.g. yhat,yhat_lower,"
+    "yhat_upper; ds is always included"
+)
+
+RESAMPLE_DESCRIPTION = (
+    "How max_points is met: lttb (default) keeps the bars that best trace the "
+    "close line, ohlc merges consecutive bars into coarser OHLCV bars"
+)
+
+FORMAT_DESCRIPTION = (
+    "Response format: json (default), columnar, arrow or msgpack. "
+    "arrow and msgpack can also be requested via the Accept header"
+)
+
+
+def _check_model(model: Optional[str]) -> str:
+    model = model or forecast_service.PROPHET
+    try:
+        forecast_service.check_model(model)
+    except forecast_service.UnknownModelError as e:
+        raise _forecast_error(e)
+    return model
+
+
+def _check_max_points(max_points: Optional[int]) -> None:
+    if max_points is not None and max_points < 3:
+        raise HTTPException(status_code=400, detail="max_points must be at least 3")
+
+
+def _check_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """ForecastRow columns to return, in their usual order; None for all"""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields if field.strip()}
+    unknown = sorted(requested - set(FORECAST_COLUMNS))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown forecast fields: {', '.join(unknown)}. "
+            f"Use any of: {', '.join(FORECAST_COLUMNS)}",
+        )
+    return [col for col in FORECAST_COLUMNS if col == "ds" or col in requested]
+
+
+def _check_resample(resample: Optional[str]) -> str:
+    resample = (resample or downsample.LTTB).lower()
+    if resample not in downsample.RESAMPLE_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown resample method '{resample}'. "
+            f"Use one of: {', '.join(downsample.RESAMPLE_METHODS)}",
+        )
+    return resample
+
+
+def _queue_full(e: ForecastQueueFullError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(forecast_config.retry_after)},
+    )
+
+
+async def _run_forecast(
+    stock_data_df: pd.DataFrame,
+    days: int,
+    response_format: str,
+    series_id: Optional[str] = None,
+    model: str = forecast_service.PROPHET,
+    max_points: Optional[int] = None,
+    future_only: bool = False,
+    columns: Optional[List[str]] = None,
+) -> Response:
+    """Forecast on the engine, mapping engine errors to HTTP responses"""
+    try:
+        forecast = await forecast_service.forecast_frame_async(
+            stock_data_df,
+            days,
+            series_id=series_id,
+            model=model,
+            future_only=future_only,
+        )
+        if max_points is not None:
+            forecast = downsample.downsample_forecast_frame(forecast, max_points)
+        return forecast_response(forecast, response_format, columns)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _forecast_error(e)
+
+
+def _forecast_error(e: Exception) -> HTTPException:
+    """The HTTP error reported for a failed forecast"""
+    if isinstance(e, forecast_service.UnknownModelError):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, ForecastQueueFullError):
+        return _queue_full(e)
+    if isinstance(e, ForecastTimeoutError):
+        return HTTPException(status_code=504, detail=str(e))
+    return HTTPException(status_code=500, detail=f"Forecasting failed: {str(e)}")
 
 
 @router.get("/health")
@@ -22,33 +200,368 @@ async def health():
     return {"status": "ok"}
 
 
-@router.get("/stocks")
+@router.get("/ready")
+async def ready() -> Response:
+    """Readiness probe: 503 until startup has finished, then startup timings"""
+    if startup_timer.ready:
+        return JSONResponse({"status": "ready", **startup_timer.info()})
+    return JSONResponse({"status": "starting", **startup_timer.info()}, status_code=503)
+
+
+@router.get("/stocks", response_model=List[StockDataRow])
 async def stocks(
     ticker: str = Query(..., description="Ticker symbol"),
     start_date: str = Query(..., description="Start date of data (YYYY-MM-DD)"),
     end_date: str = Query(..., description="End date of data (YYYY-MM-DD)"),
     interval: Optional[str] = Query("1d", description="Interval"),
-) -> List[StockDataRow]:
-    start_unix = int(time.mktime(time.strptime(start_date, "%Y-%m-%d")))
-    end_unix = int(time.mktime(time.strptime(end_date, "%Y-%m-%d")))
+    max_points: Optional[int] = Query(None, description=MAX_POINTS_DESCRIPTION),
+    resample: Optional[str] = Query(None, description=RESAMPLE_DESCRIPTION),
+    response_format: Optional[str] = Query(
+        None, alias="format", description=FORMAT_DESCRIPTION
+    ),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """
+    OHLCV bars for a ticker
+
+    Responses carry a strong ETag of their bars and a Cache-Control lifetime
+    that depends on whether the range has settled. A matching If-None-Match
+    gets a 304 without the body being encoded. Bodies are compressed here
+    rather than by the middleware and kept by ETag, so repeat requests for
+    the same bars are served without encoding or compressing them again.
+    """
+    response_format = negotiate_format(response_format, accept)
+    _check_max_points(max_points)
+    resample = _check_resample(resample)
+    start_unix, end_unix = yf_service.date_range_to_unix(start_date, end_date)
 
-    result = yf_service.download_hist(ticker, start_unix, end_unix, interval)
+    result = await yf_service.download_frame_async(
+        ticker, start_unix, end_unix, interval
+    )
 
     if len(result) == 0:
         raise HTTPException(status_code=204, detail="No data found")
 
-    return result
+    if max_points is not None:
+        result = downsample.downsample_stock_frame(result, max_points, resample)
+
+    encoding = negotiate_encoding(accept_encoding)
+    variant = f"{response_format}:{max_points}:{resample}:{encoding}"
+    headers = cache_headers(
+        frame_etag(result, variant), stock_cache_control(interval or "1d", end_unix)
+    )
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    body = encoded_bodies.get(headers["ETag"])
+    if body is None:
+        body = encode_body(stock_response(result, response_format).body, encoding)
+        encoded_bodies.set(headers["ETag"], body)
+    return encoded_response(body, MEDIA_TYPES[response_format], headers)
+
+
+@router.post("/stocks/batch", response_model=Dict[str, List[StockDataRow]])
+async def stocks_batch(request: StockBatchRequest) -> Response:
+    """Fetch several tickers at once; tickers without data map to an empty list"""
+    if len(request.tickers) == 0:
+        raise HTTPException(status_code=400, detail="Tickers cannot be empty")
+    if len(request.tickers) > yf_config.batch_max_tickers:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {yf_config.batch_max_tickers} tickers per request",
+        )
+    start_unix, end_unix = yf_service.date_range_to_unix(
+        request.start_date, request.end_date
+    )
+
+    frames = await yf_service.download_frames_async(
+        request.tickers, start_unix, end_unix, request.interval
+    )
+
+    with stage_timer("response_encoding"):
+        content = stock_frames_to_json(frames)
+    return Response(content=content, media_type="application/json")
+
 
+@router.post("/forecast", response_model=List[ForecastRow])
+async def forecast(
+    request: ForecastRequest,
+    max_points: Optional[int] = Query(None, description=MAX_POINTS_DESCRIPTION),
+    future_only: bool = Query(False, description=FUTURE_ONLY_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    response_format: Optional[str] = Query(
+        None, alias="format", description=FORMAT_DESCRIPTION
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
+    response_format = negotiate_format(response_format, accept)
+    model = _check_model(request.model)
+    _check_max_points(max_points)
+    columns = _check_fields(fields.split(",") if fields else None)
+    if len(request.stock_data) == 0:
+        raise HTTPException(status_code=400, detail="Stock data cannot be empty")
+
+    return await _run_forecast(
+        stock_rows_to_frame(request.stock_data),
+        request.days or 30,
+        response_format,
+        model=model,
+        max_points=max_points,
+        future_only=future_only,
+        columns=columns,
+    )
+
+
+@router.get("/forecast/{ticker}", response_model=List[ForecastRow])
+async def forecast_ticker(
+    ticker: str,
+    start_date: str = Query(..., description="Start date of data (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date of data (YYYY-MM-DD)"),
+    interval: Optional[str] = Query("1d", description="Interval"),
+    days: Optional[int] = Query(30, description="Days to forecast"),
+    model: Optional[str] = Query(
+        forecast_service.PROPHET, description=MODEL_DESCRIPTION
+    ),
+    max_points: Optional[int] = Query(None, description=MAX_POINTS_DESCRIPTION),
+    future_only: bool = Query(False, description=FUTURE_ONLY_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    response_format: Optional[str] = Query(
+        None, alias="format", description=FORMAT_DESCRIPTION
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
+    """Forecast a ticker's history server-side, without uploading the series"""
+    response_format = negotiate_format(response_format, accept)
+    model = _check_model(model)
+    _check_max_points(max_points)
+    columns = _check_fields(fields.split(",") if fields else None)
+    start_unix, end_unix = yf_service.date_range_to_unix(start_date, end_date)
+
+    stock_data = await yf_service.download_frame_async(
+        ticker, start_unix, end_unix, interval
+    )
+
+    if len(stock_data) == 0:
+        raise HTTPException(status_code=404, detail="No data found")
+
+    return await _run_forecast(
+        stock_data,
+        days or 30,
+        response_format,
+        series_id=f"{ticker}:{interval}",
+        model=model,
+        max_points=max_points,
+        future_only=future_only,
+        columns=columns,
+    )
 
-@router.post("/forecast")
-async def forecast(request: ForecastRequest) -> List[ForecastRow]:
+
+def _batch_line(
+    name: str, forecast: pd.DataFrame, columns: Optional[List[str]]
+) -> bytes:
+    """One NDJSON line with a series' forecast as a ForecastRow list"""
+    return (
+        b'{"ticker":'
+        + json.dumps(name).encode()
+        + b',"forecast":'
+        + forecast_frame_to_json(forecast, columns)
+        + b"}\n"
+    )
+
+
+def _batch_error(name: str, error: HTTPException) -> bytes:
+    """One NDJSON line reporting why a series has no forecast"""
+    line = {"ticker": name, "status": error.status_code, "error": error.detail}
+    return json.dumps(line).encode() + b"\n"
+
+
+async def _batch_lines(
+    request: ForecastBatchRequest,
+    model: str,
+    columns: Optional[List[str]],
+    date_range: Optional[Tuple[int, int]],
+) -> AsyncIterator[bytes]:
+    frames = {name: stock_rows_to_frame(rows) for name, rows in request.series.items()}
+    series_ids = {}
+    if request.tickers:
+        interval = request.interval or "1d"
+        start_unix, end_unix = date_range
+        batch_size = yf_config.batch_max_tickers
+        for i in range(0, len(request.tickers), batch_size):
+            tickers = request.tickers[i : i + batch_size]
+            try:
+                frames.update(
+                    await yf_service.download_frames_async(
+                        tickers, start_unix, end_unix, interval
+                    )
+                )
+            except Exception as e:
+                error = HTTPException(status_code=502, detail=f"Download failed: {e}")
+                for ticker in tickers:
+                    yield _batch_error(ticker, error)
+            else:
+                for ticker in tickers:
+                    series_ids[ticker] = f"{ticker}:{interval}"
+
+    for name in [name for name, frame in frames.items() if frame.empty]:
+        del frames[name]
+        yield _batch_error(name, HTTPException(status_code=404, detail="No data found"))
+
+    results = forecast_service.forecast_frames_async(
+        frames,
+        request.days or 30,
+        model=model,
+        series_ids=series_ids,
+        future_only=request.future_only,
+    )
+    async with aclosing(results):
+        async for name, result in results:
+            if isinstance(result, Exception):
+                yield _batch_error(name, _forecast_error(result))
+            else:
+                yield _batch_line(name, result, columns)
+
+
+@router.post("/forecast/batch")
+async def forecast_batch(request: ForecastBatchRequest) -> StreamingResponse:
+    """
+    Forecast many tickers or uploaded series, fitted in parallel on every core
+
+    Streams newline-delimited JSON with one line per series in the order they
+    finish: {"ticker", "forecast"} with a ForecastRow list, or {"ticker",
+    "status", "error"} when that series failed. A failing series never fails
+    the rest of the batch. Uploaded series names must not repeat a ticker.
+    """
+    model = _check_model(request.model)
+    columns = _check_fields(request.fields)
+    tickers = list(dict.fromkeys(request.tickers))
+    if not tickers and not request.series:
+        raise HTTPException(status_code=400, detail="Tickers or series are required")
+    if len(tickers) + len(request.series) > forecast_config.batch_max_series:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {forecast_config.batch_max_series} series per request",
+        )
+    clashes = sorted(set(tickers) & request.series.keys())
+    if clashes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Names used as both ticker and series: {', '.join(clashes)}",
+        )
+
+    # Validate everything before streaming; afterwards errors can only be lines
+    date_range = None
+    if tickers:
+        if not (request.start_date and request.end_date):
+            raise HTTPException(
+                status_code=400,
+                detail="start_date and end_date are required for tickers",
+            )
+        try:
+            date_range = yf_service.date_range_to_unix(
+                request.start_date, request.end_date
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="start_date and end_date must be YYYY-MM-DD"
+            )
+
+    request.tickers = tickers
+    return StreamingResponse(
+        _batch_lines(request, model, columns, date_range),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"},
+    )
+
+
+async def _get_job(job_id: str) -> ForecastJob:
+    job = await forecast_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Forecast job not found")
+    return job
+
+
+def _sse(event: str, data: Any) -> bytes:
+    """Encode one server-sent event; frames are sent as ForecastRow lists"""
+    if event == PING:
+        return b": ping\n\n"
+    if isinstance(data, pd.DataFrame):
+        payload = forecast_frame_to_json(data)
+    else:
+        payload = json.dumps(data).encode()
+    return b"event: " + event.encode() + b"\ndata: " + payload + b"\n\n"
+
+
+async def _job_events(job: ForecastJob) -> AsyncIterator[bytes]:
+    async for event, data in forecast_jobs.stream(
+        job, forecast_config.stream_chunk_rows, forecast_config.stream_poll_interval
+    ):
+        yield _sse(event, data)
+
+
+@router.post("/forecast/jobs", status_code=202)
+async def create_forecast_job(request: ForecastRequest) -> Response:
+    """Start a forecast in the background; poll or stream it by job id"""
+    model = _check_model(request.model)
     if len(request.stock_data) == 0:
         raise HTTPException(status_code=400, detail="Stock data cannot be empty")
 
     try:
-        forecast_result = forecast_service.forecast_stock_data(
-            stock_data=request.stock_data, days=request.days or 30
+        job = await forecast_jobs.submit(
+            stock_rows_to_frame(request.stock_data), request.days or 30, model=model
         )
-        return forecast_result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Forecasting failed: {str(e)}")
+    except ForecastQueueFullError as e:
+        raise _queue_full(e)
+
+    return JSONResponse(
+        job.info(),
+        status_code=202,
+        headers={"Location": f"/api/forecast/jobs/{job.id}"},
+    )
+
+
+@router.get("/forecast/jobs/{job_id}")
+async def forecast_job(job_id: str) -> Dict[str, Any]:
+    """A job's status: queued, running, done or failed"""
+    return (await _get_job(job_id)).info()
+
+
+@router.get("/forecast/jobs/{job_id}/result", response_model=List[ForecastRow])
+async def forecast_job_result(
+    job_id: str,
+    response_format: Optional[str] = Query(
+        None, alias="format", description=FORMAT_DESCRIPTION
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
+    """A finished job's forecast; 409 while it is still running"""
+    response_format = negotiate_format(response_format, accept)
+    job = await _get_job(job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Forecasting failed: {job.error}")
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail=f"Forecast job is {job.status}")
+
+    forecast = await forecast_jobs.result(job)
+    if forecast is None:
+        raise HTTPException(status_code=404, detail="Forecast result expired")
+    return forecast_response(forecast, response_format)
+
+
+@router.get("/forecast/jobs/{job_id}/stream")
+async def forecast_job_stream(job_id: str) -> StreamingResponse:
+    """
+    Server-sent events for a job: status changes, then the forecast in chunks
+
+    history events carry the rows fitted to the input series and forecast
+    events the future rows, each a ForecastRow list. A status event with the
+    final state ends the stream; failures end with an error event.
+    """
+    job = await _get_job(job_id)
+    return StreamingResponse(
+        _job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
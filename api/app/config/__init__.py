@@ -1,10 +1,52 @@
 # Config package
+from .cache_config import CacheConfig, cache_config
+from .compression_config import CompressionConfig, compression_config
 from .cors_config import cors_settings
-from .redis_config import RedisConfig, get_redis_client, redis_config
+from .forecast_config import ForecastConfig, forecast_config
+from .logging_config import LoggingConfig, configure_logging, logging_config
+from .redis_config import (
+    RedisCircuitBreaker,
+    RedisConfig,
+    close_async_redis_pool,
+    close_redis_pool,
+    get_async_redis_client,
+    get_redis_client,
+    init_async_redis_pool,
+    init_redis_pool,
+    redis_breaker,
+    redis_config,
+    redis_health_monitor,
+)
+from .startup_config import StartupConfig, startup_config
+from .watchlist_config import WatchlistConfig, watchlist_config
+from .yf_config import YFConfig, yf_config
 
 __all__ = [
+    "CacheConfig",
+    "cache_config",
+    "CompressionConfig",
+    "compression_config",
     "cors_settings",
+    "ForecastConfig",
+    "forecast_config",
+    "LoggingConfig",
+    "configure_logging",
+    "logging_config",
+    "RedisCircuitBreaker",
     "RedisConfig",
+    "close_async_redis_pool",
+    "close_redis_pool",
+    "get_async_redis_client",
     "get_redis_client",
+    "init_async_redis_pool",
+    "init_redis_pool",
+    "redis_breaker",
     "redis_config",
+    "redis_health_monitor",
+    "StartupConfig",
+    "startup_config",
+    "WatchlistConfig",
+    "watchlist_config",
+    "YFConfig",
+    "yf_config",
 ]
@@ -0,0 +1,40 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class CacheConfig:
+    """Stock data cache settings"""
+
+    def __init__(self):
+        # none, zlib, zstd (compression extra) or lz4 (lz4 extra)
+        self.compression = os.getenv("CACHE_COMPRESSION", "zlib").lower()
+        self.compression_level = int(os.getenv("CACHE_COMPRESSION_LEVEL", "3"))
+        # Stored segments expire only if a series goes unused this long; bars
+        # in ranges that had closed when fetched never go stale
+        self.segment_ttl = int(os.getenv("CACHE_SEGMENT_TTL", str(30 * 86400)))
+        # Bars that could still change are refreshed after about one bar
+        # interval, clamped to these bounds (seconds)
+        self.open_ttl_min = int(os.getenv("CACHE_OPEN_TTL_MIN", "60"))
+        self.open_ttl_max = int(os.getenv("CACHE_OPEN_TTL_MAX", "3600"))
+        # Stale bars are served while a background refresh runs, unless they
+        # are older than this, in which case the request waits for fresh data
+        self.max_stale = int(os.getenv("CACHE_MAX_STALE", "86400"))
+        # Parquet tier beneath Redis (needs pyarrow); empty disables it
+        self.disk_path = os.getenv("CACHE_DISK_PATH", "data/bars")
+        # Part files per series before they are compacted into one
+        self.disk_compact_parts = int(os.getenv("CACHE_DISK_COMPACT_PARTS", "16"))
+        # Cross-worker lock taken while one worker fills a cache miss; others
+        # wait up to the lease for it instead of fetching the same data
+        self.lock_lease = float(os.getenv("CACHE_LOCK_LEASE", "30"))
+        self.lock_poll_interval = float(os.getenv("CACHE_LOCK_POLL_INTERVAL", "0.1"))
+        # Seconds browsers and CDNs may reuse /api/stocks responses whose bars
+        # have all settled; ranges with recent bars use the open-bar TTL
+        self.http_max_age = int(os.getenv("CACHE_HTTP_MAX_AGE", "86400"))
+
+
+# Global cache configuration instance
+cache_config = CacheConfig()
@@ -0,0 +1,32 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class CompressionConfig:
+    """HTTP response compression settings"""
+
+    def __init__(self):
+        # Encodings offered, most preferred first, for clients that accept
+        # several equally; br needs brotli and zstd needs zstandard installed
+        encodings = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+        self.encodings = [
+            encoding.strip().lower()
+            for encoding in encodings.split(",")
+            if encoding.strip()
+        ]
+        # Bodies smaller than this (bytes) are sent uncompressed
+        self.minimum_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+        self.zstd_level = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+        # Encoded /api/stocks bodies kept in-process by ETag, and for how long
+        self.cache_max_entries = int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", "256"))
+        self.cache_ttl = float(os.getenv("COMPRESSION_CACHE_TTL", "3600"))
+
+
+# Global compression configuration instance
+compression_config = CompressionConfig()
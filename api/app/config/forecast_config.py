@@ -0,0 +1,46 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class ForecastConfig:
+    """Forecasting engine settings"""
+
+    def __init__(self):
+        # Worker processes fitting models; defaults to one per core
+        self.workers = int(os.getenv("FORECAST_WORKERS", str(os.cpu_count() or 1)))
+        # Jobs allowed to wait for a free worker before requests are rejected
+        self.max_queue = int(os.getenv("FORECAST_MAX_QUEUE", "16"))
+        # Seconds a request waits for its fit before giving up
+        self.job_timeout = float(os.getenv("FORECAST_JOB_TIMEOUT", "120"))
+        # Seconds clients are told to wait when the queue is full
+        self.retry_after = int(os.getenv("FORECAST_RETRY_AFTER", "5"))
+        # "spawn" keeps workers clear of the parent's threads and sockets
+        self.start_method = os.getenv("FORECAST_START_METHOD", "spawn")
+        # Seconds a cached forecast stays valid, in Redis and in-process
+        self.cache_ttl = float(os.getenv("FORECAST_CACHE_TTL", "21600"))
+        # Forecasts kept in the in-process LRU in front of Redis
+        self.cache_max_entries = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "256"))
+        # Start fits for a known ticker from its last fitted parameters
+        self.warm_start = os.getenv("FORECAST_WARM_START", "true").lower() == "true"
+        # Seconds a fitted model is kept for warm starts
+        self.model_ttl = int(os.getenv("FORECAST_MODEL_TTL", str(7 * 86400)))
+        # Series accepted by a single /api/forecast/batch request
+        self.batch_max_series = int(os.getenv("FORECAST_BATCH_MAX_SERIES", "200"))
+        # Forecast jobs (/api/forecast/jobs) running at once in this process
+        self.max_jobs = int(os.getenv("FORECAST_MAX_JOBS", "64"))
+        # Seconds a job's status and result can be fetched after it finishes
+        self.job_ttl = int(os.getenv("FORECAST_JOB_TTL", "3600"))
+        # Rows per event when streaming a job's forecast
+        self.stream_chunk_rows = int(os.getenv("FORECAST_STREAM_CHUNK_ROWS", "250"))
+        # Seconds between status checks (and keep-alives) while streaming a job
+        self.stream_poll_interval = float(
+            os.getenv("FORECAST_STREAM_POLL_INTERVAL", "1")
+        )
+
+
+# Global forecast configuration instance
+forecast_config = ForecastConfig()
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+class LoggingConfig:
+    """Application log settings"""
+
+    def __init__(self):
+        self.level = os.getenv("LOG_LEVEL", "INFO").upper()
+        # "text" for key=value lines, "json" for one JSON object per line
+        self.format = os.getenv("LOG_FORMAT", "text").lower()
+
+
+def _fields(record: logging.LogRecord) -> Dict[str, Any]:
+    """Structured fields attached to a record with `extra`"""
+    return {
+        key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS
+    }
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with structured fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(f"{key}={value}" for key, value in _fields(record).items())
+        return f"{line} {fields}" if fields else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+# Global logging configuration instance
+logging_config = LoggingConfig()
+
+_handler: Optional[logging.Handler] = None
+
+
+def configure_logging(config: LoggingConfig = logging_config) -> None:
+    """Send the app's logs (the "app" logger tree) to stderr"""
+    global _handler
+    logger = logging.getLogger("app")
+    logger.setLevel(config.level)
+    if _handler is None:
+        _handler = logging.StreamHandler(sys.stderr)
+        logger.addHandler(_handler)
+    _handler.setFormatter(
+        JsonFormatter() if config.format == "json" else TextFormatter()
+    )
@@ -1,12 +1,19 @@
+import asyncio
+import logging
 import os
-from typing import Optional
+import threading
+import time
+from typing import Optional, Set
 
 import redis
+import redis.asyncio as aioredis
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class RedisConfig:
     """Redis configuration settings"""
@@ -15,9 +22,40 @@ class RedisConfig:
         self.host = os.getenv("REDIS_HOST", "localhost")
         self.port = int(os.getenv("REDIS_PORT", "6379"))
         self.db = int(os.getenv("REDIS_DB", "0"))
-        self.decode_responses = True
+        # Cached payloads are binary, so values come back as raw bytes
+        self.decode_responses = False
         self.socket_connect_timeout = 5
         self.socket_timeout = 5
+        self.max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+        self.health_check_interval = float(
+            os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "5")
+        )
+        self.failure_threshold = int(os.getenv("REDIS_FAILURE_THRESHOLD", "3"))
+        self.recovery_timeout = float(os.getenv("REDIS_RECOVERY_TIMEOUT", "30"))
+
+    def get_connection_pool(self) -> redis.ConnectionPool:
+        """Create a connection pool shared by every client in the process"""
+        return redis.ConnectionPool(
+            host=self.host,
+            port=self.port,
+            db=self.db,
+            decode_responses=self.decode_responses,
+            socket_connect_timeout=self.socket_connect_timeout,
+            socket_timeout=self.socket_timeout,
+            max_connections=self.max_connections,
+        )
+
+    def get_async_connection_pool(self) -> aioredis.ConnectionPool:
+        """Create an asyncio connection pool for use on the event loop"""
+        return aioredis.ConnectionPool(
+            host=self.host,
+            port=self.port,
+            db=self.db,
+            decode_responses=self.decode_responses,
+            socket_connect_timeout=self.socket_connect_timeout,
+            socket_timeout=self.socket_timeout,
+            max_connections=self.max_connections,
+        )
 
     def get_connection(self) -> redis.Redis:
         """Get Redis connection"""
@@ -31,17 +69,164 @@ class RedisConfig:
         )
 
 
+class RedisCircuitBreaker:
+    """
+    Tracks Redis availability so callers can skip the cache without paying
+    for a connect timeout on every request.
+
+    closed -> requests go through; consecutive failures open the breaker
+    open -> requests are skipped until recovery_timeout has elapsed
+    half_open -> a single trial request is let through to probe Redis
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.recovery_timeout
+            ):
+                self._state = self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a Redis call should be attempted right now"""
+        state = self.state
+        if state == self.HALF_OPEN:
+            # Let one trial through and re-open until its outcome is recorded
+            with self._lock:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            return True
+        return state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state != self.CLOSED or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
 # Global Redis configuration instance
 redis_config = RedisConfig()
 
+# Global circuit breaker shared by the request path and the health monitor
+redis_breaker = RedisCircuitBreaker(
+    failure_threshold=redis_config.failure_threshold,
+    recovery_timeout=redis_config.recovery_timeout,
+)
+
+_pool: Optional[redis.ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# asyncio pools are bound to the loop that created them
+_async_pool: Optional[aioredis.ConnectionPool] = None
+_async_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+# Disconnects of replaced pools still in flight, kept so they are not collected
+_pool_disconnects: Set[asyncio.Task] = set()
+
+
+def init_redis_pool() -> redis.ConnectionPool:
+    """Create the process-wide connection pool if it does not exist yet"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = redis_config.get_connection_pool()
+    return _pool
+
+
+def close_redis_pool() -> None:
+    """Disconnect and drop the process-wide connection pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.disconnect()
+            _pool = None
+
+
+def init_async_redis_pool() -> aioredis.ConnectionPool:
+    """Create the asyncio connection pool for the running event loop"""
+    global _async_pool, _async_pool_loop
+    loop = asyncio.get_running_loop()
+    if _async_pool is None or _async_pool_loop is not loop:
+        if _async_pool is not None:
+            # Close the old loop's connections rather than leaking them
+            task = loop.create_task(_disconnect_pool(_async_pool))
+            _pool_disconnects.add(task)
+            task.add_done_callback(_pool_disconnects.discard)
+        _async_pool = redis_config.get_async_connection_pool()
+        _async_pool_loop = loop
+    return _async_pool
+
+
+async def _disconnect_pool(pool: aioredis.ConnectionPool) -> None:
+    try:
+        await pool.disconnect()
+    except Exception as e:
+        # Connections bound to a closed loop cannot be closed cleanly
+        logger.debug("Error disconnecting replaced Redis pool: %s", e)
+
+
+async def close_async_redis_pool() -> None:
+    """Disconnect and drop the asyncio connection pool"""
+    global _async_pool, _async_pool_loop
+    if _async_pool is not None:
+        await _async_pool.disconnect()
+        _async_pool = None
+        _async_pool_loop = None
+
 
 def get_redis_client() -> Optional[redis.Redis]:
-    """Get Redis client with error handling"""
+    """Get a Redis client backed by the shared pool, or None while Redis is down"""
+    if not redis_breaker.allow_request():
+        return None
+    try:
+        return redis.Redis(connection_pool=init_redis_pool())
+    except Exception:
+        redis_breaker.record_failure()
+        return None
+
+
+def get_async_redis_client() -> Optional[aioredis.Redis]:
+    """Get an asyncio Redis client backed by the shared pool, or None while Redis is down"""
+    if not redis_breaker.allow_request():
+        return None
     try:
-        client = redis_config.get_connection()
-        # Test connection
-        client.ping()
-        return client
-    except (redis.ConnectionError, redis.TimeoutError, Exception):
-        # Return None if Redis is unavailable
+        return aioredis.Redis(connection_pool=init_async_redis_pool())
+    except Exception:
+        redis_breaker.record_failure()
         return None
+
+
+async def redis_health_monitor(interval: Optional[float] = None) -> None:
+    """Ping Redis periodically and feed the result into the circuit breaker"""
+    if interval is None:
+        interval = redis_config.health_check_interval
+
+    while True:
+        try:
+            client = aioredis.Redis(connection_pool=init_async_redis_pool())
+            await client.ping()
+            redis_breaker.record_success()
+        except Exception:
+            redis_breaker.record_failure()
+        await asyncio.sleep(interval)
@@ -0,0 +1,19 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class StartupConfig:
+    """Worker startup settings"""
+
+    def __init__(self):
+        # Import yfinance and Prophet and start every forecast worker before
+        # serving, instead of on the first request that needs them
+        self.preload = os.getenv("STARTUP_PRELOAD", "false").lower() == "true"
+
+
+# Global startup configuration instance
+startup_config = StartupConfig()
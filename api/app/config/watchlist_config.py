@@ -0,0 +1,32 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class WatchlistConfig:
+    """Forecast precomputation settings"""
+
+    def __init__(self):
+        # Comma-separated tickers, plus one per line in WATCHLIST_FILE if set
+        self.tickers = [
+            ticker.strip()
+            for ticker in os.getenv("WATCHLIST_TICKERS", "").split(",")
+            if ticker.strip()
+        ]
+        self.file = os.getenv("WATCHLIST_FILE", "")
+        self.interval = os.getenv("WATCHLIST_INTERVAL", "1d")
+        # History window ending today; 0 means since January 1 of last year, the
+        # app page's default range
+        self.lookback_days = int(os.getenv("WATCHLIST_LOOKBACK_DAYS", "0"))
+        self.forecast_days = int(os.getenv("WATCHLIST_FORECAST_DAYS", "30"))
+        # UTC time of day (HH:MM) to run inside the app; empty leaves it to cron
+        self.schedule = os.getenv("WATCHLIST_SCHEDULE", "")
+        # Precomputed forecasts stay cached until after the next nightly run
+        self.cache_ttl = int(os.getenv("WATCHLIST_CACHE_TTL", str(26 * 3600)))
+
+
+# Global watchlist configuration instance
+watchlist_config = WatchlistConfig()
@@ -0,0 +1,22 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class YFConfig:
+    """yfinance fetch settings"""
+
+    def __init__(self):
+        # Threads available for blocking yf.download calls
+        self.executor_workers = int(os.getenv("YF_EXECUTOR_WORKERS", "4"))
+        # Fetches allowed in flight at once; the rest wait on the event loop
+        self.max_concurrent_fetches = int(os.getenv("YF_MAX_CONCURRENT_FETCHES", "4"))
+        # Tickers accepted by a single /api/stocks/batch request
+        self.batch_max_tickers = int(os.getenv("YF_BATCH_MAX_TICKERS", "50"))
+
+
+# Global yfinance configuration instance
+yf_config = YFConfig()
@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import redis
+
+import app.services.forecast_service as forecast_service
+import app.services.yf_service as yf_service
+from app.config.redis_config import (
+    close_async_redis_pool,
+    get_async_redis_client,
+    init_async_redis_pool,
+)
+from app.config.logging_config import configure_logging
+from app.config.watchlist_config import WatchlistConfig, watchlist_config
+from app.config.yf_config import yf_config
+from app.services.forecast_engine import forecast_engine
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+NO_DATA = "no data"
+
+
+def watchlist_tickers(config: WatchlistConfig = watchlist_config) -> List[str]:
+    """Tickers from WATCHLIST_TICKERS and WATCHLIST_FILE, without duplicates"""
+    tickers = list(config.tickers)
+    if config.file:
+        with open(config.file) as f:
+            tickers.extend(line.split("#")[0].strip() for line in f)
+    return list(dict.fromkeys(ticker for ticker in tickers if ticker))
+
+
+def watchlist_dates(
+    lookback_days: int, today: Optional[date] = None
+) -> Tuple[str, str]:
+    """
+    Start and end dates of the history window, ending today
+
+    A lookback of 0 starts on January 1 of the previous year, the range the
+    app page requests by default, so precomputed forecasts match its keys.
+    """
+    today = today or date.today()
+    if lookback_days > 0:
+        start = today - timedelta(days=lookback_days)
+    else:
+        start = date(today.year - 1, 1, 1)
+    return start.isoformat(), today.isoformat()
+
+
+async def precompute_forecasts(
+    tickers: List[str],
+    start_date: str,
+    end_date: str,
+    interval: str = "1d",
+    days: int = 30,
+    cache_ttl: Optional[float] = None,
+) -> Dict[str, str]:
+    """
+    Refresh history for every ticker and store its forecast in the cache
+
+    History is fetched in batches through the stock cache, then forecasts run
+    on the forecast engine's worker processes in parallel. At most one job per
+    worker is queued at a time so interactive requests still get a slot.
+    Returns a status per ticker: "ok", "no data" or the failure.
+    """
+    start_unix, end_unix = yf_service.date_range_to_unix(start_date, end_date)
+
+    history = {}
+    batch_size = yf_config.batch_max_tickers
+    for i in range(0, len(tickers), batch_size):
+        history.update(
+            await yf_service.download_frames_async(
+                tickers[i : i + batch_size], start_unix, end_unix, interval
+            )
+        )
+
+    slots = asyncio.Semaphore(forecast_engine.workers)
+
+    async def forecast(ticker: str) -> str:
+        stock_data = history[ticker]
+        if stock_data.empty:
+            return NO_DATA
+        async with slots:
+            try:
+                await forecast_service.forecast_frame_async(
+                    stock_data,
+                    days,
+                    series_id=f"{ticker}:{interval}",
+                    cache_ttl=cache_ttl,
+                )
+            except Exception as e:
+                return f"failed: {e}"
+        return OK
+
+    statuses = await asyncio.gather(*(forecast(ticker) for ticker in history))
+    results = dict(zip(history, statuses))
+
+    done = sum(status == OK for status in statuses)
+    logger.info("Precomputed %d/%d forecasts", done, len(results))
+    for ticker, status in results.items():
+        if status != OK:
+            logger.warning("Not precomputed %s: %s", ticker, status)
+    return results
+
+
+async def run_watchlist(config: WatchlistConfig = watchlist_config) -> Dict[str, str]:
+    """Precompute forecasts for the configured watchlist"""
+    tickers = watchlist_tickers(config)
+    if not tickers:
+        logger.info("Watchlist is empty, nothing to precompute")
+        return {}
+
+    start_date, end_date = watchlist_dates(config.lookback_days)
+    return await precompute_forecasts(
+        tickers,
+        start_date,
+        end_date,
+        interval=config.interval,
+        days=config.forecast_days,
+        cache_ttl=config.cache_ttl,
+    )
+
+
+def seconds_until(schedule: str, now: datetime) -> float:
+    """Seconds from now until the next HH:MM (UTC)"""
+    hour, minute = (int(part) for part in schedule.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def _claim_run(run_date: date) -> bool:
+    """Whether this process should run today's precompute"""
+    redis_client = get_async_redis_client()
+    if redis_client is None:
+        return True
+    try:
+        # The first worker to claim the date runs it; the marker outlives the day
+        return bool(
+            await redis_client.set(
+                f"watchlist_run:{run_date.isoformat()}", 1, nx=True, ex=2 * 86400
+            )
+        )
+    except redis.RedisError as e:
+        logger.warning("Watchlist claim error: %s", e)
+        return True
+
+
+async def watchlist_scheduler(config: WatchlistConfig = watchlist_config) -> None:
+    """Run the watchlist precompute every day at config.schedule (UTC)"""
+    while True:
+        await asyncio.sleep(seconds_until(config.schedule, datetime.now(timezone.utc)))
+        if not await _claim_run(datetime.now(timezone.utc).date()):
+            continue
+        try:
+            await run_watchlist(config)
+        except Exception as e:
+            logger.exception("Watchlist precompute failed: %s", e)
+
+
+async def _run_once(config: WatchlistConfig) -> Dict[str, str]:
+    init_async_redis_pool()
+    forecast_engine.start()
+    try:
+        return await run_watchlist(config)
+    finally:
+        forecast_engine.shutdown()
+        yf_service.cancel_refreshes()
+        yf_service.shutdown_executor()
+        await close_async_redis_pool()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Precompute forecasts for a watchlist of tickers"
+    )
+    parser.add_argument(
+        "tickers", nargs="*", help="Tickers (default: WATCHLIST_TICKERS/FILE)"
+    )
+    parser.add_argument("--file", help="File with one ticker per line")
+    parser.add_argument("--interval", default=watchlist_config.interval)
+    parser.add_argument("--days", type=int, default=watchlist_config.forecast_days)
+    parser.add_argument(
+        "--lookback-days",
+        type=int,
+        default=watchlist_config.lookback_days,
+        help="Days of history to use; 0 means since January 1 of last year",
+    )
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    config = WatchlistConfig()
+    if args.tickers or args.file:
+        config.tickers = args.tickers
+        config.file = args.file or ""
+    config.interval = args.interval
+    config.forecast_days = args.days
+    config.lookback_days = args.lookback_days
+
+    results = asyncio.run(_run_once(config))
+    return 1 if any(status.startswith("failed") for status in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,72 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+import app.services.yf_service as yf_service
+from app.api.compression import CompressionMiddleware
 from app.api.routes import router
-from app.config import cors_settings
+from app.config import (
+    close_async_redis_pool,
+    close_redis_pool,
+    configure_logging,
+    cors_settings,
+    init_async_redis_pool,
+    init_redis_pool,
+    redis_health_monitor,
+    startup_config,
+    watchlist_config,
+)
+from app.jobs.precompute import watchlist_scheduler
+from app.services.disk_store import disk_store
+from app.services.forecast_engine import forecast_engine
+from app.services.forecast_jobs import forecast_jobs
+from app.startup import preload, startup_timer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared Redis pool, kept healthy by a background ping loop
+    init_redis_pool()
+    init_async_redis_pool()
+    health_task = asyncio.create_task(redis_health_monitor())
+    forecast_engine.start()
+    # Resolved now so a disk tier disabled for lack of pyarrow is logged at
+    # startup rather than on the first cache miss
+    disk_store.enabled
+    # Optional nightly precompute of watchlist forecasts
+    background_tasks = [health_task]
+    if watchlist_config.schedule:
+        background_tasks.append(asyncio.create_task(watchlist_scheduler()))
+    # Heavy libraries are imported on first use unless preloading is enabled
+    if startup_config.preload:
+        await preload(startup_timer)
+    startup_timer.mark_ready()
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    forecast_jobs.cancel_all()
+    forecast_engine.shutdown()
+    yf_service.cancel_refreshes()
+    yf_service.shutdown_executor()
+    await close_async_redis_pool()
+    close_redis_pool()
+
 
-app = FastAPI()
+configure_logging()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(CORSMiddleware, **cors_settings)
+# Compress whole (non-streamed) responses per Accept-Encoding
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(router, prefix="/api")
 
@@ -15,3 +74,12 @@ app.include_router(router, prefix="/api")
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+startup_timer.mark_imported()
@@ -0,0 +1,71 @@
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Stage latencies run from sub-millisecond cache reads to minute-long fits
+_STAGE_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Time spent in each stage of serving a request",
+    ["stage"],
+    buckets=_STAGE_BUCKETS,
+)
+
+STOCK_CACHE_REQUESTS = Counter(
+    "stock_cache_requests_total",
+    "Stock history lookups by interval and how they were served: hit (Redis), "
+    "disk (Parquet store), stale (served, refreshing in background) or miss",
+    ["interval", "result"],
+)
+
+FORECAST_CACHE_REQUESTS = Counter(
+    "forecast_cache_requests_total",
+    "Forecast cache lookups by result: local_hit, redis_hit or miss",
+    ["result"],
+)
+
+FORECAST_QUEUE_DEPTH = Gauge(
+    "forecast_queue_depth", "Forecast jobs running or waiting for a worker"
+)
+FORECAST_JOBS_ACTIVE = Gauge(
+    "forecast_jobs_active", "Background forecast jobs that have not finished"
+)
+STOCK_REFRESHES_RUNNING = Gauge(
+    "stock_refreshes_running", "Background refreshes of stale stock history"
+)
+STARTUP_IMPORT_SECONDS = Gauge(
+    "startup_import_seconds", "Seconds this process took to import the app"
+)
+STARTUP_READY_SECONDS = Gauge(
+    "startup_ready_seconds", "Seconds this process took to become ready to serve"
+)
+
+
+def stage_timer(stage: str):
+    """Context manager (or decorator) recording a block's duration for a stage"""
+    return STAGE_SECONDS.labels(stage=stage).time()
+
+
+def observe_stages(durations: Dict[str, float]) -> None:
+    """Record stage durations measured elsewhere, e.g. in a worker process"""
+    for stage, seconds in durations.items():
+        STAGE_SECONDS.labels(stage=stage).observe(seconds)
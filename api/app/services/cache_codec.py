@@ -0,0 +1,157 @@
+import logging
+import struct
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.serialization import PRICE_COLUMNS, STOCK_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Binary encoding for cached OHLCV frames, little-endian:
+#
+#   header   4s magic b"OHLC" | u8 version | u8 compression | u32 row count
+#            | u32 range count (version 2+)
+#   payload  int64 (start, end, fetched_at) triples for each covered range
+#            int64 dates (epoch seconds of the wall-clock time)
+#            float64 Open, High, Low, Close, Adj_Close
+#            int64 Volume
+#
+# Each column is stored contiguously and the payload is optionally compressed
+# as a whole, so decoding is a few np.frombuffer calls instead of parsing JSON
+# and validating every row. Version 1 payloads (no ranges) are still readable.
+MAGIC = b"OHLC"
+VERSION = 2
+
+_HEADER_V1 = struct.Struct("<4sBBI")
+_HEADER = struct.Struct("<4sBBII")
+
+# (start, end, fetched_at) in unix seconds, end exclusive
+Range = Tuple[int, int, int]
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+COMPRESSION_NAMES = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+    "lz4": COMPRESSION_LZ4,
+}
+
+
+class CacheFormatError(Exception):
+    """Raised when a cached payload is not in a format this version can read"""
+
+
+def _compress(payload: bytes, compression: int, level: int) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress(payload, level)
+    if compression == COMPRESSION_ZSTD:
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=level).compress(payload)
+    if compression == COMPRESSION_LZ4:
+        import lz4.frame
+
+        return lz4.frame.compress(payload, compression_level=level)
+    return payload
+
+
+def _decompress(payload: bytes, compression: int) -> bytes:
+    try:
+        if compression == COMPRESSION_NONE:
+            return payload
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(payload)
+        if compression == COMPRESSION_ZSTD:
+            import zstandard
+
+            return zstandard.ZstdDecompressor().decompress(payload)
+        if compression == COMPRESSION_LZ4:
+            import lz4.frame
+
+            return lz4.frame.decompress(payload)
+    except ImportError as e:
+        raise CacheFormatError(f"Compression codec unavailable: {e}")
+    raise CacheFormatError(f"Unknown compression {compression}")
+
+
+def resolve_compression(name: str) -> int:
+    """Map a configured codec name to its id, falling back to zlib if unavailable"""
+    compression = COMPRESSION_NAMES.get(name, COMPRESSION_ZLIB)
+    try:
+        if compression == COMPRESSION_ZSTD:
+            import zstandard  # noqa: F401
+        elif compression == COMPRESSION_LZ4:
+            import lz4.frame  # noqa: F401
+    except ImportError:
+        logger.warning("%s is not installed, compressing cache with zlib", name)
+        return COMPRESSION_ZLIB
+    return compression
+
+
+def encode_segment(
+    df: pd.DataFrame,
+    ranges: List[Range],
+    compression: int = COMPRESSION_ZLIB,
+    level: int = 3,
+) -> bytes:
+    """Pack a cleaned OHLCV frame and the ranges it covers into the cache format"""
+    bounds = np.asarray(ranges, dtype="<i8").reshape(-1)
+    dates = df["Date"].to_numpy(dtype="datetime64[s]").astype("<i8")
+    prices = df[PRICE_COLUMNS].to_numpy(dtype="<f8")
+    volume = df["Volume"].to_numpy(dtype="<i8")
+
+    payload = b"".join(
+        [
+            bounds.tobytes(),
+            dates.tobytes(),
+            prices.tobytes(order="F"),
+            volume.tobytes(),
+        ]
+    )
+    header = _HEADER.pack(MAGIC, VERSION, compression, len(df), len(ranges))
+    return header + _compress(payload, compression, level)
+
+
+def decode_segment(data: bytes) -> Tuple[pd.DataFrame, List[Range]]:
+    """Unpack the binary cache format into a cleaned OHLCV frame and its ranges"""
+    if len(data) < _HEADER_V1.size:
+        raise CacheFormatError("Payload too short")
+
+    magic, version, compression, rows = _HEADER_V1.unpack_from(data)
+    if magic != MAGIC:
+        raise CacheFormatError("Not an OHLCV cache payload")
+    if version == 1:
+        header_size, range_count = _HEADER_V1.size, 0
+    elif version == VERSION and len(data) >= _HEADER.size:
+        header_size, range_count = _HEADER.size, _HEADER.unpack_from(data)[4]
+    else:
+        raise CacheFormatError(f"Unsupported cache version {version}")
+
+    payload = _decompress(data[header_size:], compression)
+    if len(payload) != (range_count * 3 + rows * len(STOCK_COLUMNS)) * 8:
+        raise CacheFormatError("Payload size does not match row count")
+
+    bounds = np.frombuffer(payload, dtype="<i8", count=range_count * 3)
+    ranges = [tuple(r) for r in bounds.reshape(-1, 3).tolist()]
+
+    offset = range_count * 3 * 8
+    dates = np.frombuffer(payload, dtype="<i8", count=rows, offset=offset)
+    offset += rows * 8
+    prices = np.frombuffer(
+        payload, dtype="<f8", count=rows * len(PRICE_COLUMNS), offset=offset
+    ).reshape((rows, len(PRICE_COLUMNS)), order="F")
+    offset += rows * 8 * len(PRICE_COLUMNS)
+    volume = np.frombuffer(payload, dtype="<i8", count=rows, offset=offset)
+
+    df = pd.DataFrame(prices, columns=PRICE_COLUMNS)
+    df.insert(0, "Date", dates.astype("datetime64[s]"))
+    df["Volume"] = volume
+    return df, ranges
+
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import time
+from typing import List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from app.config.cache_config import cache_config
+from app.metrics import stage_timer
+from app.services.cache_codec import Range
+from app.services.segment_store import SeriesSegment
+from app.services.serialization import STOCK_COLUMNS, empty_stock_frame
+
+logger = logging.getLogger(__name__)
+
+# Parquet schema metadata key holding a file's covered ranges
+_RANGES_KEY = b"ranges"
+
+# Files are named by a zero-padded sequence number; a compacted file sorts
+# right after the part sharing its sequence number
+_SEQUENCE_DIGITS = 20
+_PART_SUFFIX = ".parquet"
+_COMPACTED_SUFFIX = "c.parquet"
+
+
+def _path_part(name: str) -> str:
+    """Escape a ticker or interval into a single path component"""
+    if not name:
+        raise ValueError("Empty name for a disk cache path")
+    part = quote(name, safe="")
+    # quote leaves dots alone, so "." and ".." would leave the series directory;
+    # escaping them cannot collide with a real name because "%" is quoted too
+    if not part.strip("."):
+        part = part.replace(".", "%2E")
+    return part
+
+
+def _write_parquet(path: str, data: pd.DataFrame, ranges: List[Range]) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(data[STOCK_COLUMNS], preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_RANGES_KEY] = json.dumps(ranges).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write next to the target and rename, so readers never see half a file
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_parquet(path: str) -> SeriesSegment:
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path, memory_map=True)
+    ranges = [tuple(r) for r in json.loads(table.schema.metadata[_RANGES_KEY])]
+    data = table.to_pandas() if table.num_rows else empty_stock_frame()
+    return SeriesSegment(data, ranges)
+
+
+class DiskStore:
+    """
+    Persistent Parquet tier for ticker/interval segments, beneath Redis
+
+    Each series is a directory of part files. Every download is appended as a
+    new part holding its bars and the range it covers, so writes never rewrite
+    history; loading replays the parts in order. Once a series has more than
+    compact_parts parts they are folded into one compacted file. Files are
+    memory-mapped on read.
+    """
+
+    def __init__(self, root: str, compact_parts: int = 16):
+        self.root = root
+        self.compact_parts = compact_parts
+        self._enabled: Optional[bool] = None
+
+    @classmethod
+    def from_config(cls) -> "DiskStore":
+        return cls(cache_config.disk_path, cache_config.disk_compact_parts)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a path is configured and pyarrow is installed"""
+        if self._enabled is None:
+            self._enabled = bool(self.root)
+            if self._enabled:
+                try:
+                    import pyarrow.parquet  # noqa: F401
+                except ImportError:
+                    logger.warning(
+                        "pyarrow is not installed (the arrow extra), "
+                        "disk cache disabled"
+                    )
+                    self._enabled = False
+        return self._enabled
+
+    def _series_dir(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, _path_part(ticker), _path_part(interval))
+
+    def _files(self, series_dir: str) -> List[str]:
+        try:
+            names = os.listdir(series_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.endswith(_PART_SUFFIX))
+
+    def load(self, ticker: str, interval: str) -> SeriesSegment:
+        """Rebuild a series from its compacted file and the parts written since"""
+        segment = SeriesSegment()
+        if not self.enabled:
+            return segment
+
+        series_dir = self._series_dir(ticker, interval)
+        with stage_timer("disk_load"):
+            for name in self._files(series_dir):
+                try:
+                    part = _read_parquet(os.path.join(series_dir, name))
+                except FileNotFoundError:
+                    # Removed by a concurrent compaction, which already includes it
+                    continue
+                if name.endswith(_COMPACTED_SUFFIX):
+                    segment = part
+                    continue
+                for start, end, fetched_at in part.ranges:
+                    segment.add(part.slice(start, end), start, end, fetched_at)
+        return segment
+
+    def append(
+        self,
+        ticker: str,
+        interval: str,
+        data: pd.DataFrame,
+        start: int,
+        end: int,
+        fetched_at: int,
+    ) -> None:
+        """
+        Store freshly downloaded bars for [start, end) as a new part
+
+        Empty frames are not stored: yfinance returns one when a download
+        fails, and a part would mark the range covered across restarts.
+        """
+        if not self.enabled or start >= end or data.empty:
+            return
+
+        series_dir = self._series_dir(ticker, interval)
+        os.makedirs(series_dir, exist_ok=True)
+        sequence = str(time.time_ns()).zfill(_SEQUENCE_DIGITS)
+        path = os.path.join(series_dir, f"{sequence}{_PART_SUFFIX}")
+        with stage_timer("disk_append"):
+            _write_parquet(path, data, [(start, end, fetched_at)])
+
+        if len(self._uncompacted(series_dir)) > self.compact_parts:
+            self.compact(ticker, interval)
+
+    def _uncompacted(self, series_dir: str) -> List[str]:
+        parts: List[str] = []
+        for name in self._files(series_dir):
+            if name.endswith(_COMPACTED_SUFFIX):
+                parts = []
+            else:
+                parts.append(name)
+        return parts
+
+    def compact(self, ticker: str, interval: str) -> None:
+        """Fold every file of a series into a single compacted file"""
+        if not self.enabled:
+            return
+
+        series_dir = self._series_dir(ticker, interval)
+        names = self._files(series_dir)
+        if len(names) < 2:
+            return
+
+        segment = self.load(ticker, interval)
+        compacted = f"{names[-1][:_SEQUENCE_DIGITS]}{_COMPACTED_SUFFIX}"
+        path = os.path.join(series_dir, compacted)
+        _write_parquet(path, segment.data, segment.ranges)
+
+        for name in names:
+            if name != compacted:
+                try:
+                    os.remove(os.path.join(series_dir, name))
+                except FileNotFoundError:
+                    pass
+
+
+# Global disk store shared by the sync and async download paths
+disk_store = DiskStore.from_config()
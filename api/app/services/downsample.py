@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from app.metrics import stage_timer
+
+# Ways of fitting a series into max_points rows
+LTTB = "lttb"
+OHLC = "ohlc"
+RESAMPLE_METHODS = (LTTB, OHLC)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Positions of the points Largest-Triangle-Three-Buckets keeps
+
+    The first and last points are always kept. The rest are split into
+    max_points - 2 equal buckets and from each the point forming the largest
+    triangle with the point kept before it and the average of the next bucket
+    is chosen, which preserves peaks and troughs a plain stride would drop.
+    """
+    length = len(x)
+    if max_points >= length:
+        return np.arange(length)
+    if max_points < 3:
+        return np.array([0, length - 1][:max_points])
+
+    # Bucket boundaries over the points between the first and the last
+    edges = np.linspace(1, length - 1, max_points - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # The last bucket looks ahead to the final point
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, length - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        # Twice the triangle area; the constant factor does not change argmax
+        areas = np.abs(
+            (ax - avg_x[bucket]) * (y[start:end] - ay)
+            - (ax - x[start:end]) * (avg_y[bucket] - ay)
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def _epoch(dates: pd.Series) -> np.ndarray:
+    return dates.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+
+
+def aggregate_bars(frame: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Merge runs of consecutive bars into at most max_points coarser bars
+
+    Each merged bar opens at its first bar's Open and Date, closes at its last
+    bar's Close, spans their High/Low extremes and sums their Volume, so the
+    result is a valid OHLCV series at a lower resolution.
+    """
+    length = len(frame)
+    if length <= max_points:
+        return frame
+
+    size = -(-length // max_points)
+    starts = np.arange(0, length, size)
+    ends = np.append(starts[1:], length) - 1
+    return pd.DataFrame(
+        {
+            "Date": frame["Date"].to_numpy()[starts],
+            "Open": frame["Open"].to_numpy()[starts],
+            "High": np.maximum.reduceat(frame["High"].to_numpy(), starts),
+            "Low": np.minimum.reduceat(frame["Low"].to_numpy(), starts),
+            "Close": frame["Close"].to_numpy()[ends],
+            "Adj_Close": frame["Adj_Close"].to_numpy()[ends],
+            "Volume": np.add.reduceat(frame["Volume"].to_numpy(), starts),
+        }
+    )
+
+
+@stage_timer("downsample")
+def downsample_stock_frame(
+    frame: pd.DataFrame, max_points: int, method: str = LTTB
+) -> pd.DataFrame:
+    """
+    An OHLCV frame of at most max_points rows, for charting
+
+    lttb keeps the original bars that best trace the Close line; ohlc merges
+    consecutive bars instead. The input is left untouched.
+    """
+    if len(frame) <= max_points:
+        return frame
+    if method == OHLC:
+        return aggregate_bars(frame, max_points)
+    kept = lttb_indices(_epoch(frame["Date"]), frame["Close"].to_numpy(), max_points)
+    return frame.iloc[kept].reset_index(drop=True)
+
+
+@stage_timer("downsample")
+def downsample_forecast_frame(frame: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """A forecast frame of at most max_points rows, chosen by LTTB on yhat"""
+    if len(frame) <= max_points:
+        return frame
+    kept = lttb_indices(_epoch(frame["ds"]), frame["yhat"].to_numpy(), max_points)
+    return frame.iloc[kept].reset_index(drop=True)
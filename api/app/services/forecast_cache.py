@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import redis
+
+from app.config.forecast_config import forecast_config
+from app.config.redis_config import get_async_redis_client, redis_breaker
+from app.metrics import FORECAST_CACHE_REQUESTS, stage_timer
+from app.services.lru_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# In-process front for the Redis forecast cache
+_local_cache = TTLCache(
+    max_entries=forecast_config.cache_max_entries, ttl=forecast_config.cache_ttl
+)
+
+
+def forecast_cache_key(
+    prophet_df: pd.DataFrame, days: int, params: Optional[Dict[str, Any]] = None
+) -> str:
+    """Generate a cache key from the series content and forecast parameters"""
+    digest = hashlib.sha256()
+    digest.update(prophet_df["ds"].to_numpy(dtype="datetime64[s]").tobytes())
+    digest.update(prophet_df["y"].to_numpy(dtype=np.float64).tobytes())
+    digest.update(
+        json.dumps({"days": days, "params": params or {}}, sort_keys=True).encode()
+    )
+    return f"forecast:{digest.hexdigest()}"
+
+
+def _encode_forecast(forecast: pd.DataFrame) -> str:
+    """Serialize a forecast frame column-wise, with ds as epoch seconds"""
+    columns = {col: forecast[col].tolist() for col in forecast.columns if col != "ds"}
+    ds = forecast["ds"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    columns["ds"] = ds.tolist()
+    return json.dumps(columns)
+
+
+def _decode_forecast(cached_data: bytes) -> pd.DataFrame:
+    columns = json.loads(cached_data)
+    columns["ds"] = pd.to_datetime(columns["ds"], unit="s")
+    forecast = pd.DataFrame(columns)
+    return forecast[["ds"] + [c for c in forecast.columns if c != "ds"]]
+
+
+async def get_cached_forecast(key: str) -> Optional[pd.DataFrame]:
+    """Look up a forecast in the local LRU, then in Redis"""
+    forecast = _local_cache.get(key)
+    if forecast is not None:
+        FORECAST_CACHE_REQUESTS.labels("local_hit").inc()
+        return forecast
+
+    forecast = await get_redis_forecast(key)
+    FORECAST_CACHE_REQUESTS.labels("miss" if forecast is None else "redis_hit").inc()
+    if forecast is not None:
+        _local_cache.set(key, forecast)
+    return forecast
+
+
+async def get_redis_forecast(key: str) -> Optional[pd.DataFrame]:
+    """Look up a forecast in Redis only, bypassing the local LRU"""
+    redis_client = get_async_redis_client()
+    if redis_client is None:
+        return None
+
+    try:
+        with stage_timer("redis_get"):
+            cached_data = await redis_client.get(key)
+        redis_breaker.record_success()
+    except redis.RedisError as e:
+        redis_breaker.record_failure()
+        logger.warning("Forecast cache read error: %s", e)
+        return None
+
+    if not cached_data:
+        return None
+
+    try:
+        return _decode_forecast(cached_data)
+    except Exception as e:
+        logger.warning("Forecast cache decode error: %s", e)
+        return None
+
+
+async def set_cached_forecast(
+    key: str, forecast: pd.DataFrame, ttl: Optional[float] = None
+) -> None:
+    """Store a forecast in the local LRU and in Redis, for ttl seconds if given"""
+    _local_cache.set(key, forecast)
+    await set_redis_forecast(key, forecast, ttl)
+
+
+async def set_redis_forecast(
+    key: str, forecast: pd.DataFrame, ttl: Optional[float] = None
+) -> None:
+    """Store a forecast in Redis only, for ttl seconds if given"""
+    redis_client = get_async_redis_client()
+    if redis_client is None:
+        return
+
+    try:
+        payload = _encode_forecast(forecast)
+        with stage_timer("redis_set"):
+            await redis_client.setex(
+                key, int(ttl or forecast_config.cache_ttl), payload
+            )
+    except redis.RedisError as e:
+        redis_breaker.record_failure()
+        logger.warning("Forecast cache write error: %s", e)
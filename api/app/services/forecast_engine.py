@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.config.forecast_config import ForecastConfig, forecast_config
+from app.metrics import FORECAST_QUEUE_DEPTH, stage_timer
+
+
+class ForecastQueueFullError(Exception):
+    """Raised when every worker is busy and the wait queue is at capacity"""
+
+
+class ForecastTimeoutError(Exception):
+    """Raised when a job does not finish within the configured timeout"""
+
+
+class ForecastEngine:
+    """
+    Runs CPU-bound model fits on a process pool so they never hold the event loop.
+
+    At most `workers + max_queue` jobs are admitted at once; anything beyond
+    that is rejected straight away so callers can shed load instead of piling
+    up requests behind a saturated pool.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        job_timeout: float,
+        start_method: str = "spawn",
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        # Jobs are released from the pool's management thread
+        self._pending_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: ForecastConfig) -> "ForecastEngine":
+        return cls(
+            workers=config.workers,
+            max_queue=config.max_queue,
+            job_timeout=config.job_timeout,
+            start_method=config.start_method,
+        )
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently running or waiting for a worker"""
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def start(self) -> None:
+        """Create the worker pool if it is not running yet"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+
+    async def warm_up(self, fn: Callable[[], Any]) -> None:
+        """Start every worker process and run fn once in each, e.g. to import"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        # Submitted together, so the pool spawns a worker for each call
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, fn) for _ in range(self.workers))
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, dropping queued jobs"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _release(self, _job: Optional[Future] = None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) in a worker process and await its result
+
+        fn and its arguments must be picklable. A timed-out job keeps running
+        in its worker until it finishes; only the caller stops waiting. It
+        stays counted against the capacity until then, so new jobs are not
+        admitted onto a worker that is still busy with it.
+        """
+        with self._pending_lock:
+            if self._pending >= self.capacity:
+                raise ForecastQueueFullError(
+                    f"Forecast queue is full ({self._pending} jobs pending)"
+                )
+            self._pending += 1
+
+        try:
+            self.start()
+            job = self._pool.submit(fn, *args)
+        except BaseException as e:
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self.shutdown()
+            raise
+        # Released when the worker is done with it (or it is cancelled before
+        # starting), not when the caller stops waiting
+        job.add_done_callback(self._release)
+
+        try:
+            with stage_timer("forecast_job"):
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(job), timeout=self.job_timeout
+                )
+        except asyncio.TimeoutError:
+            raise ForecastTimeoutError(
+                f"Forecast did not finish within {self.job_timeout:g} seconds"
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool for the next job
+            self.shutdown()
+            raise
+
+
+# Global forecasting engine, started in the app lifespan
+forecast_engine = ForecastEngine.from_config(forecast_config)
+FORECAST_QUEUE_DEPTH.set_function(lambda: forecast_engine.pending)
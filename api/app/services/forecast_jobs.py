@@ -0,0 +1,276 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import suppress
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import pandas as pd
+import redis
+
+import app.services.forecast_service as forecast_service
+from app.config.forecast_config import ForecastConfig, forecast_config
+from app.config.redis_config import get_async_redis_client, redis_breaker
+from app.metrics import FORECAST_JOBS_ACTIVE
+from app.services.forecast_cache import get_redis_forecast, set_redis_forecast
+from app.services.forecast_engine import ForecastQueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Stream events
+STATUS = "status"
+HISTORY = "history"
+FORECAST = "forecast"
+PING = "ping"
+ERROR = "error"
+
+
+def job_key(job_id: str) -> str:
+    """Redis key holding a job's status"""
+    return f"forecast_job:{job_id}"
+
+
+def result_key(job_id: str) -> str:
+    """Redis key holding a finished job's result"""
+    return f"forecast_job_result:{job_id}"
+
+
+class ForecastJob:
+    """Status of one background forecast, as reported to pollers and streams"""
+
+    def __init__(
+        self,
+        job_id: str,
+        days: int,
+        model: str,
+        status: str = QUEUED,
+        history_rows: Optional[int] = None,
+        error: Optional[str] = None,
+        created_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+    ):
+        self.id = job_id
+        self.days = days
+        self.model = model
+        self.status = status
+        # Rows of the forecast covering the input series; the rest are future
+        self.history_rows = history_rows
+        self.error = error
+        self.created_at = time.time() if created_at is None else created_at
+        self.finished_at = finished_at
+        self.result: Optional[pd.DataFrame] = None
+        self._finished = asyncio.Event()
+
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> "ForecastJob":
+        return cls(
+            info["job_id"],
+            info["days"],
+            info["model"],
+            status=info["status"],
+            history_rows=info["history_rows"],
+            error=info["error"],
+            created_at=info["created_at"],
+            finished_at=info["finished_at"],
+        )
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "model": self.model,
+            "days": self.days,
+            "history_rows": self.history_rows,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ForecastJobs:
+    """
+    Background forecasts that clients poll or stream instead of waiting on
+
+    Jobs run as tasks in the process that accepted them. Their status, and once
+    done their result, are mirrored to Redis for ttl seconds so any worker can
+    answer for them. At most max_jobs unfinished jobs run per process; beyond
+    that submissions are rejected like a full forecast queue.
+    """
+
+    def __init__(self, max_jobs: int, ttl: int):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: Dict[str, ForecastJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_config(cls, config: ForecastConfig) -> "ForecastJobs":
+        return cls(config.max_jobs, config.job_ttl)
+
+    @property
+    def active(self) -> int:
+        """Jobs accepted by this process that have not finished yet"""
+        return len(self._tasks)
+
+    async def submit(
+        self,
+        stock_data_df: pd.DataFrame,
+        days: int,
+        model: str = forecast_service.PROPHET,
+        series_id: Optional[str] = None,
+    ) -> ForecastJob:
+        """Start forecasting in the background and return the new job"""
+        if self.active >= self.max_jobs:
+            raise ForecastQueueFullError(
+                f"Too many forecast jobs ({self.active} running)"
+            )
+
+        self._prune()
+        job = ForecastJob(uuid.uuid4().hex, days, model)
+        self._jobs[job.id] = job
+        await self._save(job)
+
+        task = asyncio.create_task(self._run(job, stock_data_df, series_id))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    async def _run(
+        self, job: ForecastJob, stock_data_df: pd.DataFrame, series_id: Optional[str]
+    ) -> None:
+        job.status = RUNNING
+        await self._save(job)
+        try:
+            forecast = await forecast_service.forecast_frame_async(
+                stock_data_df, job.days, series_id=series_id, model=job.model
+            )
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        else:
+            job.result = forecast
+            job.history_rows = len(forecast) - job.days
+            # Only Redis: this worker keeps job.result, and results are read
+            # once, so they would only push reusable forecasts out of the LRU
+            await set_redis_forecast(result_key(job.id), forecast, ttl=self.ttl)
+            job.status = DONE
+        job.finished_at = time.time()
+        await self._save(job)
+        job._finished.set()
+
+    async def _save(self, job: ForecastJob) -> None:
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.setex(job_key(job.id), self.ttl, json.dumps(job.info()))
+        except redis.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning("Forecast job write error: %s", e)
+
+    def _prune(self) -> None:
+        """Forget local jobs that finished more than ttl seconds ago"""
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    async def get(self, job_id: str) -> Optional[ForecastJob]:
+        """Look up a job in this process, then in Redis"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        redis_client = get_async_redis_client()
+        if redis_client is None:
+            return None
+        try:
+            payload = await redis_client.get(job_key(job_id))
+            redis_breaker.record_success()
+        except redis.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning("Forecast job read error: %s", e)
+            return None
+
+        return ForecastJob.from_info(json.loads(payload)) if payload else None
+
+    async def result(self, job: ForecastJob) -> Optional[pd.DataFrame]:
+        """A finished job's forecast, or None if it failed or has expired"""
+        if job.result is None and job.status == DONE:
+            job.result = await get_redis_forecast(result_key(job.id))
+        return job.result
+
+    async def wait(self, job: ForecastJob, timeout: float) -> Optional[ForecastJob]:
+        """Wait up to timeout seconds for a job to finish; return its latest state"""
+        if self._jobs.get(job.id) is job:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(job._finished.wait(), timeout)
+            return job
+        # Running in another worker; its status is only visible through Redis
+        await asyncio.sleep(timeout)
+        return await self.get(job.id)
+
+    async def stream(
+        self, job: ForecastJob, chunk_rows: int, poll_interval: float
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Events for a job as (event, data) pairs
+
+        A status event whenever the job changes state, and a ping every
+        poll_interval while it runs. Once done the forecast follows as history
+        events (rows fitted to the input series) then forecast events (future
+        rows), chunk_rows rows each, as frames; a final status event ends the
+        stream. A failed or expired job ends with an error event instead.
+        """
+        last_status = None
+        while True:
+            if job.status != last_status and not job.finished:
+                last_status = job.status
+                yield STATUS, job.info()
+            if job.finished:
+                break
+            job = await self.wait(job, poll_interval)
+            if job is None:
+                yield ERROR, {"detail": "Forecast job expired"}
+                return
+            if job.status == last_status:
+                yield PING, None
+
+        if job.status == FAILED:
+            yield ERROR, {"detail": f"Forecasting failed: {job.error}", **job.info()}
+            return
+
+        forecast = await self.result(job)
+        if forecast is None:
+            yield ERROR, {"detail": "Forecast result expired"}
+            return
+
+        parts = (
+            (HISTORY, forecast.iloc[: job.history_rows]),
+            (FORECAST, forecast.iloc[job.history_rows :]),
+        )
+        for event, part in parts:
+            for start in range(0, len(part), chunk_rows):
+                yield event, part.iloc[start : start + chunk_rows]
+        yield STATUS, job.info()
+
+    def cancel_all(self) -> None:
+        """Cancel every running job, e.g. on shutdown"""
+        for task in self._tasks.values():
+            task.cancel()
+
+
+# Global job registry, shared by the job routes
+forecast_jobs = ForecastJobs.from_config(forecast_config)
+FORECAST_JOBS_ACTIVE.set_function(lambda: forecast_jobs.active)
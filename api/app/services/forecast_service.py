@@ -1,31 +1,383 @@
-from typing import List
+import asyncio
+import logging
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+import numpy as np
 import pandas as pd
-from prophet import Prophet
 
+from app.config.cache_config import cache_config
+from app.config.forecast_config import forecast_config
+from app.config.redis_config import get_async_redis_client
+from app.metrics import observe_stages, stage_timer
+from app.services.forecast_cache import (
+    forecast_cache_key,
+    get_cached_forecast,
+    set_cached_forecast,
+)
+from app.services.forecast_engine import forecast_engine
+from app.services.linear_forecast import fit_predict_linear
+from app.services.model_store import get_model, model_key, set_model
+from app.services.serialization import (
+    FORECAST_COLUMNS,
+    forecast_frame_to_rows,
+    stock_rows_to_frame,
+)
+from app.services.single_flight import RedisLock, SingleFlight
 from app.types.forecast_data import ForecastRow
 from app.types.stock_data import StockDataRow
 
+if TYPE_CHECKING:
+    from prophet import Prophet
 
-def forecast_stock_data(
-    stock_data: List[StockDataRow], days: int = 30
-) -> List[ForecastRow]:
-    stock_data_df = pd.DataFrame([s.model_dump() for s in stock_data])
+logger = logging.getLogger(__name__)
+
+# Frame attribute carrying stage timings measured in a worker process back to
+# the parent, which records them
+STAGE_SECONDS_ATTR = "stage_seconds"
+
+# Identical forecasts requested concurrently share one fit
+_forecast_flights = SingleFlight()
 
+
+def _prepare_series(stock_data_df: pd.DataFrame) -> pd.DataFrame:
     # Creating new df with date and price column (Close is the Price and it is y , whereas, x is date)
     # Renaming dataframe columns as per the requirement of Facebook Prophet model
     columns: List[str] = ["Date", "Close"]
-    prophet_df = stock_data_df[columns].rename(columns={"Date": "ds", "Close": "y"})
+    return stock_data_df[columns].rename(columns={"Date": "ds", "Close": "y"})
+
+
+def preload() -> None:
+    """
+    Import Prophet ahead of the first fit
+
+    Prophet (with cmdstanpy and its plotting helpers) takes most of a second
+    to import, so it is only imported by the worker processes that fit
+    models, on first use, or up front when startup preloading is enabled.
+    """
+    import prophet  # noqa: F401
+    import prophet.serialize  # noqa: F401
+
+
+def _fit(
+    prophet_df: pd.DataFrame, init: Optional[Dict[str, Any]] = None
+) -> "Prophet":
+    from prophet import Prophet
 
     # Initialize Prophet model
     model = Prophet()
-    model.fit(prophet_df)
+    if init is None:
+        model.fit(prophet_df)
+    else:
+        model.fit(prophet_df, init=init)
+    return model
 
-    # Make future predictions
-    future_data_prediction = model.make_future_dataframe(periods=days)
+
+def _predict(model: "Prophet", days: int, include_history: bool = True) -> pd.DataFrame:
+    # Make future predictions; without history only the horizon is predicted
+    future_data_prediction = model.make_future_dataframe(
+        periods=days, include_history=include_history
+    )
     forecast = model.predict(future_data_prediction)
 
-    # Convert the forecast DataFrame to a list of ForecastRow objects
-    forecast_rows = [ForecastRow(**row) for row in forecast.to_dict("records")]
+    # Only ship the columns we return back to the parent process
+    return forecast[[c for c in FORECAST_COLUMNS if c in forecast.columns]]
+
+
+def _predict_timed(
+    model: "Prophet", days: int, fit_seconds: float, include_history: bool = True
+) -> pd.DataFrame:
+    """Predict, attaching the fit and predict durations to the forecast"""
+    started = time.perf_counter()
+    forecast = _predict(model, days, include_history)
+    forecast.attrs[STAGE_SECONDS_ATTR] = {
+        "prophet_fit": fit_seconds,
+        "prophet_predict": time.perf_counter() - started,
+    }
+    return forecast
+
+
+def _fit_predict(
+    prophet_df: pd.DataFrame, days: int, include_history: bool = True
+) -> pd.DataFrame:
+    """Fit Prophet and predict; runs inside a forecast worker process"""
+    started = time.perf_counter()
+    model = _fit(prophet_df)
+    return _predict_timed(
+        model, days, time.perf_counter() - started, include_history
+    )
+
+
+def _warm_start_params(model: "Prophet") -> Dict[str, Any]:
+    """Stan initial values taken from a fitted model's MAP estimate"""
+    params = {name: model.params[name][0][0] for name in ("k", "m", "sigma_obs")}
+    params.update({name: model.params[name][0] for name in ("delta", "beta")})
+    return params
+
+
+def _extends(previous: "Prophet", prophet_df: pd.DataFrame) -> bool:
+    """Whether a series is a previous fit's history with bars appended"""
+    history = previous.history
+    if len(history) > len(prophet_df):
+        return False
+    head = prophet_df.iloc[: len(history)]
+    return bool(
+        (head["ds"].to_numpy() == history["ds"].to_numpy()).all()
+        and np.allclose(head["y"].to_numpy(), history["y"].to_numpy())
+    )
+
+
+def _fit_predict_warm(
+    prophet_df: pd.DataFrame,
+    days: int,
+    previous_model: Optional[str],
+    include_history: bool = True,
+) -> Tuple[pd.DataFrame, str]:
+    """
+    Fit Prophet starting from a previous fit's parameters and predict
+
+    Runs inside a forecast worker process. previous_model is a model
+    serialized with model_to_json. It only seeds the fit when the new series
+    extends the one it was fitted on: parameters are in units scaled to the
+    fitted range, so a fit of any other range starts from scratch, as does
+    one whose parameters do not match (e.g. a seasonality was switched on
+    since). Returns the forecast and the new model, serialized.
+    """
+    from prophet.serialize import model_from_json, model_to_json
+
+    started = time.perf_counter()
+    model = None
+    if previous_model is not None:
+        try:
+            previous = model_from_json(previous_model)
+            if _extends(previous, prophet_df):
+                model = _fit(prophet_df, _warm_start_params(previous))
+        except Exception as e:
+            logger.warning("Warm start failed, fitting from scratch: %s", e)
+    if model is None:
+        model = _fit(prophet_df)
+    fit_seconds = time.perf_counter() - started
+    forecast = _predict_timed(model, days, fit_seconds, include_history)
+    return forecast, model_to_json(model)
+
+
+PROPHET = "prophet"
+LINEAR = "linear"
+
+# Forecasting engines by name; each maps a ds/y series, a horizon in days and
+# whether to include the history to a frame with the ForecastRow columns
+FORECAST_MODELS: Dict[str, Callable[[pd.DataFrame, int, bool], pd.DataFrame]] = {
+    PROPHET: _fit_predict,
+    LINEAR: fit_predict_linear,
+}
+
+# Engines cheap enough to run inline instead of on the worker pool
+_INLINE_MODELS = {LINEAR}
+
+
+class UnknownModelError(ValueError):
+    """Raised when a forecast asks for an engine that is not registered"""
 
-    return forecast_rows
+
+def check_model(model: str) -> None:
+    """Raise UnknownModelError unless model names a registered engine"""
+    if model not in FORECAST_MODELS:
+        raise UnknownModelError(
+            f"Unknown model '{model}'. Use one of: {', '.join(FORECAST_MODELS)}"
+        )
+
+
+def future_rows(forecast: pd.DataFrame, days: int) -> pd.DataFrame:
+    """The rows of a forecast past the end of its input series"""
+    return forecast.iloc[max(len(forecast) - days, 0) :].reset_index(drop=True)
+
+
+def forecast_stock_data(
+    stock_data: List[StockDataRow],
+    days: int = 30,
+    model: str = PROPHET,
+    future_only: bool = False,
+) -> List[ForecastRow]:
+    check_model(model)
+    prophet_df = _prepare_series(stock_rows_to_frame(stock_data))
+    forecast = FORECAST_MODELS[model](prophet_df, days, not future_only)
+    return forecast_frame_to_rows(forecast)
+
+
+async def forecast_frame_async(
+    stock_data_df: pd.DataFrame,
+    days: int = 30,
+    series_id: Optional[str] = None,
+    cache_ttl: Optional[float] = None,
+    model: str = PROPHET,
+    future_only: bool = False,
+) -> pd.DataFrame:
+    """
+    Forecast an OHLCV frame on the shared process pool instead of the event loop
+
+    Results are cached by a hash of the series and parameters, so repeated
+    requests for the same data skip the fit entirely, and identical requests
+    made while a fit is running wait for it rather than starting another.
+    When series_id names the series (e.g. "AAPL:1d") and the series extends
+    the last one fitted from the same start date, the fit starts from that
+    fit's parameters, which converges faster for a series that only gained a
+    few bars. cache_ttl overrides how long a newly computed
+    forecast stays in Redis.
+
+    model picks the engine from FORECAST_MODELS. Inline engines answer in
+    milliseconds, so they run directly and skip the cache and the pool.
+
+    future_only returns just the `days` rows past the series. They are sliced
+    from the full forecast when that is cached (e.g. precomputed); otherwise
+    only those dates are predicted and cached on their own.
+
+    Raises UnknownModelError for an unregistered model, ForecastQueueFullError
+    when the engine is saturated and ForecastTimeoutError when the fit takes
+    longer than the job timeout.
+    """
+    check_model(model)
+    prophet_df = _prepare_series(stock_data_df)
+    if model in _INLINE_MODELS:
+        with stage_timer(f"{model}_forecast"):
+            return FORECAST_MODELS[model](prophet_df, days, not future_only)
+
+    # Prophet keys are unchanged so existing cache entries stay valid
+    params = None if model == PROPHET else {"model": model}
+    if future_only:
+        forecast = await get_cached_forecast(
+            forecast_cache_key(prophet_df, days, params)
+        )
+        if forecast is not None:
+            return future_rows(forecast, days)
+        params = {**(params or {}), "future_only": True}
+    cache_key = forecast_cache_key(prophet_df, days, params)
+    return await _forecast_flights.run(
+        cache_key,
+        _fill_forecast_async,
+        cache_key,
+        prophet_df,
+        days,
+        series_id,
+        cache_ttl,
+        model,
+        future_only,
+    )
+
+
+async def _fit_forecast(
+    prophet_df: pd.DataFrame,
+    days: int,
+    series_id: Optional[str],
+    model: str,
+    include_history: bool,
+) -> pd.DataFrame:
+    if model != PROPHET or series_id is None or not forecast_config.warm_start:
+        forecast = await forecast_engine.submit(
+            FORECAST_MODELS[model], prophet_df, days, include_history
+        )
+    else:
+        # One stored model per start date, so ranges that only differ in
+        # their end keep extending the same fit
+        key = model_key(series_id, {"start": prophet_df["ds"].iloc[0].isoformat()})
+        forecast, model_json = await forecast_engine.submit(
+            _fit_predict_warm, prophet_df, days, await get_model(key), include_history
+        )
+        await set_model(key, model_json)
+
+    # Timings measured in the worker; dropped so cached frames stay clean
+    observe_stages(forecast.attrs.pop(STAGE_SECONDS_ATTR, {}))
+    return forecast
+
+
+async def _fill_forecast_async(
+    cache_key: str,
+    prophet_df: pd.DataFrame,
+    days: int,
+    series_id: Optional[str],
+    cache_ttl: Optional[float],
+    model: str,
+    future_only: bool,
+) -> pd.DataFrame:
+    forecast = await get_cached_forecast(cache_key)
+    if forecast is not None:
+        return forecast
+
+    # Another worker fitting the same series stores its result in the cache
+    async with RedisLock(
+        get_async_redis_client(),
+        cache_key,
+        lease=forecast_config.job_timeout,
+        poll_interval=cache_config.lock_poll_interval,
+    ) as lock:
+        if lock.contended:
+            forecast = await get_cached_forecast(cache_key)
+        if forecast is None:
+            forecast = await _fit_forecast(
+                prophet_df, days, series_id, model, not future_only
+            )
+            await set_cached_forecast(cache_key, forecast, ttl=cache_ttl)
+
+    return forecast
+
+
+async def forecast_frames_async(
+    frames: Dict[str, pd.DataFrame],
+    days: int = 30,
+    model: str = PROPHET,
+    series_ids: Optional[Dict[str, str]] = None,
+    future_only: bool = False,
+) -> AsyncIterator[Tuple[str, Union[pd.DataFrame, Exception]]]:
+    """
+    Forecast many series at once, yielding (name, forecast) as each finishes
+
+    Each series goes through forecast_frame_async, so cached forecasts return
+    straight away and series_ids (name -> series id) enable warm starts. Fits
+    run on the engine's workers at most one per worker at a time, so a large
+    batch uses every core without filling the queue interactive requests rely
+    on. A series that fails yields its exception instead of a forecast.
+    Closing the iterator early cancels the forecasts still running.
+    """
+    check_model(model)
+    series_ids = series_ids or {}
+    slots = asyncio.Semaphore(forecast_engine.workers)
+
+    async def forecast(name: str) -> Tuple[str, Union[pd.DataFrame, Exception]]:
+        async with slots:
+            try:
+                return name, await forecast_frame_async(
+                    frames[name],
+                    days,
+                    series_id=series_ids.get(name),
+                    model=model,
+                    future_only=future_only,
+                )
+            except Exception as e:
+                return name, e
+
+    tasks = [asyncio.create_task(forecast(name)) for name in frames]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def forecast_stock_data_async(
+    stock_data: List[StockDataRow], days: int = 30, model: str = PROPHET
+) -> List[ForecastRow]:
+    """Async forecast_stock_data, run on the forecasting engine"""
+    forecast = await forecast_frame_async(
+        stock_rows_to_frame(stock_data), days, model=model
+    )
+    return forecast_frame_to_rows(forecast)
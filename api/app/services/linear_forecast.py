@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Fourier terms for the weekly cycle, as in Prophet's default weekly seasonality
+WEEKLY_ORDER = 3
+WEEK_DAYS = 7.0
+# Prophet's default interval_width of 0.8, as a normal quantile
+INTERVAL_Z = 1.2815515655446004
+
+
+def _design(t: np.ndarray, weekly: bool) -> np.ndarray:
+    """Columns: intercept, slope, then sin/cos pairs of the weekly cycle"""
+    columns = [np.ones_like(t), t]
+    if weekly:
+        for k in range(1, WEEKLY_ORDER + 1):
+            angle = 2 * np.pi * k * t / WEEK_DAYS
+            columns.extend([np.sin(angle), np.cos(angle)])
+    return np.column_stack(columns)
+
+
+def fit_predict_linear(
+    prophet_df: pd.DataFrame, days: int, include_history: bool = True
+) -> pd.DataFrame:
+    """
+    Linear trend plus weekly Fourier seasonality, fitted by least squares
+
+    Returns the same columns as Prophet for the history (unless
+    include_history is False) and `days` daily future steps, in milliseconds
+    rather than seconds. The uncertainty band is the residual spread around
+    yhat; the trend has no band of its own.
+    """
+    ds = pd.to_datetime(prophet_df["ds"]).to_numpy(dtype="datetime64[ns]")
+    y = prophet_df["y"].to_numpy(dtype=np.float64)
+    if len(ds) == 0:
+        raise ValueError("Cannot forecast an empty series")
+
+    # Time in days since the first observation
+    origin = ds[0]
+    t = (ds - origin) / np.timedelta64(1, "D")
+    future = ds[-1] + np.arange(1, days + 1) * np.timedelta64(1, "D")
+    t_future = (future - origin) / np.timedelta64(1, "D")
+    t_all = np.concatenate([t, t_future]) if include_history else t_future
+
+    # Weekly terms need at least two weeks of data to be identifiable
+    weekly = t[-1] - t[0] >= 2 * WEEK_DAYS
+    X = _design(t, weekly)
+    coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+
+    X_all = _design(t_all, weekly)
+    trend = X_all[:, :2] @ coef[:2]
+    seasonal = X_all[:, 2:] @ coef[2:]
+    yhat = trend + seasonal
+
+    dof = max(len(y) - X.shape[1], 1)
+    sigma = np.sqrt(np.sum((y - X @ coef) ** 2) / dof)
+    band = INTERVAL_Z * sigma
+
+    zeros = np.zeros_like(yhat)
+    return pd.DataFrame(
+        {
+            "ds": np.concatenate([ds, future]) if include_history else future,
+            "trend": trend,
+            "yhat_lower": yhat - band,
+            "yhat_upper": yhat + band,
+            "trend_lower": trend,
+            "trend_upper": trend,
+            "additive_terms": seasonal,
+            "additive_terms_lower": seasonal,
+            "additive_terms_upper": seasonal,
+            "weekly": seasonal,
+            "weekly_lower": seasonal,
+            "weekly_upper": seasonal,
+            "multiplicative_terms": zeros,
+            "multiplicative_terms_lower": zeros,
+            "multiplicative_terms_upper": zeros,
+            "yhat": yhat,
+        }
+    )
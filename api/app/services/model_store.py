@@ -0,0 +1,63 @@
+import hashlib
+import json
+import logging
+import zlib
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.config.forecast_config import forecast_config
+from app.config.redis_config import get_async_redis_client, redis_breaker
+from app.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+
+def model_key(series_id: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Key of the last model fitted for a series (e.g. "AAPL:1d") and parameters"""
+    key = f"prophet_model:{series_id}"
+    if params:
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+        key = f"{key}:{digest.hexdigest()[:16]}"
+    return key
+
+
+async def get_model(key: str) -> Optional[str]:
+    """Load a model serialized with prophet.serialize.model_to_json"""
+    redis_client = get_async_redis_client()
+    if redis_client is None:
+        return None
+
+    try:
+        with stage_timer("redis_get"):
+            cached_data = await redis_client.get(key)
+        redis_breaker.record_success()
+    except redis.RedisError as e:
+        redis_breaker.record_failure()
+        logger.warning("Model store read error: %s", e)
+        return None
+
+    if not cached_data:
+        return None
+
+    try:
+        return zlib.decompress(cached_data).decode()
+    except zlib.error as e:
+        logger.warning("Model store decode error: %s", e)
+        return None
+
+
+async def set_model(key: str, model_json: str) -> None:
+    """Store a serialized model for the next fit of the same series to start from"""
+    redis_client = get_async_redis_client()
+    if redis_client is None:
+        return
+
+    try:
+        with stage_timer("redis_set"):
+            await redis_client.setex(
+                key, forecast_config.model_ttl, zlib.compress(model_json.encode())
+            )
+    except redis.RedisError as e:
+        redis_breaker.record_failure()
+        logger.warning("Model store write error: %s", e)
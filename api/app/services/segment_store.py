@@ -0,0 +1,178 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.cache_codec import (
+    COMPRESSION_ZLIB,
+    Range,
+    decode_segment,
+    encode_segment,
+)
+from app.services.serialization import empty_stock_frame
+
+DAY_SECONDS = 86400
+
+# Length of a yfinance interval's unit, in seconds
+_INTERVAL_UNITS = {
+    "m": 60,
+    "h": 3600,
+    "d": DAY_SECONDS,
+    "wk": 7 * DAY_SECONDS,
+    "mo": 30 * DAY_SECONDS,
+}
+
+
+def series_key(ticker: str, interval: str) -> str:
+    """Cache key holding every bar stored for a ticker/interval"""
+    return f"yf_series:{ticker}:{interval}"
+
+
+def align_to_days(start_unix: int, end_unix: int) -> Tuple[int, int]:
+    """Snap a range to the UTC day boundaries yfinance actually downloads"""
+    return (
+        start_unix // DAY_SECONDS * DAY_SECONDS,
+        end_unix // DAY_SECONDS * DAY_SECONDS,
+    )
+
+
+def settled_before(fetched_at: int) -> int:
+    """Bars before this had settled when fetched at fetched_at; newer may change"""
+    return fetched_at // DAY_SECONDS * DAY_SECONDS - DAY_SECONDS
+
+
+def interval_seconds(interval: str) -> int:
+    """Approximate length of one bar, e.g. 300 for "5m"; a day if unrecognised"""
+    for unit in sorted(_INTERVAL_UNITS, key=len, reverse=True):
+        count = interval[: -len(unit)]
+        if interval.endswith(unit) and count.isdigit():
+            return int(count) * _INTERVAL_UNITS[unit]
+    return DAY_SECONDS
+
+
+def _epoch_seconds(dates: pd.Series) -> np.ndarray:
+    return dates.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+def slice_frame(data: pd.DataFrame, start: int, end: int) -> pd.DataFrame:
+    """Bars of a date-sorted frame whose date falls in [start, end)"""
+    dates = _epoch_seconds(data["Date"])
+    lo, hi = np.searchsorted(dates, [start, end])
+    return data.iloc[lo:hi].reset_index(drop=True)
+
+
+def _subtract(ranges: List[Range], start: int, end: int) -> List[Range]:
+    """Remove [start, end) from every range, splitting ranges that straddle it"""
+    remaining = []
+    for r_start, r_end, fetched_at in ranges:
+        if r_end <= start or r_start >= end:
+            remaining.append((r_start, r_end, fetched_at))
+            continue
+        if r_start < start:
+            remaining.append((r_start, start, fetched_at))
+        if r_end > end:
+            remaining.append((end, r_end, fetched_at))
+    return remaining
+
+
+def _coalesce(ranges: List[Range]) -> List[Range]:
+    """Sort ranges and join touching neighbours fetched at the same time"""
+    merged: List[Range] = []
+    for r_start, r_end, fetched_at in sorted(ranges):
+        if merged and merged[-1][1] == r_start and merged[-1][2] == fetched_at:
+            merged[-1] = (merged[-1][0], r_end, fetched_at)
+        else:
+            merged.append((r_start, r_end, fetched_at))
+    return merged
+
+
+class SeriesSegment:
+    """
+    Bars held for one ticker/interval and the time ranges they cover
+
+    Ranges are (start, end, fetched_at) in unix seconds with an exclusive end.
+    A range may hold no bars (weekends, holidays); it is still covered, so the
+    gap is not downloaded again. Downloads that return nothing at all are not
+    added, though: yfinance also returns an empty frame when it fails. Bars
+    more than a day older than their fetch were final when downloaded; only
+    the part of a range after that point can go stale.
+    """
+
+    def __init__(
+        self, data: Optional[pd.DataFrame] = None, ranges: Optional[List[Range]] = None
+    ):
+        self.data = data if data is not None else empty_stock_frame()
+        self.ranges: List[Range] = ranges or []
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "SeriesSegment":
+        data, ranges = decode_segment(payload)
+        return cls(data, ranges)
+
+    def encode(self, compression: int = COMPRESSION_ZLIB, level: int = 3) -> bytes:
+        return encode_segment(self.data, self.ranges, compression, level)
+
+    def missing(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Sub-ranges of [start, end) that are not covered yet"""
+        gaps = []
+        cursor = start
+        for r_start, r_end, _ in self.ranges:
+            if r_end <= cursor:
+                continue
+            if r_start >= end:
+                break
+            if r_start > cursor:
+                gaps.append((cursor, r_start))
+            cursor = max(cursor, r_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def stale(
+        self, start: int, end: int, now: int, max_age: int
+    ) -> List[Tuple[int, int]]:
+        """Covered sub-ranges of [start, end) that may have changed upstream"""
+        stale = []
+        for r_start, r_end, fetched_at in self.ranges:
+            if now - fetched_at <= max_age:
+                continue
+            lo = max(r_start, start, settled_before(fetched_at))
+            hi = min(r_end, end)
+            if lo < hi:
+                stale.append((lo, hi))
+        return stale
+
+    def add(self, data: pd.DataFrame, start: int, end: int, fetched_at: int) -> None:
+        """Record freshly downloaded bars for [start, end), replacing older ones"""
+        if start >= end:
+            return
+
+        dates = _epoch_seconds(self.data["Date"])
+        keep = (dates < start) | (dates >= end)
+        frames = [frame for frame in (self.data[keep], data) if not frame.empty]
+        if frames:
+            merged = pd.concat(frames, ignore_index=True)
+            merged = merged.drop_duplicates(subset="Date", keep="last")
+            self.data = merged.sort_values("Date", ignore_index=True)
+        else:
+            self.data = empty_stock_frame()
+
+        self.ranges = _coalesce(
+            _subtract(self.ranges, start, end) + [(start, end, fetched_at)]
+        )
+
+    def merge(self, other: "SeriesSegment") -> "SeriesSegment":
+        """Combine two segments, keeping the most recently fetched bars on overlap"""
+        merged = SeriesSegment()
+        parts = [
+            (fetched_at, start, end, segment)
+            for segment in (self, other)
+            for start, end, fetched_at in segment.ranges
+        ]
+        for fetched_at, start, end, segment in sorted(parts, key=lambda p: p[0]):
+            merged.add(segment.slice(start, end), start, end, fetched_at)
+        return merged
+
+    def slice(self, start: int, end: int) -> pd.DataFrame:
+        """Bars whose date falls in [start, end)"""
+        return slice_frame(self.data, start, end)
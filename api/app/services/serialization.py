@@ -0,0 +1,216 @@
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pydantic_core
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from app.metrics import stage_timer
+from app.types.forecast_data import ForecastRow
+from app.types.stock_data import StockDataRow
+
+logger = logging.getLogger(__name__)
+
+
+class UnsupportedFormatError(Exception):
+    """Raised when an encoding needs an optional dependency that is not installed"""
+
+
+STOCK_COLUMNS: List[str] = list(StockDataRow.model_fields)
+PRICE_COLUMNS: List[str] = ["Open", "High", "Low", "Close", "Adj_Close"]
+FORECAST_COLUMNS: List[str] = list(ForecastRow.model_fields)
+
+
+def _record_type(model: type[BaseModel], names: Optional[List[str]] = None) -> type:
+    """TypedDict mirroring a model's fields, for serializing pre-validated rows"""
+    fields = {
+        name: field.annotation
+        for name, field in model.model_fields.items()
+        if names is None or name in names
+    }
+    return TypedDict(f"{model.__name__}Record", fields)
+
+
+# Rows built from cleaned frames are already valid, so they are serialized as
+# plain dicts against these schemas instead of being validated model by model
+_stock_records = TypeAdapter(List[_record_type(StockDataRow)])
+_forecast_records = TypeAdapter(List[_record_type(ForecastRow)])
+
+
+@lru_cache(maxsize=64)
+def _forecast_subset_records(columns: Tuple[str, ...]) -> TypeAdapter:
+    """Schema for forecast rows trimmed to some of ForecastRow's fields"""
+    return TypeAdapter(List[_record_type(ForecastRow, list(columns))])
+
+
+def _wall_clock(dates: pd.Series) -> pd.Series:
+    """Parse dates and drop any timezone, keeping the exchange wall-clock time"""
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates
+
+
+def empty_stock_frame() -> pd.DataFrame:
+    """An OHLCV frame with no rows but the usual column dtypes"""
+    columns = {"Date": pd.Series(dtype="datetime64[ns]")}
+    columns.update({col: pd.Series(dtype=np.float64) for col in PRICE_COLUMNS})
+    columns["Volume"] = pd.Series(dtype=np.int64)
+    return pd.DataFrame(columns)
+
+
+@stage_timer("clean_frame")
+def clean_stock_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate and normalize an OHLCV frame in one vectorized pass
+
+    Mirrors StockDataRow's validators: rows with a missing price are dropped
+    and a missing volume becomes 0.
+    """
+    data = data.reindex(columns=STOCK_COLUMNS)
+    if data.empty:
+        return empty_stock_frame()
+
+    prices = data[PRICE_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    prices = prices.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(prices).any(axis=1)
+    skipped = int((~valid).sum())
+    if skipped:
+        logger.warning("Skipping %d rows with missing prices", skipped)
+
+    volume = pd.to_numeric(data["Volume"], errors="coerce").fillna(0)
+
+    cleaned = pd.DataFrame(prices[valid], columns=PRICE_COLUMNS)
+    cleaned.insert(0, "Date", _wall_clock(data["Date"][valid]).to_numpy())
+    cleaned["Volume"] = volume[valid].to_numpy().astype(np.int64)
+    return cleaned
+
+
+@stage_timer("validation")
+def stock_rows_to_frame(stock_data: List[StockDataRow]) -> pd.DataFrame:
+    """Build an OHLCV frame from already validated rows"""
+    columns = {col: [getattr(row, col) for row in stock_data] for col in STOCK_COLUMNS}
+    return pd.DataFrame(columns, columns=STOCK_COLUMNS)
+
+
+def _frame_records(df: pd.DataFrame, columns: List[str], date_column: str):
+    """Turn frame columns into a list of plain dicts with native Python values"""
+    if df.empty:
+        return []
+    values = []
+    for col in columns:
+        if col == date_column:
+            values.append(list(df[col].dt.to_pydatetime()))
+        else:
+            values.append(df[col].tolist())
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+@stage_timer("validation")
+def stock_frame_to_rows(df: pd.DataFrame) -> List[StockDataRow]:
+    """Wrap a cleaned OHLCV frame in StockDataRow objects without re-validating"""
+    return [
+        StockDataRow.model_construct(**record)
+        for record in _frame_records(df, STOCK_COLUMNS, "Date")
+    ]
+
+
+def stock_frame_to_json(df: pd.DataFrame) -> bytes:
+    """Serialize a cleaned OHLCV frame to the List[StockDataRow] JSON shape"""
+    return _stock_records.dump_json(_frame_records(df, STOCK_COLUMNS, "Date"))
+
+
+def stock_frames_to_json(frames: Dict[str, pd.DataFrame]) -> bytes:
+    """Serialize cleaned OHLCV frames to a {ticker: List[StockDataRow]} JSON object"""
+    members = [
+        pydantic_core.to_json(ticker) + b":" + stock_frame_to_json(df)
+        for ticker, df in frames.items()
+    ]
+    return b"{" + b",".join(members) + b"}"
+
+
+def _check_forecast_columns(
+    df: pd.DataFrame, columns: List[str] = FORECAST_COLUMNS
+) -> None:
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Forecast is missing columns: {missing}")
+
+
+@stage_timer("validation")
+def forecast_frame_to_rows(df: pd.DataFrame) -> List[ForecastRow]:
+    """Wrap a forecast frame in ForecastRow objects without re-validating"""
+    _check_forecast_columns(df)
+    return [
+        ForecastRow.model_construct(**record)
+        for record in _frame_records(df, FORECAST_COLUMNS, "ds")
+    ]
+
+
+def forecast_frame_to_json(
+    df: pd.DataFrame, columns: Optional[List[str]] = None
+) -> bytes:
+    """
+    Serialize a forecast frame to the List[ForecastRow] JSON shape
+
+    columns, a subset of FORECAST_COLUMNS in their usual order, trims every
+    row to those fields.
+    """
+    if columns is None or columns == FORECAST_COLUMNS:
+        _check_forecast_columns(df)
+        return _forecast_records.dump_json(_frame_records(df, FORECAST_COLUMNS, "ds"))
+    _check_forecast_columns(df, columns)
+    records = _forecast_subset_records(tuple(columns))
+    return records.dump_json(_frame_records(df, columns, "ds"))
+
+
+def frame_to_columnar(
+    df: pd.DataFrame, columns: List[str], date_column: str
+) -> Dict[str, Any]:
+    """
+    Lay a frame out as one array per field instead of one object per row
+
+    Dates are ISO strings, matching the row format.
+    """
+    data = []
+    for col in columns:
+        if col == date_column:
+            dates = df[col].to_numpy(dtype="datetime64[s]")
+            data.append(np.datetime_as_string(dates).tolist())
+        else:
+            data.append(df[col].tolist())
+    return {"columns": columns, "data": data}
+
+
+def frame_to_columnar_json(
+    df: pd.DataFrame, columns: List[str], date_column: str
+) -> bytes:
+    """Serialize a frame to columnar JSON: {"columns": [...], "data": [[...], ...]}"""
+    return pydantic_core.to_json(
+        frame_to_columnar(df, columns, date_column), inf_nan_mode="null"
+    )
+
+
+def frame_to_msgpack(df: pd.DataFrame, columns: List[str], date_column: str) -> bytes:
+    """Serialize a frame to the columnar layout packed with msgpack"""
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedFormatError("msgpack responses require the msgpack package")
+    return msgpack.packb(frame_to_columnar(df, columns, date_column))
+
+
+def frame_to_arrow(df: pd.DataFrame, columns: List[str]) -> bytes:
+    """Serialize a frame to an Arrow IPC stream with typed columns"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedFormatError("Arrow responses require the pyarrow package")
+    table = pa.Table.from_pandas(df[columns], preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config.redis_config import redis_breaker
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if we still own it, so an expired lease that another
+# worker has since taken over is left alone
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def lock_key(key: str) -> str:
+    """Redis key of the cross-worker lock guarding a cache key"""
+    return f"lock:{key}"
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one in-flight task
+
+    The first caller starts the task and every caller arriving while it runs
+    awaits the same result (or exception). A caller that is cancelled stops
+    waiting without cancelling the shared task.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(
+        self, key: str, fn: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        task = self._calls.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Nobody may be left to await a failed task; don't warn about it
+        if not task.cancelled():
+            task.exception()
+
+
+class RedisLock:
+    """
+    Short-lived lock shared by every worker, taken with SET NX PX
+
+    Used as an async context manager around a cache fill. When another worker
+    holds the lock, entering waits for it to be released and sets
+    ``contended`` so the caller can re-read the cache before doing the work
+    itself. If Redis is unavailable or the wait runs out, the block runs
+    unlocked rather than failing the request.
+    """
+
+    def __init__(
+        self,
+        client: Optional[aioredis.Redis],
+        key: str,
+        lease: float,
+        wait: Optional[float] = None,
+        poll_interval: float = 0.1,
+    ):
+        self.client = client
+        self.key = lock_key(key)
+        self.lease = lease
+        self.wait = lease if wait is None else wait
+        self.poll_interval = poll_interval
+        self.acquired = False
+        self.contended = False
+        self._token = uuid.uuid4().hex
+
+    async def __aenter__(self) -> "RedisLock":
+        if self.client is None:
+            return self
+
+        deadline = time.monotonic() + self.wait
+        try:
+            while True:
+                self.acquired = bool(
+                    await self.client.set(
+                        self.key, self._token, nx=True, px=int(self.lease * 1000)
+                    )
+                )
+                if self.acquired or time.monotonic() >= deadline:
+                    break
+                self.contended = True
+                await asyncio.sleep(self.poll_interval)
+        except redis.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning("Cache lock error: %s", e)
+        except Exception as e:
+            logger.warning("Cache lock error: %s", e)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if not self.acquired:
+            return
+        try:
+            await self.client.eval(_RELEASE_SCRIPT, 1, self.key, self._token)
+        except Exception as e:
+            # The lease expires on its own
+            logger.warning("Cache unlock error: %s", e)
+        self.acquired = False
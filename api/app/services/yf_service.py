@@ -1,54 +1,175 @@
-import hashlib
-import json
+import asyncio
+import logging
 import time
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
-import yfinance as yf
+import redis
+import redis.asyncio as aioredis
 
-from app.config.redis_config import get_redis_client
+from app.config.cache_config import cache_config
+from app.config.redis_config import (
+    get_async_redis_client,
+    get_redis_client,
+    redis_breaker,
+)
+from app.config.yf_config import yf_config
+from app.metrics import STOCK_CACHE_REQUESTS, STOCK_REFRESHES_RUNNING, stage_timer
+from app.services.cache_codec import resolve_compression
+from app.services.disk_store import disk_store
+from app.services.segment_store import (
+    SeriesSegment,
+    align_to_days,
+    interval_seconds,
+    series_key,
+    slice_frame,
+)
+from app.services.serialization import (
+    clean_stock_frame,
+    empty_stock_frame,
+    stock_frame_to_rows,
+)
+from app.services.single_flight import RedisLock, SingleFlight
 from app.types.stock_data import StockDataRow
 
+logger = logging.getLogger(__name__)
 
-def _generate_cache_key(
-    ticker: str, start_unix: int, end_unix: int, interval: str
-) -> str:
-    """Generate a cache key for the given parameters"""
-    key_data = f"{ticker}:{start_unix}:{end_unix}:{interval}"
-    return f"yf_data:{hashlib.md5(key_data.encode()).hexdigest()}"
+_cache_compression = resolve_compression(cache_config.compression)
 
+# Bounded pool for blocking yfinance downloads, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+_fetch_semaphore: Optional[asyncio.Semaphore] = None
 
-def _fetch_from_yfinance(
-    ticker: str,
-    start_unix: int,
-    end_unix: int,
-    interval: str,
-    csv_filename: Optional[str] = None,
-) -> List[StockDataRow]:
-    """Original yfinance fetching logic"""
+# Concurrent requests for the same series and range share one cache fill
+_series_flights = SingleFlight()
+
+# Background refreshes of stale segments, one per series key
+_refresh_tasks: Dict[str, asyncio.Task] = {}
+STOCK_REFRESHES_RUNNING.set_function(lambda: len(_refresh_tasks))
+
+
+def date_range_to_unix(start_date: str, end_date: str) -> Tuple[int, int]:
+    """Convert YYYY-MM-DD start and end dates to unix timestamps"""
+    start_unix = int(time.mktime(time.strptime(start_date, "%Y-%m-%d")))
+    end_unix = int(time.mktime(time.strptime(end_date, "%Y-%m-%d")))
+    return start_unix, end_unix
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the shared executor used to run yfinance off the event loop"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=yf_config.executor_workers, thread_name_prefix="yfinance"
+        )
+    return _executor
+
+
+def _get_fetch_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent yfinance fetches"""
+    global _fetch_semaphore
+    if _fetch_semaphore is None:
+        _fetch_semaphore = asyncio.Semaphore(yf_config.max_concurrent_fetches)
+    return _fetch_semaphore
+
+
+def preload() -> None:
+    """Import yfinance ahead of the first download, which otherwise pays for it"""
+    import yfinance  # noqa: F401
+
+
+def shutdown_executor() -> None:
+    """Stop the yfinance executor, waiting for in-flight downloads"""
+    global _executor, _fetch_semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    _fetch_semaphore = None
+
+
+def cancel_refreshes() -> None:
+    """Cancel background cache refreshes that are still running"""
+    for task in list(_refresh_tasks.values()):
+        task.cancel()
+    _refresh_tasks.clear()
+
+
+def open_range_ttl(interval: str) -> int:
+    """Seconds before bars that could still change should be fetched again"""
+    return min(
+        max(interval_seconds(interval), cache_config.open_ttl_min),
+        cache_config.open_ttl_max,
+    )
+
+
+def _outdated(
+    segment: SeriesSegment, start_unix: int, end_unix: int, max_age: int
+) -> List[Tuple[int, int]]:
+    """Sub-ranges to download: gaps plus bars older than max_age that may change"""
+    now = int(time.time())
+    return sorted(
+        segment.missing(start_unix, end_unix)
+        + segment.stale(start_unix, end_unix, now, max_age)
+    )
+
+
+def _segment_from_cache(cached_data: Optional[bytes]) -> SeriesSegment:
+    """Rebuild a ticker/interval segment from its cached binary payload"""
+    if not cached_data:
+        return SeriesSegment()
+    return SeriesSegment.decode(cached_data)
+
+
+def _segment_to_cache(segment: SeriesSegment) -> bytes:
+    """Pack a ticker/interval segment into its cached binary payload"""
+    return segment.encode(
+        compression=_cache_compression, level=cache_config.compression_level
+    )
+
+
+def _save_csv(data: pd.DataFrame, csv_filename: str) -> None:
+    df_for_csv = data.rename(columns={"Adj_Close": "Adj Close"})
+    df_for_csv.to_csv(csv_filename, index=False)
+
+
+def _download_frame(
+    ticker: str, start_unix: int, end_unix: int, interval: str
+) -> pd.DataFrame:
+    """Download from yfinance and return a cleaned OHLCV frame"""
     # Convert UNIX timestamps to readable dates
     start = time.strftime("%Y-%m-%d", time.gmtime(start_unix))
     end = time.strftime("%Y-%m-%d", time.gmtime(end_unix))
-    print(
-        f"Fetching data from yfinance for {ticker} from {start} to {end} (interval={interval})"
+    logger.info(
+        "Fetching from yfinance",
+        extra={"ticker": ticker, "start": start, "end": end, "interval": interval},
     )
 
+    import yfinance as yf
+
     # Fetch data (auto_adjust=False ensures both Close and Adj Close exist)
-    data = yf.download(
-        ticker,
-        start=start,
-        end=end,
-        interval=interval,
-        group_by="ticker",
-        auto_adjust=False,
-    )
+    with stage_timer("yfinance_download"):
+        data = yf.download(
+            ticker,
+            start=start,
+            end=end,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=False,
+        )
 
     if data.empty:
-        print("Warning: no data returned")
-        return []
+        logger.warning("No data returned", extra={"ticker": ticker})
+        return empty_stock_frame()
+
+    return _normalize_download(data)
 
-    # Reset index so 'Date' is a column
+
+def _normalize_download(data: pd.DataFrame) -> pd.DataFrame:
+    """Turn one ticker's yf.download result into a cleaned OHLCV frame"""
+    # Reset index so 'Date' is a column (intraday intervals call it 'Datetime')
     data = data.reset_index()
+    data = data.rename(columns={"Datetime": "Date"})
 
     # --- Flatten multi-level columns ---
     if isinstance(data.columns, pd.MultiIndex):
@@ -83,25 +204,73 @@ def _fetch_from_yfinance(
     # Rename "Adj Close" to match Pydantic model
     data = data.rename(columns={"Adj Close": "Adj_Close"})
 
-    # Convert to list of Pydantic models
-    stock_data_rows = []
-    for _, row in data.iterrows():
-        try:
-            stock_row = StockDataRow(**row.to_dict())
-            stock_data_rows.append(stock_row)
-        except Exception as e:
-            print(f"Warning: Skipping row due to validation error: {e}")
+    # Validate and clean all rows at once
+    return clean_stock_frame(data)
+
+
+def _download_frames(
+    tickers: List[str], start_unix: int, end_unix: int, interval: str
+) -> Dict[str, pd.DataFrame]:
+    """Download several tickers in one yfinance request, one cleaned frame each"""
+    start = time.strftime("%Y-%m-%d", time.gmtime(start_unix))
+    end = time.strftime("%Y-%m-%d", time.gmtime(end_unix))
+    logger.info(
+        "Fetching from yfinance",
+        extra={
+            "tickers": len(tickers),
+            "start": start,
+            "end": end,
+            "interval": interval,
+        },
+    )
+
+    import yfinance as yf
+
+    with stage_timer("yfinance_download"):
+        data = yf.download(
+            tickers,
+            start=start,
+            end=end,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=False,
+        )
+
+    frames = {}
+    for ticker in tickers:
+        # Columns are (ticker, field); symbols yfinance failed on are absent
+        if (
+            data.empty
+            or not isinstance(data.columns, pd.MultiIndex)
+            or ticker not in data.columns.get_level_values(0)
+        ):
+            frames[ticker] = empty_stock_frame()
             continue
+        # Rows only another ticker traded on come back all-NaN
+        ticker_data = data[ticker].dropna(how="all")
+        if ticker_data.empty:
+            frames[ticker] = empty_stock_frame()
+        else:
+            frames[ticker] = _normalize_download(ticker_data)
+    return frames
+
+
+def _fetch_from_yfinance(
+    ticker: str,
+    start_unix: int,
+    end_unix: int,
+    interval: str,
+    csv_filename: Optional[str] = None,
+) -> List[StockDataRow]:
+    """Original yfinance fetching logic"""
+    data = _download_frame(ticker, start_unix, end_unix, interval)
 
     # Save to CSV only if filename is provided
-    if csv_filename is not None:
-        # Convert back to DataFrame for CSV export
-        df_for_csv = pd.DataFrame([row.model_dump() for row in stock_data_rows])
-        df_for_csv = df_for_csv.rename(columns={"Adj_Close": "Adj Close"})
-        df_for_csv.to_csv(csv_filename, index=False)
-        print(f"Saved to {csv_filename}")
+    if csv_filename is not None and not data.empty:
+        _save_csv(data, csv_filename)
+        logger.info("Saved to %s", csv_filename)
 
-    return stock_data_rows
+    return stock_frame_to_rows(data)
 
 
 def download_hist(
@@ -113,59 +282,434 @@ def download_hist(
 ) -> List[StockDataRow]:
     """
     Download historical stock data with Redis caching
+
+    Bars are cached per ticker/interval together with the date ranges they
+    cover, so any sub-range of earlier requests is served from the cache and
+    only the uncovered gaps are downloaded from yfinance. Redis is checked
+    first, then the Parquet store on disk, which keeps every download. Bars that were
+    still open when fetched are downloaded again once they are older than
+    the interval's TTL; closed ranges never expire.
     """
     if interval is None:
         interval = "1d"
+    start_unix, end_unix = align_to_days(start_unix, end_unix)
+    cache_key = series_key(ticker, interval)
 
-    # Try to get Redis client
+    # Borrow a client from the shared pool (None while the breaker is open)
     redis_client = get_redis_client()
+    segment = SeriesSegment()
 
     if redis_client is not None:
-        # Generate cache key
-        cache_key = _generate_cache_key(ticker, start_unix, end_unix, interval)
+        try:
+            with stage_timer("redis_get"):
+                cached_data = redis_client.get(cache_key)
+            redis_breaker.record_success()
+            segment = _segment_from_cache(cached_data)
+        except redis.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning("Cache read error: %s", e)
+        except Exception as e:
+            logger.warning("Cache read error: %s", e)
+
+    ttl = open_range_ttl(interval)
+    # Fall back to bars kept on disk for whatever Redis does not have
+    changed = False
+    result = "hit"
+    if _outdated(segment, start_unix, end_unix, ttl) and disk_store.enabled:
+        try:
+            disk_segment = disk_store.load(ticker, interval)
+        except Exception as e:
+            # A corrupt or partial part file is a miss, not a failed request
+            logger.warning("Disk cache read error: %s", e, extra={"ticker": ticker})
+            disk_segment = SeriesSegment()
+        if disk_segment.ranges:
+            segment = segment.merge(disk_segment)
+            changed = True
+            result = "disk"
+
+    gaps = _outdated(segment, start_unix, end_unix, ttl)
+    STOCK_CACHE_REQUESTS.labels(interval, "miss" if gaps else result).inc()
+    if not gaps:
+        logger.debug("Cache hit", extra={"ticker": ticker, "interval": interval})
+
+    # Fetch only what the caches do not cover yet, or hold stale
+    for gap_start, gap_end in gaps:
+        fetched_at = int(time.time())
+        fetched = _download_frame(ticker, gap_start, gap_end, interval)
+        if fetched.empty:
+            # yfinance also returns nothing on errors; keep the gap open to retry
+            continue
+        segment.add(fetched, gap_start, gap_end, fetched_at)
+        try:
+            disk_store.append(
+                ticker, interval, fetched, gap_start, gap_end, fetched_at
+            )
+        except Exception as e:
+            # The bars are still served and cached in Redis; the disk only
+            # misses this part
+            logger.warning("Disk cache write error: %s", e, extra={"ticker": ticker})
+        changed = True
+
+    data = segment.slice(start_unix, end_unix)
+
+    # Cache the merged segment if Redis is available and we have data
+    if redis_client is not None and changed and not segment.data.empty:
+        try:
+            payload = _segment_to_cache(segment)
+            with stage_timer("redis_set"):
+                redis_client.setex(cache_key, cache_config.segment_ttl, payload)
+            logger.debug("Cached data", extra={"ticker": ticker})
+        except redis.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning("Cache write error: %s", e)
+        except Exception as e:
+            logger.warning("Cache write error: %s", e)
+
+    # Save to CSV if filename is provided
+    if csv_filename is not None and not data.empty:
+        _save_csv(data, csv_filename)
+        logger.info("Saved to %s", csv_filename)
+
+    return stock_frame_to_rows(data)
 
+
+async def _read_segment_async(
+    redis_client: Optional[aioredis.Redis], cache_key: str
+) -> SeriesSegment:
+    """Load a ticker/interval segment from Redis, or an empty one on any failure"""
+    if redis_client is None:
+        return SeriesSegment()
+    try:
+        with stage_timer("redis_get"):
+            cached_data = await redis_client.get(cache_key)
+        redis_breaker.record_success()
+        return _segment_from_cache(cached_data)
+    except redis.RedisError as e:
+        redis_breaker.record_failure()
+        logger.warning("Cache read error: %s", e)
+    except Exception as e:
+        logger.warning("Cache read error: %s", e)
+    return SeriesSegment()
+
+
+async def _write_segment_async(
+    redis_client: Optional[aioredis.Redis], cache_key: str, segment: SeriesSegment
+) -> None:
+    if redis_client is None or segment.data.empty:
+        return
+    try:
+        payload = _segment_to_cache(segment)
+        with stage_timer("redis_set"):
+            await redis_client.setex(cache_key, cache_config.segment_ttl, payload)
+        logger.debug("Cached data", extra={"key": cache_key})
+    except redis.RedisError as e:
+        redis_breaker.record_failure()
+        logger.warning("Cache write error: %s", e)
+    except Exception as e:
+        logger.warning("Cache write error: %s", e)
+
+
+async def _merge_disk_async(
+    segment: SeriesSegment, ticker: str, interval: str
+) -> Optional[SeriesSegment]:
+    """The segment combined with the series stored on disk, or None without one"""
+    if not disk_store.enabled:
+        return None
+    try:
+        disk_segment = await asyncio.get_running_loop().run_in_executor(
+            None, disk_store.load, ticker, interval
+        )
+    except Exception as e:
+        logger.warning("Disk cache read error: %s", e, extra={"ticker": ticker})
+        return None
+    if not disk_segment.ranges:
+        return None
+    return segment.merge(disk_segment)
+
+
+async def _fetch_into_segment(
+    segment: SeriesSegment,
+    ticker: str,
+    ranges: List[Tuple[int, int]],
+    interval: str,
+) -> None:
+    """Download each range, merge it into the segment and append it to disk"""
+    loop = asyncio.get_running_loop()
+    for range_start, range_end in ranges:
+        fetched_at = int(time.time())
+        async with _get_fetch_semaphore():
+            data = await loop.run_in_executor(
+                _get_executor(),
+                _download_frame,
+                ticker,
+                range_start,
+                range_end,
+                interval,
+            )
+        if data.empty:
+            # yfinance also returns nothing on errors; keep the range open to
+            # retry and keep whatever bars were cached for it
+            continue
+        segment.add(data, range_start, range_end, fetched_at)
         try:
-            # Try to get from cache
-            cached_data = redis_client.get(cache_key)
-            if cached_data:
-                print(f"Cache hit for {ticker} from cache")
-                data_dicts = json.loads(cached_data)
-                stock_data_rows = [StockDataRow(**row) for row in data_dicts]
-
-                # Save to CSV if filename is provided
-                if csv_filename is not None:
-                    import pandas as pd
-
-                    df_for_csv = pd.DataFrame(
-                        [row.model_dump() for row in stock_data_rows]
-                    )
-                    df_for_csv = df_for_csv.rename(columns={"Adj_Close": "Adj Close"})
-                    df_for_csv.to_csv(csv_filename, index=False)
-                    print(f"Saved cached data to {csv_filename}")
-
-                return stock_data_rows
+            await loop.run_in_executor(
+                None,
+                disk_store.append,
+                ticker,
+                interval,
+                data,
+                range_start,
+                range_end,
+                fetched_at,
+            )
         except Exception as e:
-            print(f"Cache read error: {e}")
+            logger.warning("Disk cache write error: %s", e, extra={"ticker": ticker})
+
+
+async def _refresh_segment_async(
+    ticker: str, start_unix: int, end_unix: int, interval: str
+) -> None:
+    """Re-download the stale parts of a cached range and store them"""
+    cache_key = series_key(ticker, interval)
+    redis_client = get_async_redis_client()
+
+    try:
+        # Skip if another worker is already filling this series. Without Redis
+        # there is no lock to take, but the disk tier still serves these bars,
+        # so they are refreshed all the same
+        async with RedisLock(
+            redis_client, cache_key, lease=cache_config.lock_lease, wait=0
+        ) as lock:
+            if redis_client is not None and not lock.acquired:
+                return
+            segment = await _read_segment_async(redis_client, cache_key)
+            if redis_client is None:
+                segment = await _merge_disk_async(segment, ticker, interval) or segment
+            ranges = _outdated(segment, start_unix, end_unix, open_range_ttl(interval))
+            if ranges:
+                await _fetch_into_segment(segment, ticker, ranges, interval)
+                await _write_segment_async(redis_client, cache_key, segment)
+    except Exception as e:
+        logger.warning("Background refresh failed: %s", e, extra={"ticker": ticker})
+
+
+def _schedule_refresh(
+    ticker: str, start_unix: int, end_unix: int, interval: str
+) -> None:
+    """Refresh a stale range in the background unless a refresh is running"""
+    cache_key = series_key(ticker, interval)
+    if cache_key in _refresh_tasks:
+        return
+    task = asyncio.create_task(
+        _refresh_segment_async(ticker, start_unix, end_unix, interval)
+    )
+    _refresh_tasks[cache_key] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(cache_key, None))
+
+
+async def _fill_frame_async(
+    ticker: str, start_unix: int, end_unix: int, interval: str
+) -> pd.DataFrame:
+    cache_key = series_key(ticker, interval)
+    redis_client = get_async_redis_client()
+
+    segment = await _read_segment_async(redis_client, cache_key)
+    result = "hit"
+    if _outdated(segment, start_unix, end_unix, cache_config.max_stale):
+        warmed = await _merge_disk_async(segment, ticker, interval)
+        if warmed is not None:
+            segment = warmed
+            result = "disk"
+            await _write_segment_async(redis_client, cache_key, segment)
+
+    if not _outdated(segment, start_unix, end_unix, cache_config.max_stale):
+        if _outdated(segment, start_unix, end_unix, open_range_ttl(interval)):
+            # Serve what we have now and bring the cache up to date afterwards
+            result = "stale"
+            logger.debug("Serving stale data", extra={"ticker": ticker})
+            _schedule_refresh(ticker, start_unix, end_unix, interval)
+        else:
+            logger.debug("Cache hit", extra={"ticker": ticker, "interval": interval})
+        STOCK_CACHE_REQUESTS.labels(interval, result).inc()
+        return segment.slice(start_unix, end_unix)
+
+    STOCK_CACHE_REQUESTS.labels(interval, "miss").inc()
 
-    # Fetch from yfinance
-    stock_data_rows = _fetch_from_yfinance(
-        ticker, start_unix, end_unix, interval, csv_filename
+    # One worker fills the segment at a time; the others wait and re-read it
+    async with RedisLock(
+        redis_client,
+        cache_key,
+        lease=cache_config.lock_lease,
+        poll_interval=cache_config.lock_poll_interval,
+    ) as lock:
+        if lock.contended:
+            segment = segment.merge(
+                await _read_segment_async(redis_client, cache_key)
+            )
+
+        ranges = _outdated(segment, start_unix, end_unix, cache_config.max_stale)
+        if ranges:
+            await _fetch_into_segment(segment, ticker, ranges, interval)
+            await _write_segment_async(redis_client, cache_key, segment)
+
+    return segment.slice(start_unix, end_unix)
+
+
+async def download_frame_async(
+    ticker: str,
+    start_unix: int,
+    end_unix: int,
+    interval: Optional[str] = "1d",
+) -> pd.DataFrame:
+    """
+    Download historical stock data with Redis caching without blocking the event loop
+
+    Cache I/O goes through redis.asyncio and yfinance downloads run on a
+    bounded thread pool, so a slow ticker only holds up its own request.
+    Like download_hist, only ranges missing from the ticker's cached segment
+    (in Redis or on disk) are downloaded. Bars that may have changed since
+    they were cached are served stale and refreshed in the background, unless
+    they are older than CACHE_MAX_STALE. Concurrent misses for the same
+    series are coalesced: within the process they share one fill, and across
+    workers a Redis lock lets one fetch while the rest wait for the cache.
+    Returns a cleaned OHLCV frame ready for serialization; it may be shared,
+    so callers must not modify it in place.
+    """
+    if interval is None:
+        interval = "1d"
+    start_unix, end_unix = align_to_days(start_unix, end_unix)
+    flight_key = f"{series_key(ticker, interval)}:{start_unix}:{end_unix}"
+    return await _series_flights.run(
+        flight_key, _fill_frame_async, ticker, start_unix, end_unix, interval
     )
 
-    # Cache the result if Redis is available and we have data
-    if redis_client is not None and stock_data_rows:
+
+def _append_parts(
+    parts: Dict[str, List[Tuple[int, int, pd.DataFrame]]],
+    interval: str,
+    fetched_at: int,
+) -> None:
+    for ticker, ranges in parts.items():
+        for start, end, data in ranges:
+            disk_store.append(ticker, interval, data, start, end, fetched_at)
+
+
+async def download_frames_async(
+    tickers: List[str],
+    start_unix: int,
+    end_unix: int,
+    interval: Optional[str] = "1d",
+) -> Dict[str, pd.DataFrame]:
+    """
+    Download several tickers' history in as few round trips as possible
+
+    Cached segments are read with a single MGET, falling back to the disk
+    store for tickers Redis cannot serve. Stale tickers are served as
+    they are and refreshed in the background. Tickers missing part of the
+    range are downloaded together in one grouped yfinance request spanning
+    all of their gaps, and the updated segments are written back in one
+    pipeline. Returns a cleaned OHLCV frame per ticker, in request order.
+    """
+    if interval is None:
+        interval = "1d"
+    start_unix, end_unix = align_to_days(start_unix, end_unix)
+    tickers = list(dict.fromkeys(tickers))
+    cache_keys = {ticker: series_key(ticker, interval) for ticker in tickers}
+
+    redis_client = get_async_redis_client()
+    segments = {ticker: SeriesSegment() for ticker in tickers}
+
+    if redis_client is not None:
         try:
-            cache_key = _generate_cache_key(ticker, start_unix, end_unix, interval)
-            data_dicts = [row.model_dump() for row in stock_data_rows]
-            # Convert datetime objects to ISO strings for JSON serialization
-            for row in data_dicts:
-                if hasattr(row["Date"], "isoformat"):
-                    row["Date"] = row["Date"].isoformat()
-
-            # Cache for 1 hour (3600 seconds)
-            redis_client.setex(cache_key, 3600, json.dumps(data_dicts, default=str))
-            print(f"Cached data for {ticker}")
+            with stage_timer("redis_get"):
+                cached = await redis_client.mget(list(cache_keys.values()))
+            redis_breaker.record_success()
+            for ticker, cached_data in zip(tickers, cached):
+                try:
+                    segments[ticker] = _segment_from_cache(cached_data)
+                except Exception as e:
+                    logger.warning("Cache read error: %s", e, extra={"ticker": ticker})
+        except redis.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning("Cache read error: %s", e)
+
+    ttl = open_range_ttl(interval)
+    gaps = {}
+    warmed = []
+    for ticker in tickers:
+        segment = segments[ticker]
+        result = "hit"
+        if _outdated(segment, start_unix, end_unix, cache_config.max_stale):
+            disk_segment = await _merge_disk_async(segment, ticker, interval)
+            if disk_segment is not None:
+                segments[ticker] = segment = disk_segment
+                warmed.append(ticker)
+                result = "disk"
+        gaps[ticker] = _outdated(segment, start_unix, end_unix, cache_config.max_stale)
+        if gaps[ticker]:
+            result = "miss"
+        elif _outdated(segment, start_unix, end_unix, ttl):
+            result = "stale"
+            _schedule_refresh(ticker, start_unix, end_unix, interval)
+        STOCK_CACHE_REQUESTS.labels(interval, result).inc()
+    misses = [ticker for ticker in tickers if gaps[ticker]]
+    parts: Dict[str, List[Tuple[int, int, pd.DataFrame]]] = {}
+
+    if misses:
+        fetch_start = min(gaps[ticker][0][0] for ticker in misses)
+        fetch_end = max(gaps[ticker][-1][1] for ticker in misses)
+        fetched_at = int(time.time())
+        loop = asyncio.get_running_loop()
+        async with _get_fetch_semaphore():
+            frames = await loop.run_in_executor(
+                _get_executor(),
+                _download_frames,
+                misses,
+                fetch_start,
+                fetch_end,
+                interval,
+            )
+        # Each ticker records only its own gaps: the download spans everyone's,
+        # and bars outside a ticker's gaps are already cached
+        for ticker in misses:
+            data = frames.get(ticker)
+            if data is None or data.empty:
+                # Omitted or failed upstream; keep its gaps open to retry
+                continue
+            parts[ticker] = [
+                (gap_start, gap_end, slice_frame(data, gap_start, gap_end))
+                for gap_start, gap_end in gaps[ticker]
+            ]
+            for gap_start, gap_end, part in parts[ticker]:
+                segments[ticker].add(part, gap_start, gap_end, fetched_at)
+        await loop.run_in_executor(None, _append_parts, parts, interval, fetched_at)
+    else:
+        logger.debug("Cache hit", extra={"tickers": len(tickers), "interval": interval})
+
+    updated = [
+        ticker
+        for ticker in dict.fromkeys(warmed + list(parts))
+        if not segments[ticker].data.empty
+    ]
+    if redis_client is not None and updated:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for ticker in updated:
+                pipe.setex(
+                    cache_keys[ticker],
+                    cache_config.segment_ttl,
+                    _segment_to_cache(segments[ticker]),
+                )
+            with stage_timer("redis_set"):
+                await pipe.execute()
+            logger.debug("Cached data", extra={"tickers": len(updated)})
+        except redis.RedisError as e:
+            redis_breaker.record_failure()
+            logger.warning("Cache write error: %s", e)
         except Exception as e:
-            print(f"Cache write error: {e}")
+            logger.warning("Cache write error: %s", e)
+
+    return {
+        ticker: segments[ticker].slice(start_unix, end_unix) for ticker in tickers
+    }
 
-    return stock_data_rows
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import app.services.forecast_service as forecast_service
+import app.services.yf_service as yf_service
+from app import IMPORT_STARTED
+from app.metrics import STARTUP_IMPORT_SECONDS, STARTUP_READY_SECONDS
+from app.services.forecast_engine import forecast_engine
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    How long this process took to import the app and to become ready
+
+    Both are measured from the first import of the app package, so they leave
+    out interpreter and server start-up but include every import the app pulls
+    in and, when enabled, the preload run in the lifespan.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.import_seconds: Optional[float] = None
+        self.ready_seconds: Optional[float] = None
+        self.preloaded = False
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_seconds is not None
+
+    def mark_imported(self) -> None:
+        if self.import_seconds is None:
+            self.import_seconds = time.perf_counter() - self.started
+            STARTUP_IMPORT_SECONDS.set(self.import_seconds)
+
+    def mark_ready(self) -> None:
+        self.ready_seconds = time.perf_counter() - self.started
+        STARTUP_READY_SECONDS.set(self.ready_seconds)
+        logger.info("Ready", extra=self.info())
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "import_seconds": self.import_seconds,
+            "ready_seconds": self.ready_seconds,
+            "preloaded": self.preloaded,
+        }
+
+
+async def preload(timer: "StartupTimer") -> None:
+    """
+    Pay for the heavy imports before serving instead of on the first request
+
+    yfinance is imported in this process, where downloads run; Prophet only in
+    the forecast workers, which are all started here.
+    """
+    await asyncio.to_thread(yf_service.preload)
+    await forecast_engine.warm_up(forecast_service.preload)
+    timer.preloaded = True
+
+
+# Global startup timings of this process
+startup_timer = StartupTimer(IMPORT_STARTED)
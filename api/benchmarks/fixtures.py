@@ -0,0 +1,131 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.segment_store import DAY_SECONDS, SeriesSegment, interval_seconds
+from app.services.serialization import clean_stock_frame
+
+# Synthetic series start here; everything is long closed, so cached ranges
+# never go stale and the benchmarks stay on the paths they mean to measure
+START = pd.Timestamp("2015-01-02")
+# Cached segments cover this much beyond their bars, so requests for whole
+# days around them are hits, and were fetched this long after they end
+PADDING = 10 * DAY_SECONDS
+FETCHED_AFTER = 30 * DAY_SECONDS
+
+_FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def bar_dates(bars: int, interval: str) -> pd.DatetimeIndex:
+    """Timestamps of `bars` consecutive bars of an interval"""
+    if interval_seconds(interval) >= DAY_SECONDS:
+        return pd.bdate_range(START, periods=bars)
+    step = pd.Timedelta(seconds=interval_seconds(interval))
+    return pd.date_range(START, periods=bars, freq=step)
+
+
+def yf_download_frame(
+    tickers: List[str], bars: int, interval: str = "1d", seed: int = 0
+) -> pd.DataFrame:
+    """
+    What yf.download returns for these tickers: a (ticker, field) column
+    MultiIndex over a Date (or Datetime, for intraday) index, with a random
+    walk for prices and a few missing prices for the cleaning step to drop
+    """
+    rng = np.random.default_rng(seed)
+    index = bar_dates(bars, interval)
+    index.name = "Date" if interval_seconds(interval) >= DAY_SECONDS else "Datetime"
+
+    frames = {}
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+        spread = np.abs(rng.normal(0, 0.005, bars)) * close
+        values = {
+            "Open": close + rng.normal(0, 0.002, bars) * close,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Adj Close": close * 0.98,
+            "Volume": rng.integers(1_000, 1_000_000, bars).astype(np.float64),
+        }
+        frame = pd.DataFrame(values, index=index)[_FIELDS]
+        frame.iloc[rng.choice(bars, size=max(bars // 500, 1)), 3] = np.nan
+        frames[ticker] = frame
+    return pd.concat(frames, axis=1)
+
+
+def stock_frame(bars: int, interval: str = "1d", seed: int = 0) -> pd.DataFrame:
+    """A cleaned OHLCV frame, as the services pass around"""
+    raw = yf_download_frame(["SYN"], bars, interval, seed)["SYN"]
+    data = raw.reset_index().rename(
+        columns={"Datetime": "Date", "Adj Close": "Adj_Close"}
+    )
+    return clean_stock_frame(data)
+
+
+def date_range(data: pd.DataFrame) -> Tuple[int, int]:
+    """Unix [start, end) covering every bar, aligned to UTC days"""
+    dates = data["Date"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    start = int(dates[0]) // DAY_SECONDS * DAY_SECONDS
+    end = (int(dates[-1]) // DAY_SECONDS + 1) * DAY_SECONDS
+    return start, end
+
+
+def cached_segment(data: pd.DataFrame) -> SeriesSegment:
+    """A segment holding the whole frame, fetched after it closed"""
+    start, end = date_range(data)
+    segment = SeriesSegment()
+    segment.add(data, start - PADDING, end + PADDING, end + FETCHED_AFTER)
+    return segment
+
+
+class FakeRedis:
+    """In-memory stand-in for the few Redis commands the services use"""
+
+    def __init__(self):
+        self.store: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.store.get(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.store.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, nx: bool = False, **kwargs: Any) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def setex(self, key: str, ttl: int, value: Any) -> bool:
+        return self.set(key, value)
+
+    def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        # Only the lock release script is used: delete if the token matches
+        if self.store.get(key) == token.encode():
+            del self.store[key]
+            return 1
+        return 0
+
+
+class AsyncFakeRedis:
+    """FakeRedis behind the redis.asyncio interface, sharing its store"""
+
+    def __init__(self, redis: Optional[FakeRedis] = None):
+        self.redis = redis or FakeRedis()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.redis.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.redis.mget(keys)
+
+    async def set(self, key: str, value: Any, **kwargs: Any) -> bool:
+        return self.redis.set(key, value, **kwargs)
+
+    async def setex(self, key: str, ttl: int, value: Any) -> bool:
+        return self.redis.setex(key, ttl, value)
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        return self.redis.eval(script, numkeys, key, token)
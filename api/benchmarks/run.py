@@ -0,0 +1,386 @@
+"""
+Benchmarks for the stocks and forecast hot paths
+
+Runs each case against synthetic data with yfinance and Redis replaced by
+in-memory fakes, so results depend only on this code and the machine, then
+writes a JSON report that can be diffed against one from another commit:
+
+    python -m benchmarks.run --output after.json --compare before.json
+
+Use --quick for a smoke run and --filter to run only matching cases.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest.mock import patch
+
+import pandas as pd
+
+from benchmarks.fixtures import (
+    AsyncFakeRedis,
+    FakeRedis,
+    cached_segment,
+    date_range,
+    stock_frame,
+    yf_download_frame,
+)
+
+# A case yields the callable to time once its fixtures are in place, and
+# tears them down when closed
+Case = Callable[[], Iterator[Callable[[], Any]]]
+
+_CASES: Dict[str, Case] = {}
+
+_PACKAGES = ["numpy", "pandas", "prophet", "fastapi", "pyarrow", "zstandard"]
+
+# Sizes too slow for a --quick smoke run
+_LARGE = ("[1d-100000]", "[1h-100000]", "[5m-100000]", "[10000]")
+
+_ONE_DAY = pd.Timedelta(days=1)
+
+
+def case(name: str) -> Callable[[Case], Case]:
+    def register(fn: Case) -> Case:
+        _CASES[name] = fn
+        return fn
+
+    return register
+
+
+def _register_fetch_cases() -> None:
+    """_fetch_from_yfinance post-processing for each interval and size"""
+    for interval in ["1d", "1h", "5m"]:
+        for bars in [1_000, 10_000, 100_000]:
+            case(f"fetch_postprocess[{interval}-{bars}]")(
+                _fetch_postprocess(interval, bars)
+            )
+
+
+def _fetch_postprocess(interval: str, bars: int) -> Case:
+    def run() -> Iterator[Callable[[], Any]]:
+        import app.services.yf_service as yf_service
+
+        raw = yf_download_frame(["SYN"], bars, interval)
+        start, end = date_range(stock_frame(bars, interval))
+        with patch("yfinance.download", return_value=raw):
+            yield lambda: yf_service._fetch_from_yfinance("SYN", start, end, interval)
+
+    return run
+
+
+_register_fetch_cases()
+
+
+@case("batch_postprocess[20x2500]")
+def _batch_postprocess() -> Iterator[Callable[[], Any]]:
+    import app.services.yf_service as yf_service
+
+    tickers = [f"SYN{i}" for i in range(20)]
+    raw = yf_download_frame(tickers, 2_500)
+    start, end = date_range(stock_frame(2_500))
+    with patch("yfinance.download", return_value=raw):
+        yield lambda: yf_service._download_frames(tickers, start, end, "1d")
+
+
+@case("cache_encode[1d-10000]")
+def _cache_encode() -> Iterator[Callable[[], Any]]:
+    import app.services.yf_service as yf_service
+
+    segment = cached_segment(stock_frame(10_000))
+    yield lambda: yf_service._segment_to_cache(segment)
+
+
+@case("cache_decode[1d-10000]")
+def _cache_decode() -> Iterator[Callable[[], Any]]:
+    import app.services.yf_service as yf_service
+
+    payload = yf_service._segment_to_cache(cached_segment(stock_frame(10_000)))
+    yield lambda: yf_service._segment_from_cache(payload)
+
+
+@case("downsample_lttb[5m-100000]")
+def _downsample_lttb() -> Iterator[Callable[[], Any]]:
+    from app.services.downsample import downsample_stock_frame
+
+    data = stock_frame(100_000, "5m")
+    yield lambda: downsample_stock_frame(data, 2_000)
+
+
+@case("downsample_ohlc[5m-100000]")
+def _downsample_ohlc() -> Iterator[Callable[[], Any]]:
+    from app.services.downsample import OHLC, downsample_stock_frame
+
+    data = stock_frame(100_000, "5m")
+    yield lambda: downsample_stock_frame(data, 2_000, OHLC)
+
+
+def _download_hist_patches(stack: ExitStack, redis: FakeRedis) -> None:
+    import app.services.yf_service as yf_service
+    from app.services.disk_store import disk_store
+
+    stack.enter_context(patch.object(yf_service, "get_redis_client", lambda: redis))
+    stack.enter_context(patch.object(disk_store, "_enabled", False))
+
+
+@case("download_hist_cached[1d-2500]")
+def _download_hist_cached() -> Iterator[Callable[[], Any]]:
+    """download_hist answered entirely from the (fake) Redis cache"""
+    import app.services.yf_service as yf_service
+    from app.services.segment_store import series_key
+
+    data = stock_frame(2_500)
+    start, end = date_range(data)
+    redis = FakeRedis()
+    redis.set(
+        series_key("SYN", "1d"), yf_service._segment_to_cache(cached_segment(data))
+    )
+    with ExitStack() as stack:
+        _download_hist_patches(stack, redis)
+        yield lambda: yf_service.download_hist("SYN", start, end, "1d")
+
+
+@case("download_hist_miss[1d-2500]")
+def _download_hist_miss() -> Iterator[Callable[[], Any]]:
+    """download_hist with an empty cache: download, merge, encode and store"""
+    import app.services.yf_service as yf_service
+
+    raw = yf_download_frame(["SYN"], 2_500)
+    start, end = date_range(stock_frame(2_500))
+    redis = FakeRedis()
+
+    def miss() -> Any:
+        # Empty the cache first so every call misses
+        redis.store.clear()
+        return yf_service.download_hist("SYN", start, end, "1d")
+
+    with ExitStack() as stack:
+        _download_hist_patches(stack, redis)
+        stack.enter_context(patch("yfinance.download", return_value=raw))
+        yield miss
+
+
+def _register_forecast_cases() -> None:
+    """forecast_stock_data per model and history length"""
+    for model, sizes in [("prophet", [250, 1_000]), ("linear", [1_000, 10_000])]:
+        for bars in sizes:
+            case(f"forecast_{model}[{bars}]")(_forecast(model, bars))
+
+
+def _forecast(model: str, bars: int) -> Case:
+    def run() -> Iterator[Callable[[], Any]]:
+        from app.services.forecast_service import forecast_stock_data
+        from app.services.serialization import stock_frame_to_rows
+
+        rows = stock_frame_to_rows(stock_frame(bars))
+        yield lambda: forecast_stock_data(rows, days=30, model=model)
+
+    return run
+
+
+_register_forecast_cases()
+
+
+def _route_client(stack: ExitStack, data: pd.DataFrame) -> Any:
+    """A test client for the app whose Redis already holds SYN's history"""
+    from fastapi.testclient import TestClient
+
+    import app.services.yf_service as yf_service
+    from app.main import app
+    from app.services.segment_store import series_key
+
+    redis = AsyncFakeRedis()
+    redis.redis.set(
+        series_key("SYN", "1d"), yf_service._segment_to_cache(cached_segment(data))
+    )
+    stack.enter_context(
+        patch.object(yf_service, "get_async_redis_client", lambda: redis)
+    )
+    # Without the lifespan: no real Redis pools, engine or scheduler
+    return TestClient(app)
+
+
+def _request_dates(data: pd.DataFrame) -> Tuple[str, str]:
+    start, end = data["Date"].iloc[0], data["Date"].iloc[-1]
+    return start.strftime("%Y-%m-%d"), (end + _ONE_DAY).strftime("%Y-%m-%d")
+
+
+@case("route_stocks[1d-2500]")
+def _route_stocks() -> Iterator[Callable[[], Any]]:
+    data = stock_frame(2_500)
+    start, end = _request_dates(data)
+    params = {"ticker": "SYN", "start_date": start, "end_date": end}
+    with ExitStack() as stack:
+        client = _route_client(stack, data)
+        yield lambda: _ok(client.get("/api/stocks", params=params))
+
+
+@case("route_forecast_post[linear-2500]")
+def _route_forecast_post() -> Iterator[Callable[[], Any]]:
+    from app.services.serialization import stock_frame_to_json
+
+    data = stock_frame(2_500)
+    body = (
+        b'{"days": 30, "model": "linear", "stock_data": '
+        + stock_frame_to_json(data)
+        + b"}"
+    )
+    headers = {"Content-Type": "application/json"}
+    with ExitStack() as stack:
+        client = _route_client(stack, data)
+        yield lambda: _ok(
+            client.post("/api/forecast", content=body, headers=headers)
+        )
+
+
+@case("route_forecast_ticker[linear-2500]")
+def _route_forecast_ticker() -> Iterator[Callable[[], Any]]:
+    data = stock_frame(2_500)
+    start, end = _request_dates(data)
+    params = {"start_date": start, "end_date": end, "model": "linear"}
+    with ExitStack() as stack:
+        client = _route_client(stack, data)
+        yield lambda: _ok(client.get("/api/forecast/SYN", params=params))
+
+
+def _ok(response: Any) -> Any:
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.status_code}: {response.text[:200]}")
+    return response
+
+
+def measure(
+    fn: Callable[[], Any], min_time: float, min_rounds: int, max_rounds: int
+) -> Dict[str, float]:
+    """Time fn after one warm-up call, for min_time seconds within the round caps"""
+    fn()
+    timings: List[float] = []
+    total = 0.0
+    while len(timings) < max_rounds and (
+        len(timings) < min_rounds or total < min_time
+    ):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        total += elapsed
+
+    timings.sort()
+    median = statistics.median(timings)
+    return {
+        "rounds": len(timings),
+        "min_ms": timings[0] * 1000,
+        "median_ms": median * 1000,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p95_ms": timings[min(int(len(timings) * 0.95), len(timings) - 1)] * 1000,
+        "stdev_ms": statistics.stdev(timings) * 1000 if len(timings) > 1 else 0.0,
+        "ops_per_sec": 1 / median if median else float("inf"),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _versions() -> Dict[str, Optional[str]]:
+    versions = {}
+    for package in _PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": _versions(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print each case's median against the baseline report"""
+    print(f"\n{'case':<40} {'base ms':>10} {'now ms':>10} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<40} {'-':>10} {result['median_ms']:>10.3f} {'new':>8}")
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1
+        print(
+            f"{name:<40} {base['median_ms']:>10.3f} "
+            f"{result['median_ms']:>10.3f} {change:>+8.1%}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--quick", action="store_true", help="few rounds and small sizes only"
+    )
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--output", default="benchmark-report.json")
+    parser.add_argument("--compare", help="earlier report to compare medians with")
+    args = parser.parse_args(argv)
+
+    # Per-call logs (app, cmdstanpy) would dominate the faster cases
+    logging.disable(logging.WARNING)
+
+    if args.quick:
+        min_time, min_rounds, max_rounds = 0.05, 2, 10
+    else:
+        min_time, min_rounds, max_rounds = 0.5, 5, 1_000
+
+    results: Dict[str, Any] = {}
+    for name, run in _CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        if args.quick and name.endswith(_LARGE):
+            continue
+        cases = run()
+        fn = next(cases)
+        try:
+            results[name] = measure(fn, min_time, min_rounds, max_rounds)
+        finally:
+            cases.close()
+        print(
+            f"{name:<40} {results[name]['median_ms']:>10.3f} ms "
+            f"({results[name]['rounds']} rounds)",
+            flush=True,
+        )
+
+    report = {"environment": environment(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
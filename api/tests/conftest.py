@@ -4,6 +4,14 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services.disk_store import disk_store
+
+
+@pytest.fixture(autouse=True)
+def isolated_disk_store(tmp_path, monkeypatch):
+    """Keep the Parquet cache tier out of the working tree during tests"""
+    monkeypatch.setattr(disk_store, "root", str(tmp_path / "bars"))
+    return disk_store
 
 
 @pytest.fixture
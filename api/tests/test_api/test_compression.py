@@ -0,0 +1,133 @@
+import gzip
+import json
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.compression import (
+    CompressionMiddleware,
+    available,
+    encode_body,
+    encoded_bodies,
+    negotiate_encoding,
+)
+from app.config.compression_config import CompressionConfig
+
+BIG_BODY = json.dumps([{"Close": 1.0}] * 500).encode()
+
+
+def make_config(encodings="gzip"):
+    config = CompressionConfig()
+    config.encodings = encodings.split(",")
+    return config
+
+
+def test_negotiate_encoding():
+    """Test the client's weights win, then the configured order"""
+    config = make_config("br,gzip")
+
+    assert negotiate_encoding("gzip, deflate", config) == "gzip"
+    assert negotiate_encoding("gzip;q=0", config) is None
+    assert negotiate_encoding("*", config) in ("br", "gzip")
+    assert negotiate_encoding("identity", config) is None
+    assert negotiate_encoding(None, config) is None
+
+
+@patch("app.api.compression.available", lambda encoding: encoding != "br")
+def test_negotiate_encoding_skips_unavailable():
+    """Test encodings whose package is missing are never chosen"""
+    assert negotiate_encoding("br, gzip;q=0.5", make_config("br,gzip")) == "gzip"
+
+
+@patch("app.api.compression.importlib.util.find_spec", return_value=None)
+def test_missing_codec_is_unavailable(mock_find_spec, caplog):
+    """Test br and zstd drop out, with a warning, when their package is missing"""
+    assert not available.__wrapped__("br")
+    assert not available.__wrapped__("zstd")
+    assert available.__wrapped__("gzip")
+    assert "compression extra" in caplog.text
+
+
+def test_encode_body_leaves_small_bodies():
+    config = make_config()
+
+    small = encode_body(b"[]", "gzip", config)
+    big = encode_body(BIG_BODY, "gzip", config)
+
+    assert small == (b"[]", None)
+    assert big.encoding == "gzip"
+    assert gzip.decompress(big.content) == BIG_BODY
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, config=make_config())
+
+    @app.get("/big")
+    async def big():
+        headers = {"ETag": '"x"'}
+        return Response(BIG_BODY, media_type="application/json", headers=headers)
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            yield b"a\n"
+            yield b"b\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return app
+
+
+def test_middleware_compresses_whole_bodies():
+    """Test whole bodies are gzipped with a weak ETag and Vary"""
+    client = TestClient(make_app())
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"x"'
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.content == BIG_BODY
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] == '"x"'
+
+
+def test_middleware_passes_streams_through():
+    """Test streamed responses keep their chunks uncompressed"""
+    response = TestClient(make_app()).get(
+        "/stream", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert "Content-Encoding" not in response.headers
+    assert response.text == "a\nb\n"
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.stock_response")
+@patch("app.api.routes.yf_service.download_frame_async", new_callable=AsyncMock)
+async def test_stocks_serves_cached_compressed_body(
+    mock_download, mock_stock_response, client
+):
+    """Test repeat /api/stocks requests reuse the compressed body"""
+    encoded_bodies.clear()
+    mock_download.return_value = pd.DataFrame(
+        {"Date": pd.to_datetime(["2022-01-03"]), "Close": [1.5]}
+    )
+    mock_stock_response.return_value = Response(BIG_BODY)
+    params = {"ticker": "AAPL", "start_date": "2022-01-01", "end_date": "2022-01-31"}
+    headers = {"Accept-Encoding": "gzip"}
+
+    first = client.get("/api/stocks", params=params, headers=headers)
+    second = client.get("/api/stocks", params=params, headers=headers)
+
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert second.content == first.content == BIG_BODY
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert not second.headers["ETag"].startswith("W/")
+    mock_stock_response.assert_called_once()
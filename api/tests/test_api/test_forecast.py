@@ -1,5 +1,47 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
 import pytest
 
+from app.services.forecast_engine import ForecastQueueFullError
+from app.services.forecast_jobs import ForecastJob
+from app.services.forecast_service import UnknownModelError
+
+FORECAST_FLOATS = [
+    "trend",
+    "yhat_lower",
+    "yhat_upper",
+    "trend_lower",
+    "trend_upper",
+    "additive_terms",
+    "additive_terms_lower",
+    "additive_terms_upper",
+    "weekly",
+    "weekly_lower",
+    "weekly_upper",
+    "multiplicative_terms",
+    "multiplicative_terms_lower",
+    "multiplicative_terms_upper",
+    "yhat",
+]
+
+STOCK_ROW = {
+    "Date": "2024-01-02T00:00:00",
+    "Open": 1.0,
+    "High": 1.0,
+    "Low": 1.0,
+    "Close": 1.0,
+    "Adj_Close": 1.0,
+    "Volume": 1,
+}
+
+
+def make_forecast_frame():
+    return pd.DataFrame(
+        {"ds": pd.to_datetime(["2024-01-03"]), **{f: [1.0] for f in FORECAST_FLOATS}}
+    )
+
 
 def get_stock_data_from_api(client):
     """Helper function to get stock data from the stocks endpoint"""
@@ -80,3 +122,297 @@ async def test_forecast_endpoint_missing_stock_data(client):
     response = client.post("/api/forecast", json=request_data)
 
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.forecast_frame_async")
+async def test_forecast_endpoint_queue_full(mock_forecast, client):
+    """Test forecast endpoint sheds load with 503 and Retry-After"""
+    mock_forecast.side_effect = ForecastQueueFullError("Forecast queue is full")
+
+    response = client.post("/api/forecast", json={"stock_data": [STOCK_ROW]})
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_forecast_endpoint_linear_model(client):
+    """Test the linear model forecasts uploaded data without Prophet"""
+    stock_data = [
+        {
+            "Date": f"2024-01-{day:02d}T00:00:00",
+            "Open": 1.0,
+            "High": 1.0,
+            "Low": 1.0,
+            "Close": float(day),
+            "Adj_Close": float(day),
+            "Volume": 1,
+        }
+        for day in range(1, 11)
+    ]
+
+    response = client.post(
+        "/api/forecast", json={"stock_data": stock_data, "days": 3, "model": "linear"}
+    )
+
+    assert response.status_code == 200
+    forecast = response.json()
+    assert len(forecast) == 13
+    assert forecast[-1]["yhat"] == pytest.approx(13.0)
+
+
+@pytest.mark.asyncio
+async def test_forecast_endpoint_unknown_model(client):
+    """Test an unknown model name returns 400"""
+    response = client.post("/api/forecast", json={"stock_data": [], "model": "arima"})
+
+    assert response.status_code == 400
+    assert "arima" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.forecast_frame_async")
+async def test_forecast_endpoint_service_rejects_model(mock_forecast, client):
+    """Test an unknown model caught by the service is a 400, not a 500"""
+    mock_forecast.side_effect = UnknownModelError("Unknown model 'arima'")
+
+    response = client.post("/api/forecast", json={"stock_data": [STOCK_ROW]})
+
+    assert response.status_code == 400
+    assert "arima" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.forecast_frame_async")
+@patch("app.services.yf_service.download_frame_async")
+async def test_forecast_ticker_endpoint(mock_download, mock_forecast, client):
+    """Test ticker forecast pulls history server-side and forecasts it"""
+    stock_data = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-01-02"]),
+            "Open": [1.0],
+            "High": [1.0],
+            "Low": [1.0],
+            "Close": [1.0],
+            "Adj_Close": [1.0],
+            "Volume": [1],
+        }
+    )
+    mock_download.return_value = stock_data
+    mock_forecast.return_value = make_forecast_frame()
+
+    response = client.get(
+        "/api/forecast/AAPL",
+        params={"start_date": "2024-01-01", "end_date": "2024-01-31", "days": 5},
+    )
+
+    assert response.status_code == 200
+    assert response.json()[0]["yhat"] == 1.0
+    assert mock_download.call_args.args[0] == "AAPL"
+    assert mock_forecast.call_args.args[0] is stock_data
+    assert mock_forecast.call_args.args[1] == 5
+    assert mock_forecast.call_args.kwargs["series_id"] == "AAPL:1d"
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.download_frame_async")
+async def test_forecast_ticker_endpoint_no_data(mock_download, client):
+    """Test ticker forecast returns 404 when there is no history"""
+    mock_download.return_value = pd.DataFrame()
+
+    response = client.get(
+        "/api/forecast/INVALID",
+        params={"start_date": "2024-01-01", "end_date": "2024-01-31"},
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.forecast_jobs")
+async def test_create_forecast_job(mock_jobs, client):
+    """Test a forecast job is accepted with 202 and a link to its status"""
+    mock_jobs.submit = AsyncMock(return_value=ForecastJob("abc", 5, "prophet"))
+
+    response = client.post(
+        "/api/forecast/jobs", json={"stock_data": [STOCK_ROW], "days": 5}
+    )
+
+    assert response.status_code == 202
+    assert response.headers["Location"] == "/api/forecast/jobs/abc"
+    assert response.json()["status"] == "queued"
+    assert mock_jobs.submit.call_args.args[1] == 5
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.forecast_jobs")
+async def test_create_forecast_job_when_full(mock_jobs, client):
+    """Test job submission sheds load with 503 and Retry-After"""
+    mock_jobs.submit = AsyncMock(side_effect=ForecastQueueFullError("full"))
+
+    response = client.post("/api/forecast/jobs", json={"stock_data": [STOCK_ROW]})
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.forecast_jobs")
+async def test_forecast_job_status(mock_jobs, client):
+    """Test polling a job returns its status, and 404 for unknown jobs"""
+    mock_jobs.get = AsyncMock(return_value=ForecastJob("abc", 5, "prophet"))
+    response = client.get("/api/forecast/jobs/abc")
+    assert response.status_code == 200
+    assert response.json()["job_id"] == "abc"
+
+    mock_jobs.get = AsyncMock(return_value=None)
+    response = client.get("/api/forecast/jobs/missing")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.forecast_jobs")
+async def test_forecast_job_result(mock_jobs, client):
+    """Test a job's result is 409 while running and the forecast once done"""
+    job = ForecastJob("abc", 1, "prophet", status="running")
+    mock_jobs.get = AsyncMock(return_value=job)
+    assert client.get("/api/forecast/jobs/abc/result").status_code == 409
+
+    job.status = "done"
+    mock_jobs.result = AsyncMock(return_value=make_forecast_frame())
+    response = client.get("/api/forecast/jobs/abc/result")
+    assert response.status_code == 200
+    assert response.json()[0]["yhat"] == 1.0
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.forecast_jobs")
+async def test_forecast_job_stream(mock_jobs, client):
+    """Test a job streams as server-sent events"""
+    job = ForecastJob("abc", 1, "prophet", status="done", history_rows=0)
+    rows = make_forecast_frame()
+
+    async def stream(*args):
+        yield "status", {"status": "running"}
+        yield "ping", None
+        yield "forecast", rows
+        yield "status", job.info()
+
+    mock_jobs.get = AsyncMock(return_value=job)
+    mock_jobs.stream = stream
+
+    response = client.get("/api/forecast/jobs/abc/stream")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = response.text.split("\n\n")
+    assert events[0] == 'event: status\ndata: {"status": "running"}'
+    assert events[1] == ": ping"
+    assert events[2].startswith("event: forecast\ndata: [{")
+    assert '"ds":"2024-01-03T00:00:00"' in events[2]
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.forecast_frame_async")
+@patch("app.services.yf_service.download_frames_async")
+async def test_forecast_batch_endpoint(mock_download, mock_forecast, client):
+    """Test a batch streams one NDJSON line per series, failures included"""
+    stock_data = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-01-02"]),
+            **{f: [1.0] for f in ["Open", "High", "Low", "Close", "Adj_Close"]},
+            "Volume": [1],
+        }
+    )
+    mock_download.return_value = {"AAPL": stock_data, "NONE": pd.DataFrame()}
+
+    async def forecast(frame, days, series_id=None, **kwargs):
+        if series_id is None:
+            raise ForecastQueueFullError("full")
+        return make_forecast_frame()
+
+    mock_forecast.side_effect = forecast
+
+    response = client.post(
+        "/api/forecast/batch",
+        json={
+            "tickers": ["AAPL", "NONE", "AAPL"],
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-31",
+            "series": {"MINE": [STOCK_ROW]},
+            "days": 5,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = {
+        line["ticker"]: line for line in map(json.loads, response.text.splitlines())
+    }
+    assert lines["AAPL"]["forecast"][0]["yhat"] == 1.0
+    assert lines["NONE"]["status"] == 404
+    assert lines["MINE"]["status"] == 503
+    assert mock_download.call_args.args[0] == ["AAPL", "NONE"]
+    assert {call.kwargs["series_id"] for call in mock_forecast.call_args_list} == {
+        "AAPL:1d",
+        None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_forecast_batch_endpoint_validation(client):
+    """Test a batch is rejected up front when it cannot be served"""
+    assert client.post("/api/forecast/batch", json={}).status_code == 400
+    response = client.post("/api/forecast/batch", json={"tickers": ["AAPL"]})
+    assert response.status_code == 400
+    assert "start_date" in response.json()["detail"]
+    response = client.post(
+        "/api/forecast/batch",
+        json={"series": {"MINE": [STOCK_ROW]}, "model": "arima"},
+    )
+    assert response.status_code == 400
+    response = client.post(
+        "/api/forecast/batch",
+        json={"tickers": ["AAPL"], "start_date": "2024-13-01", "end_date": "x"},
+    )
+    assert response.status_code == 400
+    assert "YYYY-MM-DD" in response.json()["detail"]
+    response = client.post(
+        "/api/forecast/batch",
+        json={
+            "tickers": ["AAPL"],
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-31",
+            "series": {"AAPL": [STOCK_ROW]},
+        },
+    )
+    assert response.status_code == 400
+    assert "AAPL" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.forecast_frame_async")
+async def test_forecast_endpoint_future_only_fields(mock_forecast, client):
+    """Test forecasts can be trimmed to the horizon and to some fields"""
+    mock_forecast.return_value = make_forecast_frame()
+
+    response = client.post(
+        "/api/forecast",
+        params={"future_only": "true", "fields": "yhat_upper,yhat"},
+        json={"stock_data": [STOCK_ROW], "days": 1},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"ds": "2024-01-03T00:00:00", "yhat_upper": 1.0, "yhat": 1.0}
+    ]
+    assert mock_forecast.call_args.kwargs["future_only"] is True
+
+    response = client.post(
+        "/api/forecast",
+        params={"fields": "yhat,bogus"},
+        json={"stock_data": [STOCK_ROW]},
+    )
+    assert response.status_code == 400
+    assert "bogus" in response.json()["detail"]
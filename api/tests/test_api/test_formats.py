@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.api.formats import ARROW, COLUMNAR, JSON, MSGPACK, negotiate_format
+
+
+def make_frame():
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+            "Open": [1.0, 2.0],
+            "High": [1.0, 2.0],
+            "Low": [1.0, 2.0],
+            "Close": [1.0, 2.0],
+            "Adj_Close": [1.0, 2.0],
+            "Volume": [10, 20],
+        }
+    )
+
+
+STOCKS_PARAMS = {"ticker": "AAPL", "start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+
+def test_negotiate_format_defaults_to_json():
+    assert negotiate_format(None, None) == JSON
+    assert negotiate_format(None, "application/json, */*") == JSON
+
+
+def test_negotiate_format_query_parameter_wins():
+    assert negotiate_format("columnar", "application/msgpack") == COLUMNAR
+
+
+def test_negotiate_format_from_accept_header():
+    assert negotiate_format(None, "application/vnd.apache.arrow.stream") == ARROW
+    assert negotiate_format(None, "application/msgpack;q=0.9") == MSGPACK
+
+
+def test_negotiate_format_rejects_unknown():
+    with pytest.raises(HTTPException) as exc:
+        negotiate_format("xml", None)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.download_frame_async")
+async def test_stocks_columnar_format(mock_download, client):
+    mock_download.return_value = make_frame()
+
+    response = client.get("/api/stocks", params={**STOCKS_PARAMS, "format": "columnar"})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["columns"][0] == "Date"
+    assert payload["data"][-1] == [10, 20]
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.download_frame_async")
+async def test_stocks_default_format_is_rows(mock_download, client):
+    mock_download.return_value = make_frame()
+
+    response = client.get("/api/stocks", params=STOCKS_PARAMS)
+
+    assert response.status_code == 200
+    assert response.json()[1]["Volume"] == 20
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.download_frame_async")
+async def test_stocks_arrow_via_accept(mock_download, client):
+    pa = pytest.importorskip("pyarrow")
+    mock_download.return_value = make_frame()
+
+    response = client.get(
+        "/api/stocks",
+        params=STOCKS_PARAMS,
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 2
@@ -1,7 +1,58 @@
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 
+from app.startup import StartupTimer
+
 
 @pytest.mark.asyncio
 async def test_stocks_basic(client):
     response = client.get("/api/health")
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_ready_while_starting(client):
+    """Test the readiness probe fails until startup has finished"""
+    with patch("app.api.routes.startup_timer", StartupTimer(0.0)):
+        response = client.get("/api/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+
+@pytest.mark.asyncio
+async def test_ready_reports_startup_timings(client):
+    """Test the readiness probe reports import and ready times once started"""
+    timer = StartupTimer(0.0)
+    timer.mark_imported()
+    timer.mark_ready()
+
+    with patch("app.api.routes.startup_timer", timer):
+        response = client.get("/api/ready")
+
+    assert response.status_code == 200
+    info = response.json()
+    assert info["status"] == "ready"
+    assert 0 < info["import_seconds"] <= info["ready_seconds"]
+    assert info["preloaded"] is False
+
+
+def test_app_import_defers_heavy_libraries():
+    """Test importing the app does not import Prophet or yfinance"""
+    code = (
+        "import sys, app.main; "
+        "print(sorted({'prophet', 'yfinance'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from app.api.http_cache import etag_matches, frame_etag, stock_cache_control
+from app.config.cache_config import cache_config
+from app.services.segment_store import DAY_SECONDS
+
+
+def make_frame(close=1.0):
+    return pd.DataFrame(
+        {"Date": pd.to_datetime(["2024-01-02", "2024-01-03"]), "Close": [close, 2.0]}
+    )
+
+
+def test_frame_etag_tracks_content_and_variant():
+    """Test the ETag changes with the bars or the encoding, and nothing else"""
+    etag = frame_etag(make_frame(), "json")
+
+    assert etag == frame_etag(make_frame(), "json")
+    assert etag != frame_etag(make_frame(close=1.5), "json")
+    assert etag != frame_etag(make_frame(), "arrow")
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_etag_matches():
+    """Test If-None-Match lists, weak tags and the wildcard"""
+    etag = '"abc"'
+
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_stock_cache_control_by_range_age():
+    """Test settled ranges are cacheable for long, recent ones for an open TTL"""
+    now = 100 * DAY_SECONDS + 3600
+
+    settled = stock_cache_control("1d", 98 * DAY_SECONDS, now=now)
+    recent = stock_cache_control("5m", 100 * DAY_SECONDS, now=now)
+
+    assert settled == f"public, max-age={cache_config.http_max_age}"
+    assert recent == "public, max-age=300"
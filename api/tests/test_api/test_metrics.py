@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    """Test Prometheus metrics are exposed in the text format"""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE stage_duration_seconds histogram" in response.text
+    assert "forecast_queue_depth 0.0" in response.text
@@ -1,3 +1,6 @@
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
 import pytest
 
 
@@ -27,3 +30,115 @@ async def test_stocks_invalid_ticker(client):
 async def test_stocks_missing_params(client):
     response = client.get("/api/stocks")
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.yf_service.download_frames_async", new_callable=AsyncMock)
+async def test_stocks_batch(mock_download, client):
+    mock_download.return_value = {
+        "AAPL": pd.DataFrame(
+            {
+                "Date": pd.to_datetime(["2022-01-03"]),
+                "Open": [1.0],
+                "High": [2.0],
+                "Low": [0.5],
+                "Close": [1.5],
+                "Adj_Close": [1.5],
+                "Volume": [10],
+            }
+        ),
+        "NOPE": pd.DataFrame(columns=["Date"]),
+    }
+
+    response = client.post(
+        "/api/stocks/batch",
+        json={
+            "tickers": ["AAPL", "NOPE"],
+            "start_date": "2022-01-01",
+            "end_date": "2022-01-31",
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["AAPL"][0]["Close"] == 1.5
+    assert data["NOPE"] == []
+    assert mock_download.call_args.args[0] == ["AAPL", "NOPE"]
+
+
+@pytest.mark.asyncio
+async def test_stocks_batch_rejects_bad_ticker_lists(client):
+    params = {"start_date": "2022-01-01", "end_date": "2022-01-31"}
+
+    empty = client.post("/api/stocks/batch", json={"tickers": [], **params})
+    too_many = client.post(
+        "/api/stocks/batch", json={"tickers": ["T"] * 1000, **params}
+    )
+
+    assert empty.status_code == 400
+    assert too_many.status_code == 400
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.yf_service.download_frame_async", new_callable=AsyncMock)
+async def test_stocks_max_points(mock_download, client):
+    close = [float(i % 7) for i in range(100)]
+    mock_download.return_value = pd.DataFrame(
+        {
+            "Date": pd.date_range("2022-01-03", periods=100, freq="5min"),
+            "Open": close,
+            "High": [c + 1 for c in close],
+            "Low": [c - 1 for c in close],
+            "Close": close,
+            "Adj_Close": close,
+            "Volume": [10] * 100,
+        }
+    )
+    params = {"ticker": "AAPL", "start_date": "2022-01-01", "end_date": "2022-01-31"}
+
+    lttb = client.get("/api/stocks", params={**params, "max_points": 10})
+    ohlc = client.get(
+        "/api/stocks", params={**params, "max_points": 10, "resample": "ohlc"}
+    )
+    bad = client.get(
+        "/api/stocks", params={**params, "max_points": 10, "resample": "x"}
+    )
+
+    assert lttb.status_code == 200
+    assert len(lttb.json()) == 10
+    assert ohlc.status_code == 200
+    assert [row["Volume"] for row in ohlc.json()] == [100] * 10
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+@patch("app.api.routes.yf_service.download_frame_async", new_callable=AsyncMock)
+async def test_stocks_conditional_get(mock_download, client):
+    mock_download.return_value = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2022-01-03"]),
+            "Open": [1.0],
+            "High": [2.0],
+            "Low": [0.5],
+            "Close": [1.5],
+            "Adj_Close": [1.5],
+            "Volume": [10],
+        }
+    )
+    params = {"ticker": "AAPL", "start_date": "2022-01-01", "end_date": "2022-01-31"}
+
+    first = client.get("/api/stocks", params=params)
+    etag = first.headers["ETag"]
+    again = client.get("/api/stocks", params=params, headers={"If-None-Match": etag})
+    columnar = client.get(
+        "/api/stocks",
+        params={**params, "format": "columnar"},
+        headers={"If-None-Match": etag},
+    )
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+    assert columnar.status_code == 200
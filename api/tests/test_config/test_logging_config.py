@@ -0,0 +1,31 @@
+import json
+import logging
+
+from app.config.logging_config import JsonFormatter, TextFormatter
+
+
+def make_record(**extra):
+    record = logging.LogRecord(
+        "app.services.yf_service", logging.INFO, __file__, 1, "Cache hit", None, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test JSON lines carry the message and the fields passed via extra"""
+    entry = json.loads(JsonFormatter().format(make_record(ticker="AAPL")))
+
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.services.yf_service"
+    assert entry["message"] == "Cache hit"
+    assert entry["ticker"] == "AAPL"
+
+
+def test_text_formatter_appends_extra_fields():
+    """Test text lines end with the extra fields as key=value"""
+    line = TextFormatter().format(make_record(ticker="AAPL", interval="1d"))
+
+    assert line.endswith(
+        "INFO app.services.yf_service Cache hit ticker=AAPL interval=1d"
+    )
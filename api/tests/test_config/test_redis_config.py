@@ -1,8 +1,19 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from app.config.redis_config import RedisConfig, get_redis_client
+from app.config.redis_config import (
+    RedisCircuitBreaker,
+    RedisConfig,
+    close_async_redis_pool,
+    close_redis_pool,
+    get_async_redis_client,
+    get_redis_client,
+    init_async_redis_pool,
+    init_redis_pool,
+    redis_health_monitor,
+)
 
 
 def test_redis_config_default_values():
@@ -11,7 +22,7 @@ def test_redis_config_default_values():
     assert config.host == "localhost"
     assert config.port == 6379
     assert config.db == 0
-    assert config.decode_responses is True
+    assert config.decode_responses is False
 
 
 @patch.dict(
@@ -27,24 +38,108 @@ def test_redis_config_from_env():
 
 @patch("app.config.redis_config.redis.Redis")
 def test_get_redis_client_success(mock_redis):
-    """Test successful Redis client creation"""
+    """Test Redis client is created from the shared pool without a ping"""
     mock_client = MagicMock()
     mock_redis.return_value = mock_client
-    mock_client.ping.return_value = True
 
-    client = get_redis_client()
+    with patch("app.config.redis_config.redis_breaker", RedisCircuitBreaker()):
+        client = get_redis_client()
 
     assert client is not None
-    mock_client.ping.assert_called_once()
+    mock_client.ping.assert_not_called()
+    assert mock_redis.call_args.kwargs["connection_pool"] is init_redis_pool()
 
 
-@patch("app.config.redis_config.redis.Redis")
-def test_get_redis_client_connection_error(mock_redis):
-    """Test Redis client returns None when connection fails"""
+def test_get_redis_client_breaker_open():
+    """Test Redis client returns None while the circuit breaker is open"""
+    breaker = RedisCircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+
+    with patch("app.config.redis_config.redis_breaker", breaker):
+        client = get_redis_client()
+
+    assert client is None
+
+
+def test_init_redis_pool_is_shared():
+    """Test the connection pool is created once per process"""
+    close_redis_pool()
+    pool = init_redis_pool()
+
+    assert init_redis_pool() is pool
+    close_redis_pool()
+    assert init_redis_pool() is not pool
+    close_redis_pool()
+
+
+def test_circuit_breaker_opens_after_threshold():
+    """Test breaker opens after consecutive failures and closes on success"""
+    breaker = RedisCircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+    breaker.record_failure()
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+    assert breaker.state == RedisCircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == RedisCircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_circuit_breaker_half_open_allows_single_trial():
+    """Test breaker lets one trial request through after the recovery timeout"""
+    breaker = RedisCircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == RedisCircuitBreaker.HALF_OPEN
+    breaker.recovery_timeout = 60
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+
+@pytest.mark.asyncio
+@patch("app.config.redis_config.aioredis.Redis")
+async def test_get_async_redis_client_success(mock_redis):
+    """Test asyncio Redis client is created from the loop's shared pool"""
+    with patch("app.config.redis_config.redis_breaker", RedisCircuitBreaker()):
+        client = get_async_redis_client()
+
+    assert client is not None
+    assert mock_redis.call_args.kwargs["connection_pool"] is init_async_redis_pool()
+    await close_async_redis_pool()
+
+
+@pytest.mark.asyncio
+async def test_init_async_redis_pool_disconnects_replaced_pool():
+    """Test a pool left over from another event loop is disconnected"""
+    old_pool = MagicMock()
+    old_pool.disconnect = AsyncMock()
+
+    with (
+        patch("app.config.redis_config._async_pool", old_pool),
+        patch("app.config.redis_config._async_pool_loop", object()),
+    ):
+        pool = init_async_redis_pool()
+        await asyncio.sleep(0)
+        await close_async_redis_pool()
+
+    assert pool is not old_pool
+    old_pool.disconnect.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("app.config.redis_config.aioredis.Redis")
+async def test_redis_health_monitor_records_failures(mock_redis):
+    """Test background health check opens the breaker when pings fail"""
     mock_client = MagicMock()
     mock_redis.return_value = mock_client
-    mock_client.ping.side_effect = Exception("Connection failed")
+    mock_client.ping = AsyncMock(side_effect=Exception("Connection failed"))
+    breaker = RedisCircuitBreaker(failure_threshold=1, recovery_timeout=60)
 
-    client = get_redis_client()
+    with patch("app.config.redis_config.redis_breaker", breaker):
+        task = asyncio.create_task(redis_health_monitor(interval=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
 
-    assert client is None
+    assert breaker.state == RedisCircuitBreaker.OPEN
@@ -0,0 +1 @@
+# Test jobs package
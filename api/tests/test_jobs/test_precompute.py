@@ -0,0 +1,93 @@
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
+import pytest
+
+from app.config.watchlist_config import WatchlistConfig
+from app.jobs.precompute import (
+    main,
+    precompute_forecasts,
+    seconds_until,
+    watchlist_dates,
+    watchlist_tickers,
+)
+
+
+def make_frame():
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-01-02"]),
+            "Open": [1.0],
+            "High": [1.0],
+            "Low": [1.0],
+            "Close": [1.0],
+            "Adj_Close": [1.0],
+            "Volume": [1],
+        }
+    )
+
+
+def test_watchlist_tickers_from_env_and_file(tmp_path):
+    """Test tickers are merged from both sources without duplicates"""
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text("MSFT\n# comment\n\nGOOGL  # search\nAAPL\n")
+    config = WatchlistConfig()
+    config.tickers = ["AAPL", "TSLA"]
+    config.file = str(watchlist)
+
+    assert watchlist_tickers(config) == ["AAPL", "TSLA", "MSFT", "GOOGL"]
+
+
+def test_watchlist_dates():
+    """Test the default window matches the app page's default range"""
+    today = date(2024, 5, 17)
+
+    assert watchlist_dates(0, today) == ("2023-01-01", "2024-05-17")
+    assert watchlist_dates(30, today) == ("2024-04-17", "2024-05-17")
+
+
+def test_seconds_until_next_run():
+    """Test the scheduler waits for the next occurrence of the UTC time"""
+    now = datetime(2024, 5, 17, 1, 30, tzinfo=timezone.utc)
+
+    assert seconds_until("02:00", now) == 30 * 60
+    assert seconds_until("01:00", now) == 23.5 * 3600
+
+
+@pytest.mark.asyncio
+@patch("app.jobs.precompute.forecast_service.forecast_frame_async")
+@patch("app.jobs.precompute.yf_service.download_frames_async")
+async def test_precompute_forecasts(mock_download, mock_forecast):
+    """Test every ticker with history is forecast into the cache"""
+    mock_download.return_value = {
+        "AAPL": make_frame(),
+        "NOPE": make_frame().iloc[:0],
+        "MSFT": make_frame(),
+    }
+    mock_forecast.side_effect = [pd.DataFrame(), RuntimeError("boom")]
+
+    results = await precompute_forecasts(
+        ["AAPL", "NOPE", "MSFT"], "2024-01-01", "2024-02-01", days=7, cache_ttl=60
+    )
+
+    assert results == {"AAPL": "ok", "NOPE": "no data", "MSFT": "failed: boom"}
+    mock_download.assert_awaited_once()
+    assert mock_forecast.call_args_list[0].args[1] == 7
+    assert mock_forecast.call_args_list[0].kwargs == {
+        "series_id": "AAPL:1d",
+        "cache_ttl": 60,
+    }
+
+
+@patch("app.jobs.precompute._run_once", new_callable=AsyncMock)
+def test_main_uses_cli_tickers(mock_run):
+    """Test CLI tickers replace the watchlist and failures set the exit code"""
+    mock_run.return_value = {"AAPL": "ok", "MSFT": "failed: boom"}
+
+    exit_code = main(["AAPL", "MSFT", "--days", "10", "--lookback-days", "90"])
+
+    config = mock_run.call_args.args[0]
+    assert exit_code == 1
+    assert config.tickers == ["AAPL", "MSFT"]
+    assert (config.forecast_days, config.lookback_days) == (10, 90)
@@ -0,0 +1,103 @@
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.cache_codec import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    CacheFormatError,
+    decode_segment,
+    encode_segment,
+    resolve_compression,
+)
+from app.services.serialization import empty_stock_frame, stock_frame_to_json
+
+
+def make_frame(rows: int = 250) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=rows, freq="D"),
+            "Open": rng.random(rows) * 100,
+            "High": rng.random(rows) * 100,
+            "Low": rng.random(rows) * 100,
+            "Close": rng.random(rows) * 100,
+            "Adj_Close": rng.random(rows) * 100,
+            "Volume": rng.integers(0, 10**9, rows),
+        }
+    )
+
+
+@pytest.mark.parametrize("compression", [COMPRESSION_NONE, COMPRESSION_ZLIB])
+def test_encode_decode_round_trip(compression):
+    """Test frames decode back to identical values"""
+    frame = make_frame()
+
+    decoded, _ = decode_segment(encode_segment(frame, [], compression=compression))
+
+    pd.testing.assert_frame_equal(decoded, frame, check_dtype=False)
+    assert stock_frame_to_json(decoded) == stock_frame_to_json(frame)
+
+
+def test_encode_empty_frame():
+    """Test empty frames survive a round trip"""
+    decoded, _ = decode_segment(encode_segment(empty_stock_frame(), []))
+
+    assert decoded.empty
+
+
+def test_binary_encoding_is_smaller_than_json():
+    """Test the binary payload is much smaller than the JSON rows"""
+    frame = make_frame()
+
+    assert len(encode_segment(frame, [])) < len(stock_frame_to_json(frame)) / 2
+
+
+def test_decode_rejects_foreign_payloads():
+    """Test legacy JSON entries and unknown versions are rejected"""
+    with pytest.raises(CacheFormatError):
+        decode_segment(b'[{"Date": "2024-01-02T00:00:00"}]')
+
+    payload = bytearray(encode_segment(make_frame(3), []))
+    struct.pack_into("<B", payload, 4, 99)
+    with pytest.raises(CacheFormatError):
+        decode_segment(bytes(payload))
+
+
+def test_decode_rejects_truncated_payload():
+    """Test payloads whose size does not match the row count are rejected"""
+    payload = encode_segment(make_frame(3), [], compression=COMPRESSION_NONE)
+
+    with pytest.raises(CacheFormatError):
+        decode_segment(payload[:-8])
+
+
+def test_resolve_compression_falls_back_to_zlib():
+    """Test unknown codec names fall back to zlib"""
+    assert resolve_compression("none") == COMPRESSION_NONE
+    assert resolve_compression("bogus") == COMPRESSION_ZLIB
+
+
+def test_encode_segment_keeps_ranges():
+    """Test covered ranges are stored alongside the bars"""
+    frame = make_frame(3)
+    ranges = [(0, 86400, 5), (172800, 259200, 6)]
+
+    decoded, decoded_ranges = decode_segment(encode_segment(frame, ranges))
+
+    assert decoded_ranges == ranges
+    pd.testing.assert_frame_equal(decoded, frame, check_dtype=False)
+
+
+def test_decode_version_1_payload():
+    """Test payloads written before ranges were stored are still readable"""
+    frame = make_frame(3)
+    payload = encode_segment(frame, [], compression=COMPRESSION_NONE)
+    v1_payload = struct.pack("<4sBBI", b"OHLC", 1, COMPRESSION_NONE, 3) + payload[14:]
+
+    decoded, ranges = decode_segment(v1_payload)
+
+    assert ranges == []
+    pd.testing.assert_frame_equal(decoded, frame, check_dtype=False)
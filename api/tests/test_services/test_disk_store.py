@@ -0,0 +1,122 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.services.disk_store import DiskStore
+
+pytest.importorskip("pyarrow")
+
+DAY = 86400
+# 2024-01-01T00:00:00Z
+JAN_1 = 1704067200
+
+
+def make_frame(days, close=1.0):
+    dates = pd.to_datetime([JAN_1 + day * DAY for day in days], unit="s")
+    return pd.DataFrame(
+        {
+            "Date": dates,
+            "Open": close,
+            "High": close,
+            "Low": close,
+            "Close": close,
+            "Adj_Close": close,
+            "Volume": 10,
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskStore(str(tmp_path), compact_parts=3)
+
+
+def series_files(store, ticker="AAPL", interval="1d"):
+    return sorted(os.listdir(store._series_dir(ticker, interval)))
+
+
+def test_load_missing_series_is_empty(store):
+    segment = store.load("AAPL", "1d")
+
+    assert segment.ranges == []
+    assert segment.data.empty
+
+
+def test_append_and_load_round_trip(store):
+    store.append("AAPL", "1d", make_frame([0, 1]), JAN_1, JAN_1 + 2 * DAY, 5)
+    store.append("AAPL", "1d", make_frame([3]), JAN_1 + 2 * DAY, JAN_1 + 4 * DAY, 6)
+
+    segment = store.load("AAPL", "1d")
+
+    assert segment.ranges == [
+        (JAN_1, JAN_1 + 2 * DAY, 5),
+        (JAN_1 + 2 * DAY, JAN_1 + 4 * DAY, 6),
+    ]
+    assert segment.data["Date"].tolist() == make_frame([0, 1, 3])["Date"].tolist()
+    assert len(series_files(store)) == 2
+
+
+def test_empty_frames_are_not_stored(store):
+    """Test a failed (empty) download leaves nothing on disk to mark it covered"""
+    store.append("AAPL", "1d", make_frame([0]), JAN_1, JAN_1 + DAY, 5)
+    store.append("AAPL", "1d", make_frame([]), JAN_1, JAN_1 + 2 * DAY, 6)
+
+    segment = store.load("AAPL", "1d")
+
+    assert segment.ranges == [(JAN_1, JAN_1 + DAY, 5)]
+    assert len(segment.data) == 1
+    assert len(series_files(store)) == 1
+
+
+def test_later_parts_replace_earlier_bars(store):
+    first, second = make_frame([0, 1], close=1.0), make_frame([1], close=2.0)
+    store.append("AAPL", "1d", first, JAN_1, JAN_1 + 2 * DAY, 5)
+    store.append("AAPL", "1d", second, JAN_1 + DAY, JAN_1 + 2 * DAY, 6)
+
+    segment = store.load("AAPL", "1d")
+
+    assert segment.data["Close"].tolist() == [1.0, 2.0]
+
+
+def test_compaction_folds_parts_into_one_file(store):
+    for day in range(5):
+        start = JAN_1 + day * DAY
+        store.append("AAPL", "1d", make_frame([day]), start, start + DAY, 5)
+
+    files = series_files(store)
+    segment = store.load("AAPL", "1d")
+
+    # Compacted once the fourth part landed, then one more part on top
+    assert len(files) == 2
+    assert files[0].endswith("c.parquet")
+    assert segment.ranges == [(JAN_1, JAN_1 + 5 * DAY, 5)]
+    assert len(segment.data) == 5
+
+
+def test_series_are_kept_apart(store):
+    store.append("^GSPC", "1d", make_frame([0]), JAN_1, JAN_1 + DAY, 5)
+    store.append("^GSPC", "1h", make_frame([1]), JAN_1 + DAY, JAN_1 + 2 * DAY, 5)
+
+    assert len(store.load("^GSPC", "1d").data) == 1
+    assert store.load("^GSPC", "1h").ranges == [(JAN_1 + DAY, JAN_1 + 2 * DAY, 5)]
+    assert store.load("AAPL", "1d").ranges == []
+
+
+@pytest.mark.parametrize("ticker", [".", "..", "../AAPL"])
+def test_dot_names_stay_inside_root(store, tmp_path, ticker):
+    store.append(ticker, "..", make_frame([0]), JAN_1, JAN_1 + DAY, 5)
+
+    series_dir = os.path.realpath(store._series_dir(ticker, ".."))
+    assert os.path.dirname(os.path.dirname(series_dir)) == str(tmp_path)
+    assert len(store.load(ticker, "..").data) == 1
+    assert store.load("AAPL", "1d").ranges == []
+
+
+def test_disabled_without_path():
+    store = DiskStore("")
+
+    store.append("AAPL", "1d", make_frame([0]), JAN_1, JAN_1 + DAY, 5)
+
+    assert not store.enabled
+    assert store.load("AAPL", "1d").ranges == []
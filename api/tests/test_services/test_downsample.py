@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from app.services.downsample import (
+    OHLC,
+    aggregate_bars,
+    downsample_forecast_frame,
+    downsample_stock_frame,
+    lttb_indices,
+)
+
+
+def make_bars(n):
+    close = np.sin(np.arange(n) / 5.0) + 10
+    return pd.DataFrame(
+        {
+            "Date": pd.date_range("2024-01-01", periods=n, freq="min"),
+            "Open": close - 0.1,
+            "High": close + 0.5,
+            "Low": close - 0.5,
+            "Close": close,
+            "Adj_Close": close,
+            "Volume": np.arange(n, dtype=np.int64),
+        }
+    )
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    """Test LTTB keeps the first and last points and an isolated spike"""
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[500] = 100.0
+
+    kept = lttb_indices(x, y, 20)
+
+    assert len(kept) == 20
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 500 in kept
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_returns_everything_when_small():
+    """Test series within max_points are left whole"""
+    kept = lttb_indices(np.arange(5.0), np.ones(5), 10)
+
+    np.testing.assert_array_equal(kept, np.arange(5))
+
+
+def test_aggregate_bars_is_ohlcv_correct():
+    """Test merged bars keep open/close ends, high/low extremes and total volume"""
+    bars = make_bars(10)
+
+    merged = aggregate_bars(bars, 4)
+
+    assert len(merged) == 4
+    first = bars.iloc[:3]
+    assert merged["Date"].iloc[0] == first["Date"].iloc[0]
+    assert merged["Open"].iloc[0] == first["Open"].iloc[0]
+    assert merged["High"].iloc[0] == first["High"].max()
+    assert merged["Low"].iloc[0] == first["Low"].min()
+    assert merged["Close"].iloc[0] == first["Close"].iloc[-1]
+    assert merged["Volume"].sum() == bars["Volume"].sum()
+    assert merged["Close"].iloc[-1] == bars["Close"].iloc[-1]
+
+
+def test_downsample_stock_frame_leaves_input_untouched():
+    """Test downsampling returns a new frame of the requested size"""
+    bars = make_bars(500)
+
+    lttb = downsample_stock_frame(bars, 50)
+    ohlc = downsample_stock_frame(bars, 50, OHLC)
+
+    assert len(lttb) == 50 and len(ohlc) == 50
+    assert list(lttb.columns) == list(bars.columns)
+    assert len(bars) == 500
+    assert downsample_stock_frame(bars, 1000) is bars
+
+
+def test_downsample_forecast_frame():
+    """Test forecasts are thinned by yhat, keeping the last future row"""
+    forecast = pd.DataFrame(
+        {"ds": pd.date_range("2024-01-01", periods=300), "yhat": np.arange(300.0)}
+    )
+
+    thinned = downsample_forecast_frame(forecast, 30)
+
+    assert len(thinned) == 30
+    assert thinned["ds"].iloc[-1] == forecast["ds"].iloc[-1]
@@ -0,0 +1,181 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from app.services.forecast_cache import (
+    _decode_forecast,
+    _encode_forecast,
+    forecast_cache_key,
+    get_cached_forecast,
+    set_cached_forecast,
+)
+from app.services.lru_cache import TTLCache
+
+
+def make_series(closes):
+    return pd.DataFrame(
+        {
+            "ds": pd.date_range("2024-01-01", periods=len(closes), freq="D"),
+            "y": closes,
+        }
+    )
+
+
+def make_forecast():
+    return pd.DataFrame(
+        {
+            "ds": pd.date_range("2024-01-01", periods=3, freq="D"),
+            "yhat": [1.5, 2.25, 3.125],
+            "trend": [1.0, 2.0, 3.0],
+        }
+    )
+
+
+def test_forecast_cache_key_consistency():
+    """Test identical series and params produce the same key"""
+    key1 = forecast_cache_key(make_series([1.0, 2.0, 3.0]), 30)
+    key2 = forecast_cache_key(make_series([1.0, 2.0, 3.0]), 30)
+
+    assert key1 == key2
+    assert key1.startswith("forecast:")
+
+
+def test_forecast_cache_key_changes_with_input():
+    """Test series content, days and params all affect the key"""
+    base = forecast_cache_key(make_series([1.0, 2.0, 3.0]), 30)
+
+    assert forecast_cache_key(make_series([1.0, 2.0, 3.5]), 30) != base
+    assert forecast_cache_key(make_series([1.0, 2.0, 3.0]), 31) != base
+    assert (
+        forecast_cache_key(make_series([1.0, 2.0, 3.0]), 30, {"model": "x"}) != base
+    )
+
+
+def test_forecast_encoding_round_trip():
+    """Test cached forecasts decode back to the original frame"""
+    forecast = make_forecast()
+
+    decoded = _decode_forecast(_encode_forecast(forecast))
+
+    pd.testing.assert_frame_equal(decoded, forecast, check_dtype=False)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test LRU eviction once max_entries is exceeded"""
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    """Test entries are dropped after their TTL"""
+    cache = TTLCache(max_entries=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_cache.get_async_redis_client")
+async def test_cached_forecast_served_from_redis(mock_redis_client):
+    """Test a Redis hit is decoded and promoted to the local LRU"""
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_encode_forecast(make_forecast()))
+    mock_redis_client.return_value = mock_client
+
+    with patch("app.services.forecast_cache._local_cache", TTLCache(4, 60)):
+        first = await get_cached_forecast("forecast:abc")
+        second = await get_cached_forecast("forecast:abc")
+
+    assert first is not None
+    assert second is first
+    mock_client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_cache.get_async_redis_client")
+async def test_set_cached_forecast_writes_with_ttl(mock_redis_client):
+    """Test forecasts are written to Redis with the configured TTL"""
+    mock_client = MagicMock()
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_redis_client.return_value = mock_client
+
+    with patch("app.services.forecast_cache._local_cache", TTLCache(4, 60)):
+        await set_cached_forecast("forecast:abc", make_forecast())
+
+    key, ttl, _ = mock_client.setex.call_args.args
+    assert key == "forecast:abc"
+    assert ttl > 0
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.forecast_engine")
+@patch("app.services.forecast_service.get_cached_forecast")
+async def test_forecast_cache_hit_skips_fit(mock_get_cached, mock_engine):
+    """Test a cached forecast is returned without submitting a fit"""
+    from datetime import datetime
+
+    from app.services.forecast_service import forecast_stock_data_async
+    from app.types.stock_data import StockDataRow
+
+    mock_get_cached.return_value = make_forecast().assign(
+        **{c: 0.0 for c in ("yhat_lower", "yhat_upper")}
+    )
+    stock_data = [
+        StockDataRow(
+            Date=datetime(2024, 1, 1),
+            Open=1.0,
+            High=1.0,
+            Low=1.0,
+            Close=1.0,
+            Adj_Close=1.0,
+            Volume=1,
+        )
+    ]
+
+    with patch("app.services.forecast_service.forecast_frame_to_rows") as mock_rows:
+        await forecast_stock_data_async(stock_data, days=3)
+
+    mock_engine.submit.assert_not_called()
+    mock_rows.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_service.set_cached_forecast", new_callable=AsyncMock)
+@patch("app.services.forecast_service.get_cached_forecast", new_callable=AsyncMock)
+@patch("app.services.forecast_service.forecast_engine")
+async def test_identical_forecasts_share_one_fit(
+    mock_engine, mock_get_cached, mock_set_cached, mock_redis_client
+):
+    """Test concurrent requests for the same forecast submit a single fit"""
+    from app.services.forecast_service import forecast_frame_async
+
+    async def slow_fit(*args):
+        await asyncio.sleep(0.01)
+        return make_forecast()
+
+    mock_get_cached.return_value = None
+    mock_engine.submit = AsyncMock(side_effect=slow_fit)
+    stock_data_df = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", periods=3), "Close": [1.0, 2.0, 3.0]}
+    )
+
+    results = await asyncio.gather(
+        *(forecast_frame_async(stock_data_df, days=3) for _ in range(3))
+    )
+
+    assert all(result is results[0] for result in results)
+    mock_engine.submit.assert_awaited_once()
+    mock_set_cached.assert_awaited_once()
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services.forecast_engine import (
+    ForecastEngine,
+    ForecastQueueFullError,
+    ForecastTimeoutError,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = ForecastEngine(workers=1, max_queue=0, job_timeout=10)
+    yield engine
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_submit_runs_in_worker(engine):
+    """Test jobs run in the process pool and return their result"""
+    result = await engine.submit(pow, 2, 10)
+
+    assert result == 1024
+    assert engine.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_when_queue_full(engine):
+    """Test jobs beyond workers + max_queue are rejected immediately"""
+    running = asyncio.create_task(engine.submit(time.sleep, 0.5))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ForecastQueueFullError):
+        await engine.submit(pow, 2, 10)
+
+    await running
+    assert engine.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_times_out(engine):
+    """Test a timed-out job holds its slot until its worker is done with it"""
+    await engine.submit(pow, 2, 10)
+    engine.job_timeout = 0.2
+
+    with pytest.raises(ForecastTimeoutError):
+        await engine.submit(time.sleep, 1)
+
+    # Still running in the only worker, so nothing else is admitted
+    assert engine.pending == 1
+    with pytest.raises(ForecastQueueFullError):
+        await engine.submit(pow, 2, 10)
+
+    for _ in range(50):
+        if engine.pending == 0:
+            break
+        await asyncio.sleep(0.05)
+    assert engine.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_warm_up_starts_every_worker():
+    """Test warm up runs in a separate, freshly started process per worker"""
+    engine = ForecastEngine(workers=2, max_queue=0, job_timeout=10)
+    try:
+        await engine.warm_up(os.getpid)
+
+        assert len(engine._pool._processes) == 2
+    finally:
+        engine.shutdown()
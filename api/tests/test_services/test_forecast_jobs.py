@@ -0,0 +1,148 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pandas as pd
+import pytest
+
+from app.services.forecast_engine import ForecastQueueFullError
+from app.services.forecast_jobs import (
+    DONE,
+    ERROR,
+    FAILED,
+    FORECAST,
+    HISTORY,
+    PING,
+    STATUS,
+    ForecastJob,
+    ForecastJobs,
+    result_key,
+)
+from app.services.lru_cache import TTLCache
+
+
+def make_stock_frame(n):
+    return pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", periods=n), "Close": range(1, n + 1)}
+    )
+
+
+async def collect(jobs, job, chunk_rows=4, poll_interval=0.01):
+    return [event async for event in jobs.stream(job, chunk_rows, poll_interval)]
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_jobs.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_cache.get_async_redis_client", return_value=None)
+async def test_job_streams_history_then_future_rows(mock_cache_client, mock_client):
+    """Test a job reports its status, then the forecast split into chunks"""
+    jobs = ForecastJobs(max_jobs=4, ttl=60)
+
+    job = await jobs.submit(make_stock_frame(10), 3, model="linear")
+    events = await collect(jobs, job)
+
+    names = [name for name, _ in events]
+    assert names[0] == STATUS
+    assert names[1:-1] == [HISTORY, HISTORY, HISTORY, FORECAST]
+    assert [len(data) for _, data in events[1:-1]] == [4, 4, 2, 3]
+    assert events[-1][1]["status"] == DONE
+    assert events[-1][1]["history_rows"] == 10
+    assert (await jobs.get(job.id)) is job
+    assert len(await jobs.result(job)) == 13
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_jobs.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_jobs.forecast_service.forecast_frame_async")
+async def test_failed_job_ends_with_error(mock_forecast, mock_client):
+    """Test a failing forecast marks the job failed and ends its stream"""
+    mock_forecast.side_effect = RuntimeError("fit diverged")
+    jobs = ForecastJobs(max_jobs=4, ttl=60)
+
+    job = await jobs.submit(make_stock_frame(10), 3)
+    events = await collect(jobs, job)
+
+    assert job.status == FAILED
+    assert events[-1][0] == ERROR
+    assert "fit diverged" in events[-1][1]["detail"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_jobs.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_cache.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_jobs.forecast_service.forecast_frame_async")
+async def test_stream_pings_while_running(
+    mock_forecast, mock_cache_client, mock_client
+):
+    """Test a running job sends keep-alives until it finishes"""
+    release = asyncio.Event()
+    forecast = pd.DataFrame({"ds": pd.date_range("2024-01-01", periods=4)})
+
+    async def slow_forecast(*args, **kwargs):
+        await release.wait()
+        return forecast
+
+    mock_forecast.side_effect = slow_forecast
+    jobs = ForecastJobs(max_jobs=4, ttl=60)
+    job = await jobs.submit(make_stock_frame(3), 1)
+
+    events = []
+    async for event in jobs.stream(job, 10, 0.01):
+        events.append(event)
+        if len(events) == 4:
+            release.set()
+
+    assert [name for name, _ in events[:4]] == [STATUS, STATUS, PING, PING]
+    assert [data["status"] for _, data in events[:2]] == ["queued", "running"]
+    assert events[-1][1]["status"] == DONE
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_jobs.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_jobs.forecast_service.forecast_frame_async")
+async def test_submit_rejects_when_full(mock_forecast, mock_client):
+    """Test jobs beyond max_jobs are rejected while others are still running"""
+    mock_forecast.side_effect = asyncio.Event().wait
+    jobs = ForecastJobs(max_jobs=1, ttl=60)
+    await jobs.submit(make_stock_frame(3), 1)
+
+    with pytest.raises(ForecastQueueFullError):
+        await jobs.submit(make_stock_frame(3), 1)
+
+    jobs.cancel_all()
+
+
+@pytest.mark.asyncio
+async def test_job_from_another_worker_is_read_from_redis():
+    """Test a job unknown to this process is looked up in Redis"""
+    job = ForecastJob("abc", 5, "prophet", status="running")
+    redis_client = AsyncMock()
+    redis_client.get.return_value = json.dumps(job.info()).encode()
+
+    with patch(
+        "app.services.forecast_jobs.get_async_redis_client", return_value=redis_client
+    ):
+        found = await ForecastJobs(max_jobs=1, ttl=60).get("abc")
+
+    redis_client.get.assert_awaited_once_with("forecast_job:abc")
+    assert found.info() == job.info()
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_jobs.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_cache.get_async_redis_client")
+async def test_job_result_skips_local_forecast_cache(mock_cache_client, mock_client):
+    """Test a job result goes to Redis without taking a slot in the LRU"""
+    redis_client = AsyncMock()
+    mock_cache_client.return_value = redis_client
+    jobs = ForecastJobs(max_jobs=4, ttl=60)
+    local_cache = TTLCache(4, 60)
+
+    with patch("app.services.forecast_cache._local_cache", local_cache):
+        job = await jobs.submit(make_stock_frame(10), 3, model="linear")
+        await jobs.wait(job, timeout=5)
+
+    assert job.status == DONE
+    assert len(local_cache) == 0
+    redis_client.setex.assert_awaited_once()
+    assert redis_client.setex.call_args.args[:2] == (result_key(job.id), 60)
@@ -1,11 +1,24 @@
+import json
 import time
+from unittest.mock import AsyncMock, patch
 
+import numpy as np
+import pandas as pd
 import pytest
 from rich.pretty import pprint
 
-from app.services.forecast_service import forecast_stock_data
+from app.services.forecast_service import (
+    STAGE_SECONDS_ATTR,
+    UnknownModelError,
+    _fit_predict_warm,
+    forecast_frame_async,
+    forecast_frames_async,
+    forecast_stock_data,
+)
+from app.services.model_store import model_key
 from app.services.yf_service import download_hist
 from app.types.forecast_data import ForecastRow
+from app.types.stock_data import StockDataRow
 
 
 def get_sample_stock_data():
@@ -59,3 +72,187 @@ async def test_forecast_with_empty_data():
     except Exception:
         # Exception is acceptable for empty data
         assert True
+
+
+def make_series(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "ds": pd.date_range("2024-01-01", periods=n, freq="D"),
+            "y": 100 + np.cumsum(rng.normal(size=n)),
+        }
+    )
+
+
+def test_warm_start_from_previous_fit():
+    """Test a fit seeded from a previous model of the same series"""
+    _, model_json = _fit_predict_warm(make_series(60), 5, None)
+
+    forecast, next_model = _fit_predict_warm(make_series(61), 5, model_json)
+
+    assert len(forecast) == 66
+    assert set(forecast.attrs[STAGE_SECONDS_ATTR]) == {"prophet_fit", "prophet_predict"}
+    assert json.loads(next_model)["history"] != json.loads(model_json)["history"]
+
+
+def test_warm_start_matches_cold_fit():
+    """Test a warm start only speeds the fit up, within the optimizer's tolerance"""
+    series = make_series(130)
+    _, model_json = _fit_predict_warm(series.iloc[:120], 5, None)
+
+    warm, _ = _fit_predict_warm(series, 5, model_json)
+    cold, _ = _fit_predict_warm(series, 5, None)
+
+    tolerance = 0.02 * (series["y"].max() - series["y"].min())
+    assert np.abs(warm["yhat"] - cold["yhat"]).max() < tolerance
+
+
+def test_warm_start_skips_model_of_other_range():
+    """Test a model fitted on a range the series does not extend is not used"""
+    _, model_json = _fit_predict_warm(make_series(80).iloc[20:], 5, None)
+
+    warm, _ = _fit_predict_warm(make_series(60), 5, model_json)
+    cold, _ = _fit_predict_warm(make_series(60), 5, None)
+
+    np.testing.assert_array_equal(warm["yhat"], cold["yhat"])
+
+
+def test_warm_start_falls_back_on_unusable_model():
+    """Test a model that cannot seed the fit is ignored"""
+    forecast, model_json = _fit_predict_warm(make_series(30), 5, "not a model")
+
+    assert len(forecast) == 35
+    assert model_json
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.get_async_redis_client", return_value=None)
+@patch("app.services.forecast_service.set_cached_forecast", new_callable=AsyncMock)
+@patch("app.services.forecast_service.get_cached_forecast", new_callable=AsyncMock)
+@patch("app.services.forecast_service.set_model", new_callable=AsyncMock)
+@patch("app.services.forecast_service.get_model", new_callable=AsyncMock)
+@patch("app.services.forecast_service.forecast_engine")
+async def test_series_forecast_uses_and_updates_model_store(
+    mock_engine,
+    mock_get_model,
+    mock_set_model,
+    mock_get_cached,
+    mock_set_cached,
+    mock_redis_client,
+):
+    """Test a named series is fitted from its stored model and the new one is kept"""
+    forecast = pd.DataFrame({"ds": pd.date_range("2024-01-01", periods=2)})
+    forecast.attrs[STAGE_SECONDS_ATTR] = {"prophet_fit": 0.5}
+    mock_get_cached.return_value = None
+    mock_get_model.return_value = "previous"
+    mock_engine.submit = AsyncMock(return_value=(forecast, "fitted"))
+    stock_data_df = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", periods=3), "Close": [1.0, 2.0, 3.0]}
+    )
+
+    result = await forecast_frame_async(stock_data_df, 3, series_id="AAPL:1d")
+
+    assert result is forecast
+    fn, _, days, previous, include_history = mock_engine.submit.call_args.args
+    assert fn is _fit_predict_warm
+    assert (days, previous, include_history) == (3, "previous", True)
+    key = model_key("AAPL:1d", {"start": "2024-01-01T00:00:00"})
+    mock_get_model.assert_awaited_once_with(key)
+    mock_set_model.assert_awaited_once_with(key, "fitted")
+    # Worker timings are recorded, not cached with the forecast
+    assert STAGE_SECONDS_ATTR not in result.attrs
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.get_cached_forecast", new_callable=AsyncMock)
+@patch("app.services.forecast_service.forecast_engine")
+async def test_linear_forecast_runs_inline(mock_engine, mock_get_cached):
+    """Test the linear model answers in-process, without the engine or cache"""
+    stock_data_df = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", periods=3), "Close": [1.0, 2.0, 3.0]}
+    )
+
+    result = await forecast_frame_async(stock_data_df, 2, model="linear")
+
+    assert len(result) == 5
+    assert result["yhat"].iloc[-1] == pytest.approx(5.0)
+    mock_engine.submit.assert_not_called()
+    mock_get_cached.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unknown_forecast_model():
+    """Test an unregistered model name is rejected"""
+    stock_data_df = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", periods=3), "Close": [1.0, 2.0, 3.0]}
+    )
+
+    with pytest.raises(UnknownModelError):
+        await forecast_frame_async(stock_data_df, 2, model="arima")
+
+
+@pytest.mark.asyncio
+async def test_forecast_many_series_reports_failures_per_series():
+    """Test a batch yields each series' forecast, or the error it raised"""
+    frames = {
+        "UP": pd.DataFrame(
+            {"Date": pd.date_range("2024-01-01", periods=3), "Close": [1.0, 2.0, 3.0]}
+        ),
+        "EMPTY": pd.DataFrame({"Date": [], "Close": []}),
+    }
+
+    results = {
+        name: result
+        async for name, result in forecast_frames_async(frames, 2, model="linear")
+    }
+
+    assert results["UP"]["yhat"].iloc[-1] == pytest.approx(5.0)
+    assert isinstance(results["EMPTY"], Exception)
+
+
+@pytest.mark.asyncio
+@patch("app.services.forecast_service.set_cached_forecast", new_callable=AsyncMock)
+@patch("app.services.forecast_service.get_cached_forecast", new_callable=AsyncMock)
+@patch("app.services.forecast_service.forecast_engine")
+async def test_future_only_forecast(
+    mock_engine, mock_get_cached, mock_set_cached, mock_redis_client
+):
+    """Test future-only forecasts slice a cached full forecast, else skip history"""
+    stock_data_df = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", periods=3), "Close": [1.0, 2.0, 3.0]}
+    )
+    full = pd.DataFrame({"ds": pd.date_range("2024-01-01", periods=5)})
+    mock_get_cached.return_value = full
+
+    result = await forecast_frame_async(stock_data_df, 2, future_only=True)
+
+    assert list(result["ds"]) == list(full["ds"].iloc[3:])
+    mock_engine.submit.assert_not_called()
+
+    future = pd.DataFrame({"ds": pd.date_range("2024-01-04", periods=2)})
+    mock_get_cached.return_value = None
+    mock_engine.submit = AsyncMock(return_value=future)
+
+    result = await forecast_frame_async(stock_data_df, 2, future_only=True)
+
+    assert result is future
+    assert mock_engine.submit.call_args.args[-1] is False
+    # The trimmed forecast is cached apart from the full one
+    full_key, future_key = (call.args[0] for call in mock_get_cached.call_args_list[1:])
+    assert full_key != future_key
+    assert mock_set_cached.call_args.args[0] == future_key
+
+
+def test_linear_forecast_future_only():
+    """Test engines can leave the history rows out"""
+    stock_data = [
+        StockDataRow(
+            Date=date, Open=i, High=i, Low=i, Close=i, Adj_Close=i, Volume=1
+        )
+        for i, date in enumerate(pd.date_range("2024-01-01", periods=10))
+    ]
+
+    rows = forecast_stock_data(stock_data, 3, model="linear", future_only=True)
+
+    assert len(rows) == 3
+    assert rows[0].ds == pd.Timestamp("2024-01-11")
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.linear_forecast import fit_predict_linear
+from app.services.serialization import FORECAST_COLUMNS
+
+
+def make_series(n, slope=0.5, weekly=0.0):
+    ds = pd.date_range("2024-01-01", periods=n, freq="D")
+    t = np.arange(n, dtype=float)
+    y = 10 + slope * t + weekly * np.sin(2 * np.pi * t / 7)
+    return pd.DataFrame({"ds": ds, "y": y})
+
+
+def test_linear_forecast_columns_and_length():
+    """Test the forecast has Prophet's columns for history and future days"""
+    forecast = fit_predict_linear(make_series(30), 5)
+
+    assert set(FORECAST_COLUMNS) <= set(forecast.columns)
+    assert len(forecast) == 35
+    assert forecast["ds"].iloc[-1] == pd.Timestamp("2024-02-04")
+
+
+def test_linear_forecast_recovers_trend_and_seasonality():
+    """Test an exact trend with a weekly cycle is extrapolated exactly"""
+    forecast = fit_predict_linear(make_series(42, slope=0.5, weekly=2.0), 7)
+
+    expected = make_series(49, slope=0.5, weekly=2.0)["y"].to_numpy()
+    np.testing.assert_allclose(forecast["yhat"].to_numpy(), expected, atol=1e-8)
+    assert np.allclose(forecast["yhat_lower"], forecast["yhat"])
+
+
+def test_linear_forecast_band_contains_yhat():
+    """Test the uncertainty band is ordered around noisy data"""
+    series = make_series(60)
+    series["y"] += np.random.default_rng(0).normal(size=60)
+
+    forecast = fit_predict_linear(series, 10)
+
+    assert (forecast["yhat_lower"] < forecast["yhat"]).all()
+    assert (forecast["yhat"] < forecast["yhat_upper"]).all()
+
+
+def test_linear_forecast_empty_series():
+    """Test an empty series is rejected"""
+    with pytest.raises(ValueError):
+        fit_predict_linear(make_series(0), 5)
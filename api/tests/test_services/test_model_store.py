@@ -0,0 +1,46 @@
+import zlib
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.model_store import get_model, model_key, set_model
+
+
+def test_model_key_includes_params():
+    """Test models are kept per series and per parameter set"""
+    assert model_key("AAPL:1d") == "prophet_model:AAPL:1d"
+    assert model_key("AAPL:1d", {"a": 1}) != model_key("AAPL:1d")
+    assert model_key("AAPL:1d", {"a": 1, "b": 2}) == model_key(
+        "AAPL:1d", {"b": 2, "a": 1}
+    )
+
+
+@pytest.mark.asyncio
+@patch("app.services.model_store.get_async_redis_client")
+async def test_model_round_trip(mock_redis_client):
+    """Test a stored model is compressed and read back intact"""
+    mock_client = MagicMock()
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_redis_client.return_value = mock_client
+
+    await set_model("prophet_model:AAPL:1d", '{"model": 1}')
+    key, ttl, payload = mock_client.setex.call_args.args
+    mock_client.get = AsyncMock(return_value=payload)
+
+    assert key == "prophet_model:AAPL:1d"
+    assert ttl > 0
+    assert zlib.decompress(payload) == b'{"model": 1}'
+    assert await get_model(key) == '{"model": 1}'
+
+
+@pytest.mark.asyncio
+@patch("app.services.model_store.get_async_redis_client")
+async def test_get_model_without_redis_or_entry(mock_redis_client):
+    """Test a missing Redis or a missing entry means a cold fit"""
+    mock_redis_client.return_value = None
+    assert await get_model("prophet_model:AAPL:1d") is None
+
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=None)
+    mock_redis_client.return_value = mock_client
+    assert await get_model("prophet_model:AAPL:1d") is None
@@ -0,0 +1,150 @@
+import pandas as pd
+
+from app.services.segment_store import (
+    SeriesSegment,
+    align_to_days,
+    interval_seconds,
+    series_key,
+)
+
+DAY = 86400
+# 2024-01-01T00:00:00Z
+JAN_1 = 1704067200
+
+
+def make_frame(days, close=1.0):
+    dates = pd.to_datetime([JAN_1 + day * DAY for day in days], unit="s")
+    return pd.DataFrame(
+        {
+            "Date": dates,
+            "Open": close,
+            "High": close,
+            "Low": close,
+            "Close": close,
+            "Adj_Close": close,
+            "Volume": 10,
+        }
+    )
+
+
+def test_series_key_per_ticker_and_interval():
+    assert series_key("AAPL", "1d") == "yf_series:AAPL:1d"
+    assert series_key("AAPL", "1d") != series_key("AAPL", "1h")
+
+
+def test_align_to_days():
+    assert align_to_days(JAN_1 + 3600, JAN_1 + 2 * DAY + 5) == (JAN_1, JAN_1 + 2 * DAY)
+
+
+def test_interval_seconds():
+    assert interval_seconds("1m") == 60
+    assert interval_seconds("90m") == 5400
+    assert interval_seconds("1h") == 3600
+    assert interval_seconds("1d") == DAY
+    assert interval_seconds("1wk") == 7 * DAY
+    assert interval_seconds("3mo") == 90 * DAY
+
+
+def test_missing_on_empty_segment():
+    segment = SeriesSegment()
+
+    assert segment.missing(JAN_1, JAN_1 + 5 * DAY) == [(JAN_1, JAN_1 + 5 * DAY)]
+
+
+def test_missing_returns_gaps_around_cached_range():
+    segment = SeriesSegment()
+    segment.add(make_frame([2, 3]), JAN_1 + 2 * DAY, JAN_1 + 4 * DAY, 1)
+
+    assert segment.missing(JAN_1, JAN_1 + 6 * DAY) == [
+        (JAN_1, JAN_1 + 2 * DAY),
+        (JAN_1 + 4 * DAY, JAN_1 + 6 * DAY),
+    ]
+    assert segment.missing(JAN_1 + 2 * DAY, JAN_1 + 4 * DAY) == []
+
+
+def test_add_coalesces_adjacent_ranges_from_same_fetch():
+    segment = SeriesSegment()
+    segment.add(make_frame([0]), JAN_1, JAN_1 + DAY, 1)
+    segment.add(make_frame([1]), JAN_1 + DAY, JAN_1 + 2 * DAY, 1)
+
+    assert segment.ranges == [(JAN_1, JAN_1 + 2 * DAY, 1)]
+    assert len(segment.data) == 2
+
+
+def test_add_replaces_bars_in_refetched_range():
+    segment = SeriesSegment()
+    segment.add(make_frame([0, 1, 2], close=1.0), JAN_1, JAN_1 + 3 * DAY, 1)
+    segment.add(make_frame([1], close=2.0), JAN_1 + DAY, JAN_1 + 2 * DAY, 2)
+
+    assert segment.data["Close"].tolist() == [1.0, 2.0, 1.0]
+    assert segment.ranges == [
+        (JAN_1, JAN_1 + DAY, 1),
+        (JAN_1 + DAY, JAN_1 + 2 * DAY, 2),
+        (JAN_1 + 2 * DAY, JAN_1 + 3 * DAY, 1),
+    ]
+
+
+def test_empty_fetch_still_covers_range():
+    segment = SeriesSegment()
+    segment.add(make_frame([]), JAN_1, JAN_1 + 2 * DAY, 1)
+
+    assert segment.missing(JAN_1, JAN_1 + 2 * DAY) == []
+    assert segment.slice(JAN_1, JAN_1 + 2 * DAY).empty
+
+
+def test_slice_is_end_exclusive():
+    segment = SeriesSegment()
+    segment.add(make_frame([0, 1, 2, 3]), JAN_1, JAN_1 + 4 * DAY, 1)
+
+    sliced = segment.slice(JAN_1 + DAY, JAN_1 + 3 * DAY)
+
+    assert sliced["Date"].tolist() == make_frame([1, 2])["Date"].tolist()
+
+
+def test_encode_decode_round_trip():
+    segment = SeriesSegment()
+    segment.add(make_frame([0, 1]), JAN_1, JAN_1 + 2 * DAY, 7)
+
+    decoded = SeriesSegment.decode(segment.encode())
+
+    assert decoded.ranges == segment.ranges
+    pd.testing.assert_frame_equal(decoded.data, segment.data, check_dtype=False)
+
+
+def test_closed_ranges_never_go_stale():
+    segment = SeriesSegment()
+    # Fetched two days after the range ended
+    segment.add(make_frame([0, 1]), JAN_1, JAN_1 + 2 * DAY, JAN_1 + 4 * DAY)
+
+    assert segment.stale(JAN_1, JAN_1 + 2 * DAY, JAN_1 + 400 * DAY, 60) == []
+
+
+def test_only_the_open_part_of_a_range_goes_stale():
+    segment = SeriesSegment()
+    # Fetched midway through day 4; bars up to day 3 were already final
+    fetched_at = JAN_1 + 4 * DAY + 3600
+    segment.add(make_frame([0, 1, 2, 3, 4]), JAN_1, JAN_1 + 5 * DAY, fetched_at)
+
+    assert segment.stale(JAN_1, JAN_1 + 5 * DAY, fetched_at + 60, 3600) == []
+    assert segment.stale(JAN_1, JAN_1 + 5 * DAY, fetched_at + 7200, 3600) == [
+        (JAN_1 + 3 * DAY, JAN_1 + 5 * DAY)
+    ]
+    # Clipped to the requested range
+    assert segment.stale(JAN_1, JAN_1 + 4 * DAY, fetched_at + 7200, 3600) == [
+        (JAN_1 + 3 * DAY, JAN_1 + 4 * DAY)
+    ]
+
+
+def test_merge_prefers_more_recent_fetches():
+    older = SeriesSegment()
+    older.add(make_frame([0, 1, 2], close=1.0), JAN_1, JAN_1 + 3 * DAY, 1)
+    newer = SeriesSegment()
+    newer.add(make_frame([2, 3], close=2.0), JAN_1 + 2 * DAY, JAN_1 + 4 * DAY, 2)
+
+    merged = newer.merge(older)
+
+    assert merged.data["Close"].tolist() == [1.0, 1.0, 2.0, 2.0]
+    assert merged.ranges == [
+        (JAN_1, JAN_1 + 2 * DAY, 1),
+        (JAN_1 + 2 * DAY, JAN_1 + 4 * DAY, 2),
+    ]
@@ -0,0 +1,164 @@
+import json
+from datetime import datetime
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import TypeAdapter
+
+from app.services.serialization import (
+    FORECAST_COLUMNS,
+    STOCK_COLUMNS,
+    clean_stock_frame,
+    forecast_frame_to_json,
+    forecast_frame_to_rows,
+    frame_to_arrow,
+    frame_to_columnar,
+    frame_to_columnar_json,
+    frame_to_msgpack,
+    stock_frame_to_json,
+    stock_frame_to_rows,
+    stock_frames_to_json,
+    stock_rows_to_frame,
+)
+from app.types.forecast_data import ForecastRow
+from app.types.stock_data import StockDataRow
+
+
+def make_raw_frame():
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]),
+            "Open": [1.0, np.nan, 3.0],
+            "High": [1.5, 2.5, 3.5],
+            "Low": [0.5, 1.5, 2.5],
+            "Close": [1.25, 2.25, 3.25],
+            "Adj_Close": [1.2, 2.2, 3.2],
+            "Volume": [100.0, 200.0, np.nan],
+        }
+    )
+
+
+def test_clean_stock_frame_drops_missing_prices():
+    """Test rows with NaN prices are dropped and NaN volume becomes 0"""
+    cleaned = clean_stock_frame(make_raw_frame())
+
+    assert len(cleaned) == 2
+    assert cleaned["Open"].tolist() == [1.0, 3.0]
+    assert cleaned["Volume"].tolist() == [100, 0]
+    assert cleaned["Volume"].dtype == np.int64
+
+
+def test_clean_stock_frame_drops_timezone():
+    """Test intraday timestamps keep their wall-clock time without a timezone"""
+    raw = make_raw_frame()
+    raw["Date"] = pd.date_range(
+        "2024-01-02 09:30", periods=3, freq="min", tz="America/New_York"
+    )
+
+    cleaned = clean_stock_frame(raw)
+
+    assert cleaned["Date"].dt.tz is None
+    assert cleaned["Date"].iloc[0] == pd.Timestamp("2024-01-02 09:30")
+
+
+def test_stock_frame_to_json_matches_model_serialization():
+    """Test the fast path emits the same JSON as validated models"""
+    cleaned = clean_stock_frame(make_raw_frame())
+    rows = [StockDataRow(**row) for row in cleaned.to_dict("records")]
+
+    expected = TypeAdapter(List[StockDataRow]).dump_json(rows)
+
+    assert stock_frame_to_json(cleaned) == expected
+    assert stock_frame_to_rows(cleaned) == rows
+
+
+def test_stock_frames_to_json_keys_by_ticker():
+    """Test batch JSON maps each ticker to its row list"""
+    cleaned = clean_stock_frame(make_raw_frame())
+    empty = clean_stock_frame(make_raw_frame().iloc[:0])
+
+    decoded = json.loads(stock_frames_to_json({"AAPL": cleaned, "MSFT": empty}))
+
+    assert list(decoded) == ["AAPL", "MSFT"]
+    assert decoded["AAPL"] == json.loads(stock_frame_to_json(cleaned))
+    assert decoded["MSFT"] == []
+
+
+def test_stock_rows_to_frame_round_trip():
+    """Test rows survive a round trip through a frame"""
+    rows = [
+        StockDataRow(
+            Date=datetime(2024, 1, 2),
+            Open=1.0,
+            High=2.0,
+            Low=0.5,
+            Close=1.5,
+            Adj_Close=1.5,
+            Volume=10,
+        )
+    ]
+
+    assert stock_frame_to_rows(stock_rows_to_frame(rows)) == rows
+
+
+def test_forecast_frame_serialization():
+    """Test forecast frames serialize to the ForecastRow shape"""
+    forecast = pd.DataFrame(
+        {
+            "ds": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+            **{col: [1.0, 2.0] for col in FORECAST_COLUMNS if col != "ds"},
+        }
+    )
+
+    payload = json.loads(forecast_frame_to_json(forecast))
+    rows = forecast_frame_to_rows(forecast)
+
+    assert payload[1]["yhat"] == 2.0
+    assert payload[0]["ds"] == "2024-01-02T00:00:00"
+    assert rows[1] == ForecastRow(**payload[1])
+
+
+def test_forecast_frame_missing_columns():
+    """Test forecasts missing a ForecastRow field are rejected"""
+    forecast = pd.DataFrame({"ds": pd.to_datetime(["2024-01-02"]), "yhat": [1.0]})
+
+    try:
+        forecast_frame_to_json(forecast)
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        assert "missing" in str(e)
+
+
+def test_frame_to_columnar_json():
+    """Test columnar layout carries each field name once"""
+    cleaned = clean_stock_frame(make_raw_frame())
+
+    payload = json.loads(frame_to_columnar_json(cleaned, STOCK_COLUMNS, "Date"))
+
+    assert payload["columns"] == STOCK_COLUMNS
+    assert payload["data"][0] == ["2024-01-02T00:00:00", "2024-01-04T00:00:00"]
+    assert payload["data"][STOCK_COLUMNS.index("Close")] == [1.25, 3.25]
+
+
+def test_frame_to_msgpack_round_trip():
+    """Test msgpack encoding carries the columnar layout"""
+    msgpack = pytest.importorskip("msgpack")
+    cleaned = clean_stock_frame(make_raw_frame())
+
+    payload = msgpack.unpackb(frame_to_msgpack(cleaned, STOCK_COLUMNS, "Date"))
+
+    assert payload == frame_to_columnar(cleaned, STOCK_COLUMNS, "Date")
+
+
+def test_frame_to_arrow_round_trip():
+    """Test Arrow IPC streams decode back to typed columns"""
+    pa = pytest.importorskip("pyarrow")
+    cleaned = clean_stock_frame(make_raw_frame())
+
+    table = pa.ipc.open_stream(frame_to_arrow(cleaned, STOCK_COLUMNS)).read_all()
+
+    assert table.column_names == STOCK_COLUMNS
+    assert table.column("Volume").type == pa.int64()
+    assert table.column("Close").to_pylist() == [1.25, 3.25]
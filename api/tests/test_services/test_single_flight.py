@@ -0,0 +1,134 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis
+
+from app.services.single_flight import RedisLock, SingleFlight, lock_key
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_call():
+    """Test concurrent calls for a key run the function once"""
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(*(flights.run("k", fetch, 1) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert calls == [1]
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_keys_are_independent():
+    """Test different keys do not share results"""
+    flights = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(
+        flights.run("a", fetch, 1), flights.run("b", fetch, 2)
+    )
+
+    assert results == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors_and_retries():
+    """Test every waiter sees the error and a later call runs again"""
+    flights = SingleFlight()
+    fetch = AsyncMock(side_effect=[ValueError("boom"), "ok"])
+
+    results = await asyncio.gather(
+        flights.run("k", fetch), flights.run("k", fetch), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert await flights.run("k", fetch) == "ok"
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_caller():
+    """Test cancelling the first caller does not cancel the shared call"""
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flights.run("k", fetch))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(flights.run("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+
+
+def make_client(set_results):
+    client = MagicMock()
+    client.set = AsyncMock(side_effect=set_results)
+    client.eval = AsyncMock(return_value=1)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_acquire_and_release():
+    """Test the lock is taken with NX/PX and released with its token"""
+    client = make_client([True])
+
+    async with RedisLock(client, "yf_series:AAPL:1d", lease=5) as lock:
+        assert lock.acquired
+        assert not lock.contended
+
+    key, token = client.set.call_args.args
+    assert key == lock_key("yf_series:AAPL:1d")
+    assert client.set.call_args.kwargs == {"nx": True, "px": 5000}
+    assert client.eval.call_args.args[-2:] == (key, token)
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_waits_for_holder():
+    """Test a held lock is waited on and reported as contended"""
+    client = make_client([None, None, True])
+
+    async with RedisLock(client, "k", lease=5, poll_interval=0.001) as lock:
+        assert lock.acquired
+        assert lock.contended
+
+    assert client.set.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_gives_up_after_wait():
+    """Test the block still runs, unlocked, once the wait runs out"""
+    client = MagicMock()
+    client.set = AsyncMock(return_value=None)
+    client.eval = AsyncMock()
+
+    async with RedisLock(client, "k", lease=5, wait=0.01, poll_interval=0.001) as lock:
+        assert not lock.acquired
+        assert lock.contended
+
+    client.eval.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_without_redis():
+    """Test the lock is a no-op when Redis is unavailable"""
+    async with RedisLock(None, "k", lease=5) as lock:
+        assert not lock.acquired
+
+    client = make_client(redis.ConnectionError("down"))
+    async with RedisLock(client, "k", lease=5) as lock:
+        assert not lock.acquired
+    client.eval.assert_not_called()
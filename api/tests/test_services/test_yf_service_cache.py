@@ -1,25 +1,52 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+import os
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.services.yf_service import _generate_cache_key
+import pandas as pd
+import pytest
+from prometheus_client import REGISTRY
 
+from app.services.segment_store import SeriesSegment
+from app.services.serialization import stock_frame_to_rows, stock_rows_to_frame
+from app.types.stock_data import StockDataRow
 
-def test_generate_cache_key_consistency():
-    """Test cache key is consistent for same params"""
-    key1 = _generate_cache_key("AAPL", 1640995200, 1672531200, "1d")
-    key2 = _generate_cache_key("AAPL", 1640995200, 1672531200, "1d")
 
-    assert key1 == key2
-    assert key1.startswith("yf_data:")
+# Fetched after every range used below had closed, so none of it goes stale
+CLOSED_AT = 1672704000
+
+
+def make_frame(days) -> pd.DataFrame:
+    return stock_rows_to_frame([make_row(day) for day in days])
+
+
+def make_row(day: int) -> StockDataRow:
+    return StockDataRow(
+        Date=datetime(2022, 1, day),
+        Open=100.0,
+        High=110.0,
+        Low=90.0,
+        Close=105.0,
+        Adj_Close=105.0,
+        Volume=1000,
+    )
+
+
+def cache_requests(result: str, interval: str = "1d") -> float:
+    """Current value of the stock cache counter for one result"""
+    labels = {"interval": interval, "result": result}
+    return REGISTRY.get_sample_value("stock_cache_requests_total", labels) or 0.0
 
 
 @patch("app.services.yf_service.get_redis_client")
-@patch("app.services.yf_service._fetch_from_yfinance")
+@patch("app.services.yf_service._download_frame")
 def test_download_hist_no_redis(mock_fetch, mock_redis_client):
     """Test fallback when Redis unavailable"""
     from app.services.yf_service import download_hist
 
     mock_redis_client.return_value = None
-    mock_fetch.return_value = []
+    mock_fetch.return_value = make_frame([])
 
     result = download_hist("AAPL", 1640995200, 1672531200, "1d")
 
@@ -28,7 +55,7 @@ def test_download_hist_no_redis(mock_fetch, mock_redis_client):
 
 
 @patch("app.services.yf_service.get_redis_client")
-@patch("app.services.yf_service._fetch_from_yfinance")
+@patch("app.services.yf_service._download_frame")
 def test_download_hist_cache_miss(mock_fetch, mock_redis_client):
     """Test behavior on cache miss"""
     from app.services.yf_service import download_hist
@@ -36,10 +63,590 @@ def test_download_hist_cache_miss(mock_fetch, mock_redis_client):
     mock_client = MagicMock()
     mock_redis_client.return_value = mock_client
     mock_client.get.return_value = None
-    mock_fetch.return_value = []
+    mock_fetch.return_value = make_frame([])
 
     result = download_hist("AAPL", 1640995200, 1672531200, "1d")
 
     assert result == []
     mock_client.get.assert_called_once()
     mock_fetch.assert_called_once()
+
+
+@patch("app.services.yf_service.get_redis_client", return_value=None)
+@patch("app.services.yf_service._download_frame")
+def test_download_hist_treats_corrupt_disk_part_as_miss(
+    mock_fetch, mock_redis_client, isolated_disk_store
+):
+    """Test an unreadable part file falls through to yfinance"""
+    from app.services.yf_service import download_hist
+
+    pytest.importorskip("pyarrow")
+    isolated_disk_store.append(
+        "AAPL", "1d", make_frame([3]), 1640995200, 1672531200, CLOSED_AT
+    )
+    series_dir = isolated_disk_store._series_dir("AAPL", "1d")
+    for name in os.listdir(series_dir):
+        with open(os.path.join(series_dir, name), "wb") as part:
+            part.write(b"not parquet")
+    mock_fetch.return_value = make_frame([3])
+
+    result = download_hist("AAPL", 1640995200, 1672531200, "1d")
+
+    assert result == [make_row(3)]
+    mock_fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_download_frame_async_cache_hit(mock_fetch, mock_redis_client):
+    """Test cached rows are served without calling yfinance"""
+    from app.services.yf_service import _segment_to_cache, download_frame_async
+
+    segment = SeriesSegment()
+    segment.add(make_frame([3]), 1640995200, 1672531200, CLOSED_AT)
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_redis_client.return_value = mock_client
+    hits = cache_requests("hit")
+
+    result = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    assert stock_frame_to_rows(result) == [make_row(3)]
+    mock_fetch.assert_not_called()
+    assert cache_requests("hit") == hits + 1
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_download_frame_async_cache_miss(mock_fetch, mock_redis_client):
+    """Test a miss is fetched off the loop and caches the result"""
+    from app.services.yf_service import download_frame_async
+
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=None)
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_client.set = AsyncMock(return_value=True)
+    mock_client.eval = AsyncMock(return_value=1)
+    mock_redis_client.return_value = mock_client
+    mock_fetch.return_value = make_frame([3, 4])
+
+    result = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    assert len(result) == 2
+    mock_fetch.assert_called_once_with("AAPL", 1640995200, 1672531200, "1d")
+    cached = SeriesSegment.decode(mock_client.setex.call_args.args[2])
+    assert cached.data["Date"].iloc[0] == pd.Timestamp("2022-01-03")
+    assert cached.missing(1640995200, 1672531200) == []
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_download_frame_async_no_redis(mock_fetch, mock_redis_client):
+    """Test yfinance is used when Redis is unavailable"""
+    from app.services.yf_service import download_frame_async
+
+    mock_redis_client.return_value = None
+    mock_fetch.return_value = make_frame([])
+
+    result = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    assert result.empty
+    mock_fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_download_frame_async_serves_sub_range(mock_fetch, mock_redis_client):
+    """Test a range inside a cached one is served without any download"""
+    from app.services.yf_service import _segment_to_cache, download_frame_async
+
+    segment = SeriesSegment()
+    segment.add(make_frame([3, 4, 5, 6]), 1640995200, 1641427200, CLOSED_AT)
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_redis_client.return_value = mock_client
+
+    # 2022-01-04 .. 2022-01-06
+    result = await download_frame_async("AAPL", 1641254400, 1641427200, "1d")
+
+    assert result["Date"].dt.day.tolist() == [4, 5]
+    mock_fetch.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_download_frame_async_fetches_only_gap(mock_fetch, mock_redis_client):
+    """Test a partially cached range only downloads the uncovered part"""
+    from app.services.yf_service import _segment_to_cache, download_frame_async
+
+    # 2022-01-03 .. 2022-01-05 cached
+    segment = SeriesSegment()
+    segment.add(make_frame([3, 4]), 1641168000, 1641340800, CLOSED_AT)
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_client.set = AsyncMock(return_value=True)
+    mock_client.eval = AsyncMock(return_value=1)
+    mock_redis_client.return_value = mock_client
+    mock_fetch.return_value = make_frame([5, 6])
+
+    # 2022-01-03 .. 2022-01-07
+    result = await download_frame_async("AAPL", 1641168000, 1641513600, "1d")
+
+    assert result["Date"].dt.day.tolist() == [3, 4, 5, 6]
+    mock_fetch.assert_called_once_with("AAPL", 1641340800, 1641513600, "1d")
+    cached = SeriesSegment.decode(mock_client.setex.call_args.args[2])
+    assert cached.missing(1641168000, 1641513600) == []
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client", return_value=None)
+@patch("app.services.yf_service._download_frame")
+async def test_empty_download_is_retried(
+    mock_fetch, mock_redis_client, isolated_disk_store
+):
+    """Test a download that came back empty is not recorded as covered"""
+    from app.services.yf_service import download_frame_async
+
+    pytest.importorskip("pyarrow")
+    # yfinance returns an empty frame on network errors and rate limits
+    mock_fetch.side_effect = [make_frame([]), make_frame([3])]
+
+    first = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+    second = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    assert first.empty
+    assert len(second) == 1
+    assert mock_fetch.call_count == 2
+    assert len(isolated_disk_store.load("AAPL", "1d").data) == 1
+
+
+@patch("app.services.yf_service.get_redis_client", return_value=None)
+@patch("app.services.yf_service._download_frame")
+def test_download_hist_retries_empty_download(mock_fetch, mock_redis_client):
+    """Test the sync path also retries a range that came back empty"""
+    from app.services.yf_service import download_hist
+
+    mock_fetch.side_effect = [make_frame([]), make_frame([3])]
+
+    first = download_hist("AAPL", 1640995200, 1672531200, "1d")
+    second = download_hist("AAPL", 1640995200, 1672531200, "1d")
+
+    assert first == []
+    assert second == [make_row(3)]
+    assert mock_fetch.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_concurrent_misses_share_one_download(mock_fetch, mock_redis_client):
+    """Test concurrent requests for the same range download it once"""
+    from app.services.yf_service import download_frame_async
+
+    mock_redis_client.return_value = None
+    mock_fetch.side_effect = lambda *args: (time.sleep(0.05), make_frame([3]))[1]
+
+    results = await asyncio.gather(
+        *(download_frame_async("AAPL", 1640995200, 1672531200, "1d") for _ in range(4))
+    )
+
+    assert all(len(result) == 1 for result in results)
+    mock_fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_contended_miss_uses_other_workers_fill(mock_fetch, mock_redis_client):
+    """Test waiting on another worker's lock re-reads the cache instead of fetching"""
+    from app.services.yf_service import _segment_to_cache, download_frame_async
+
+    segment = SeriesSegment()
+    segment.add(make_frame([3]), 1640995200, 1672531200, CLOSED_AT)
+    mock_client = MagicMock()
+    # Empty on the first read, filled by the lock holder by the second
+    mock_client.get = AsyncMock(side_effect=[None, _segment_to_cache(segment)])
+    mock_client.set = AsyncMock(side_effect=[None, True])
+    mock_client.eval = AsyncMock(return_value=1)
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_redis_client.return_value = mock_client
+
+    with patch("app.services.yf_service.cache_config.lock_poll_interval", 0.001):
+        result = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    assert len(result) == 1
+    mock_fetch.assert_not_called()
+    mock_client.setex.assert_not_called()
+
+
+def test_download_frames_splits_grouped_result():
+    """Test a grouped multi-ticker download is split into one frame per ticker"""
+    from app.services.yf_service import _download_frames
+
+    index = pd.DatetimeIndex(["2022-01-03", "2022-01-04"], name="Date")
+    fields = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+    columns = pd.MultiIndex.from_product([["AAPL", "MSFT"], fields])
+    data = pd.DataFrame(1.0, index=index, columns=columns)
+    # MSFT has no bar on the 4th
+    data.loc["2022-01-04", "MSFT"] = float("nan")
+
+    with patch("yfinance.download", return_value=data):
+        frames = _download_frames(["AAPL", "MSFT", "NOPE"], 0, 86400, "1d")
+
+    assert len(frames["AAPL"]) == 2
+    assert len(frames["MSFT"]) == 1
+    assert frames["NOPE"].empty
+    assert list(frames["AAPL"].columns) == list(make_frame([3]).columns)
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frames")
+async def test_download_frames_async_fetches_misses_together(
+    mock_fetch, mock_redis_client
+):
+    """Test cached tickers come from one MGET and misses from one download"""
+    from app.services.yf_service import _segment_to_cache, download_frames_async
+
+    cached = SeriesSegment()
+    cached.add(make_frame([3]), 1640995200, 1672531200, CLOSED_AT)
+    mock_client = MagicMock()
+    mock_client.mget = AsyncMock(return_value=[_segment_to_cache(cached), None, None])
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True])
+    mock_client.pipeline.return_value = pipe
+    mock_redis_client.return_value = mock_client
+    mock_fetch.return_value = {"MSFT": make_frame([4]), "NOPE": make_frame([])}
+
+    frames = await download_frames_async(
+        ["AAPL", "MSFT", "NOPE", "AAPL"], 1640995200, 1672531200, "1d"
+    )
+
+    assert list(frames) == ["AAPL", "MSFT", "NOPE"]
+    assert len(frames["AAPL"]) == 1
+    assert len(frames["MSFT"]) == 1
+    assert frames["NOPE"].empty
+    mock_client.mget.assert_awaited_once()
+    mock_fetch.assert_called_once_with(["MSFT", "NOPE"], 1640995200, 1672531200, "1d")
+    # Only tickers with data are written back
+    assert pipe.setex.call_count == 1
+    assert pipe.setex.call_args.args[0] == "yf_series:MSFT:1d"
+
+
+# 2022-01-01 .. 2022-02-01, of which AAPL has 2022-01-03 .. 2022-01-05 cached
+JAN_START, JAN_END = 1640995200, 1643673600
+AAPL_START, AAPL_END = 1641168000, 1641340800
+
+
+def batch_client(cached_segments):
+    """A Redis mock whose MGET returns these segments (None for a miss)"""
+    from app.services.yf_service import _segment_to_cache
+
+    mock_client = MagicMock()
+    mock_client.mget = AsyncMock(
+        return_value=[
+            None if segment is None else _segment_to_cache(segment)
+            for segment in cached_segments
+        ]
+    )
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[True])
+    mock_client.pipeline.return_value = pipe
+    return mock_client, pipe
+
+
+def cached_aapl() -> SeriesSegment:
+    segment = SeriesSegment()
+    segment.add(make_frame([3, 4]), AAPL_START, AAPL_END, CLOSED_AT)
+    return segment
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frames")
+async def test_download_frames_async_keeps_tickers_missing_upstream(
+    mock_fetch, mock_redis_client
+):
+    """Test a ticker the grouped download left out keeps its cached bars"""
+    from app.services.yf_service import download_frames_async
+
+    mock_client, pipe = batch_client([cached_aapl(), None])
+    mock_redis_client.return_value = mock_client
+    mock_fetch.return_value = {"MSFT": make_frame([4, 10])}
+
+    frames = await download_frames_async(["AAPL", "MSFT"], JAN_START, JAN_END, "1d")
+
+    assert frames["AAPL"]["Date"].dt.day.tolist() == [3, 4]
+    assert len(frames["MSFT"]) == 2
+    # AAPL is neither marked covered nor rewritten, so it is fetched again
+    assert [call.args[0] for call in pipe.setex.call_args_list] == ["yf_series:MSFT:1d"]
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frames")
+async def test_download_frames_async_records_only_own_gaps(
+    mock_fetch, mock_redis_client
+):
+    """Test bars downloaded outside a ticker's own gaps do not replace cached ones"""
+    from app.services.yf_service import download_frames_async
+
+    mock_client, pipe = batch_client([cached_aapl(), None])
+    mock_redis_client.return_value = mock_client
+    # Refetched over the union span: the 3rd is re-reported at another close
+    aapl = make_frame([3, 10]).assign(Close=[200.0, 106.0])
+    mock_fetch.return_value = {"AAPL": aapl, "MSFT": make_frame([4])}
+
+    frames = await download_frames_async(["AAPL", "MSFT"], JAN_START, JAN_END, "1d")
+
+    assert frames["AAPL"]["Close"].tolist() == [105.0, 105.0, 106.0]
+    cached = SeriesSegment.decode(pipe.setex.call_args_list[0].args[2])
+    assert cached.missing(JAN_START, JAN_END) == []
+    assert (AAPL_START, AAPL_END, CLOSED_AT) in cached.ranges
+
+
+# Yesterday and today (UTC), a range whose bars can still change
+OPEN_START = int(time.time()) // 86400 * 86400 - 86400
+OPEN_END = OPEN_START + 2 * 86400
+
+
+def open_segment(fetched_at, close=105.0):
+    """A segment holding yesterday's bar, fetched at fetched_at"""
+    frame = make_frame([3]).assign(
+        Date=pd.to_datetime([OPEN_START], unit="s"), Close=close
+    )
+    segment = SeriesSegment()
+    segment.add(frame, OPEN_START, OPEN_END, fetched_at)
+    return segment
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service._schedule_refresh")
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_stale_range_served_and_refreshed_in_background(
+    mock_fetch, mock_redis_client, mock_schedule
+):
+    """Test bars past their TTL are returned at once and refreshed later"""
+    from app.services.yf_service import _segment_to_cache, download_frame_async
+
+    segment = open_segment(int(time.time()) - 3 * 3600)
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_redis_client.return_value = mock_client
+    stale = cache_requests("stale")
+
+    result = await download_frame_async("AAPL", OPEN_START, OPEN_END, "1d")
+
+    assert len(result) == 1
+    mock_fetch.assert_not_called()
+    mock_schedule.assert_called_once_with("AAPL", OPEN_START, OPEN_END, "1d")
+    assert cache_requests("stale") == stale + 1
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service._schedule_refresh")
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_fresh_open_range_is_a_plain_hit(
+    mock_fetch, mock_redis_client, mock_schedule
+):
+    """Test open bars within the interval's TTL are neither fetched nor refreshed"""
+    from app.services.yf_service import _segment_to_cache, download_frame_async
+
+    segment = open_segment(int(time.time()))
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_redis_client.return_value = mock_client
+
+    await download_frame_async("AAPL", OPEN_START, OPEN_END, "1d")
+
+    mock_fetch.assert_not_called()
+    mock_schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_too_stale_range_is_fetched_before_responding(
+    mock_fetch, mock_redis_client
+):
+    """Test bars older than CACHE_MAX_STALE are downloaded on the request path"""
+    from app.services.yf_service import _segment_to_cache, download_frame_async
+
+    segment = open_segment(int(time.time()) - 2 * 86400)
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_client.set = AsyncMock(return_value=True)
+    mock_client.eval = AsyncMock(return_value=1)
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_redis_client.return_value = mock_client
+    mock_fetch.return_value = open_segment(0, close=200.0).data
+
+    result = await download_frame_async("AAPL", OPEN_START, OPEN_END, "1d")
+
+    assert result["Close"].tolist() == [200.0]
+    mock_fetch.assert_called_once_with("AAPL", OPEN_START, OPEN_END, "1d")
+    ttl = mock_client.setex.call_args.args[1]
+    assert ttl > 24 * 3600
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_background_refresh_updates_cache(mock_fetch, mock_redis_client):
+    """Test a background refresh re-downloads stale bars and stores them"""
+    from app.services.yf_service import _refresh_segment_async, _segment_to_cache
+
+    segment = open_segment(int(time.time()) - 3 * 3600)
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_client.set = AsyncMock(return_value=True)
+    mock_client.eval = AsyncMock(return_value=1)
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_redis_client.return_value = mock_client
+    mock_fetch.return_value = open_segment(0, close=200.0).data
+
+    await _refresh_segment_async("AAPL", OPEN_START, OPEN_END, "1d")
+
+    mock_fetch.assert_called_once()
+    cached = SeriesSegment.decode(mock_client.setex.call_args.args[2])
+    assert cached.data["Close"].tolist() == [200.0]
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_empty_refresh_keeps_cached_bars(mock_fetch, mock_redis_client):
+    """Test a refresh that downloads nothing leaves the cached bars alone"""
+    from app.services.yf_service import _refresh_segment_async, _segment_to_cache
+
+    segment = open_segment(int(time.time()) - 3 * 3600)
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=_segment_to_cache(segment))
+    mock_client.set = AsyncMock(return_value=True)
+    mock_client.eval = AsyncMock(return_value=1)
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_redis_client.return_value = mock_client
+    mock_fetch.return_value = make_frame([])
+
+    await _refresh_segment_async("AAPL", OPEN_START, OPEN_END, "1d")
+
+    mock_fetch.assert_called_once()
+    cached = SeriesSegment.decode(mock_client.setex.call_args.args[2])
+    assert cached.data["Close"].tolist() == [105.0]
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client", return_value=None)
+@patch("app.services.yf_service._download_frame")
+async def test_background_refresh_without_redis_updates_disk(
+    mock_fetch, mock_redis_client, isolated_disk_store
+):
+    """Test stale bars served from disk are refreshed while Redis is down"""
+    from app.services.yf_service import _refresh_segment_async
+
+    pytest.importorskip("pyarrow")
+    stale = open_segment(int(time.time()) - 3 * 3600)
+    isolated_disk_store.append(
+        "AAPL", "1d", stale.data, OPEN_START, OPEN_END, stale.ranges[0][2]
+    )
+    mock_fetch.return_value = open_segment(0, close=200.0).data
+
+    await _refresh_segment_async("AAPL", OPEN_START, OPEN_END, "1d")
+
+    mock_fetch.assert_called_once()
+    assert isolated_disk_store.load("AAPL", "1d").data["Close"].tolist() == [200.0]
+
+
+def test_open_range_ttl_follows_interval():
+    """Test open bars expire after about one bar, within the configured bounds"""
+    from app.services.yf_service import open_range_ttl
+
+    assert open_range_ttl("1m") == 60
+    assert open_range_ttl("5m") == 300
+    assert open_range_ttl("1d") == 3600
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client")
+@patch("app.services.yf_service._download_frame")
+async def test_disk_store_serves_redis_miss(
+    mock_fetch, mock_redis_client, isolated_disk_store
+):
+    """Test bars kept on disk are served and written back to Redis"""
+    from app.services.yf_service import download_frame_async
+
+    pytest.importorskip("pyarrow")
+    isolated_disk_store.append(
+        "AAPL", "1d", make_frame([3]), 1640995200, 1672531200, CLOSED_AT
+    )
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(return_value=None)
+    mock_client.setex = AsyncMock(return_value=True)
+    mock_redis_client.return_value = mock_client
+
+    result = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    assert len(result) == 1
+    mock_fetch.assert_not_called()
+    cached = SeriesSegment.decode(mock_client.setex.call_args.args[2])
+    assert cached.missing(1640995200, 1672531200) == []
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client", return_value=None)
+@patch("app.services.yf_service._download_frame")
+async def test_downloads_are_appended_to_disk(
+    mock_fetch, mock_redis_client, isolated_disk_store
+):
+    """Test fetched ranges land in the disk store"""
+    from app.services.yf_service import download_frame_async
+
+    pytest.importorskip("pyarrow")
+    mock_fetch.return_value = make_frame([3])
+
+    await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    stored = isolated_disk_store.load("AAPL", "1d")
+    assert stored.missing(1640995200, 1672531200) == []
+    assert len(stored.data) == 1
+
+
+@patch("app.services.yf_service.get_redis_client", return_value=None)
+@patch("app.services.yf_service._download_frame")
+def test_download_hist_survives_disk_write_error(
+    mock_fetch, mock_redis_client, isolated_disk_store
+):
+    """Test a failing disk append still returns the downloaded bars"""
+    from app.services.yf_service import download_hist
+
+    mock_fetch.return_value = make_frame([3])
+
+    with patch.object(isolated_disk_store, "append", side_effect=OSError("full")):
+        result = download_hist("AAPL", 1640995200, 1672531200, "1d")
+
+    assert result == [make_row(3)]
+
+
+@pytest.mark.asyncio
+@patch("app.services.yf_service.get_async_redis_client", return_value=None)
+@patch("app.services.yf_service._download_frame")
+async def test_download_frame_async_survives_disk_write_error(
+    mock_fetch, mock_redis_client, isolated_disk_store
+):
+    """Test a failing disk append still returns the downloaded bars"""
+    from app.services.yf_service import download_frame_async
+
+    mock_fetch.return_value = make_frame([3])
+
+    with patch.object(isolated_disk_store, "append", side_effect=OSError("full")):
+        result = await download_frame_async("AAPL", 1640995200, 1672531200, "1d")
+
+    assert stock_frame_to_rows(result) == [make_row(3)]
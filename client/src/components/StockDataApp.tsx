@@ -10,7 +10,7 @@ import { Accordion, AccordionContent, AccordionItem, AccordionTrigger } from "@/
 import { Calendar } from "@/components/ui/calendar";
 import { Popover, PopoverContent, PopoverTrigger } from "@/components/ui/popover";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { fetchStockData, fetchForecast, type StockDataRow, type ForecastRow } from "@/lib/api";
+import { fetchStockData, fetchTickerForecast, type StockDataRow, type ForecastRow } from "@/lib/api";
 import { cn } from "@/lib/utils";
 import { Navbar } from "./Navbar";
 import { Hero } from "./Hero";
@@ -32,6 +32,13 @@ export function StockDataApp() {
   const [endDate, setEndDate] = useState<Date | undefined>(new Date());
   const [interval, setInterval] = useState("1d");
   const [stockData, setStockData] = useState<StockDataRow[]>([]);
+  // Parameters of the last successful fetch; the forecast must cover the same series
+  const [fetchedParams, setFetchedParams] = useState<{
+    ticker: string;
+    startDate: string;
+    endDate: string;
+    interval: string;
+  } | null>(null);
   const [forecastData, setForecastData] = useState<ForecastRow[]>([]);
   const [forecastPeriod, setForecastPeriod] = useState(30);
   const [loading, setLoading] = useState(false);
@@ -58,16 +65,18 @@ export function StockDataApp() {
       const endDateStr = format(endDate, "yyyy-MM-dd");
       const data = await fetchStockData(ticker, startDateStr, endDateStr, interval);
       setStockData(data);
+      setFetchedParams({ ticker, startDate: startDateStr, endDate: endDateStr, interval });
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to fetch stock data");
       setStockData([]);
+      setFetchedParams(null);
     } finally {
       setLoading(false);
     }
   };
 
   const handleForecast = async () => {
-    if (stockData.length === 0) {
+    if (stockData.length === 0 || !fetchedParams) {
       setError("Please fetch stock data first");
       return;
     }
@@ -76,7 +85,13 @@ export function StockDataApp() {
     setError(null);
 
     try {
-      const forecast = await fetchForecast(stockData, forecastPeriod);
+      const forecast = await fetchTickerForecast(
+        fetchedParams.ticker,
+        fetchedParams.startDate,
+        fetchedParams.endDate,
+        fetchedParams.interval,
+        forecastPeriod
+      );
       setForecastData(forecast);
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to fetch forecast");
@@ -57,11 +57,17 @@ export interface ForecastRequest {
   days?: number;
 }
 
+export type Resample = "lttb" | "ohlc";
+
+// maxPoints asks the server to downsample to at most that many bars, for
+// charting long intraday ranges; leave it unset when every bar is needed
 export async function fetchStockData(
   ticker: string,
   startDate: string,
   endDate: string,
-  interval: string = "1d"
+  interval: string = "1d",
+  maxPoints?: number,
+  resample: Resample = "lttb"
 ): Promise<StockDataRow[]> {
   const apiUrl = await getApiUrl();
   const params = new URLSearchParams({
@@ -70,6 +76,10 @@ export async function fetchStockData(
     end_date: endDate,
     interval,
   });
+  if (maxPoints !== undefined) {
+    params.set("max_points", String(maxPoints));
+    params.set("resample", resample);
+  }
 
   const response = await fetch(`${apiUrl}/api/stocks?${params}`);
 
@@ -83,9 +93,39 @@ export async function fetchStockData(
   return response.json();
 }
 
+export async function fetchStockBatch(
+  tickers: string[],
+  startDate: string,
+  endDate: string,
+  interval: string = "1d"
+): Promise<Record<string, StockDataRow[]>> {
+  const apiUrl = await getApiUrl();
+  const response = await fetch(`${apiUrl}/api/stocks/batch`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      tickers,
+      start_date: startDate,
+      end_date: endDate,
+      interval,
+    }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`Failed to fetch stock data: ${response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export type ForecastModel = "prophet" | "linear";
+
 export async function fetchForecast(
   stockData: StockDataRow[],
-  days: number = 30
+  days: number = 30,
+  model: ForecastModel = "prophet"
 ): Promise<ForecastRow[]> {
   const apiUrl = await getApiUrl();
   const response = await fetch(`${apiUrl}/api/forecast`, {
@@ -96,6 +136,7 @@ export async function fetchForecast(
     body: JSON.stringify({
       stock_data: stockData,
       days,
+      model,
     }),
   });
 
@@ -106,3 +147,180 @@ export async function fetchForecast(
   return response.json();
 }
 
+
+// futureOnly drops the rows fitted to the history; fields trims every row to
+// those fields (plus ds), so the returned rows only carry what was asked for
+export async function fetchTickerForecast(
+  ticker: string,
+  startDate: string,
+  endDate: string,
+  interval: string = "1d",
+  days: number = 30,
+  model: ForecastModel = "prophet",
+  maxPoints?: number,
+  futureOnly: boolean = false,
+  fields?: (keyof ForecastRow)[]
+): Promise<ForecastRow[]> {
+  const apiUrl = await getApiUrl();
+  const params = new URLSearchParams({
+    start_date: startDate,
+    end_date: endDate,
+    interval,
+    days: String(days),
+    model,
+  });
+  if (maxPoints !== undefined) {
+    params.set("max_points", String(maxPoints));
+  }
+  if (futureOnly) {
+    params.set("future_only", "true");
+  }
+  if (fields?.length) {
+    params.set("fields", fields.join(","));
+  }
+
+  const response = await fetch(
+    `${apiUrl}/api/forecast/${encodeURIComponent(ticker)}?${params}`
+  );
+
+  if (!response.ok) {
+    throw new Error(`Failed to fetch forecast: ${response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export interface ForecastBatchResult {
+  ticker: string;
+  forecast?: ForecastRow[];
+  status?: number;
+  error?: string;
+}
+
+// Forecast many tickers (and/or uploaded series) in one request, calling
+// onResult for each as it finishes; failed tickers carry an error instead
+export async function fetchForecastBatch(
+  request: {
+    tickers?: string[];
+    startDate?: string;
+    endDate?: string;
+    interval?: string;
+    series?: Record<string, StockDataRow[]>;
+    days?: number;
+    model?: ForecastModel;
+    futureOnly?: boolean;
+    fields?: (keyof ForecastRow)[];
+  },
+  onResult?: (result: ForecastBatchResult) => void
+): Promise<Record<string, ForecastBatchResult>> {
+  const apiUrl = await getApiUrl();
+  const response = await fetch(`${apiUrl}/api/forecast/batch`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      tickers: request.tickers ?? [],
+      start_date: request.startDate,
+      end_date: request.endDate,
+      interval: request.interval ?? "1d",
+      series: request.series ?? {},
+      days: request.days ?? 30,
+      model: request.model ?? "prophet",
+      future_only: request.futureOnly ?? false,
+      fields: request.fields,
+    }),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`Failed to fetch forecasts: ${response.statusText}`);
+  }
+
+  const results: Record<string, ForecastBatchResult> = {};
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffered = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += value ?? "";
+    const lines = buffered.split("\n");
+    buffered = done ? "" : lines.pop() ?? "";
+    for (const line of lines) {
+      if (!line) continue;
+      const result: ForecastBatchResult = JSON.parse(line);
+      results[result.ticker] = result;
+      onResult?.(result);
+    }
+    if (done) return results;
+  }
+}
+
+export interface ForecastJob {
+  job_id: string;
+  status: "queued" | "running" | "done" | "failed";
+  model: string;
+  days: number;
+  history_rows: number | null;
+  error: string | null;
+  created_at: number;
+  finished_at: number | null;
+}
+
+export async function createForecastJob(
+  stockData: StockDataRow[],
+  days: number = 30,
+  model: ForecastModel = "prophet"
+): Promise<ForecastJob> {
+  const apiUrl = await getApiUrl();
+  const response = await fetch(`${apiUrl}/api/forecast/jobs`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      stock_data: stockData,
+      days,
+      model,
+    }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`Failed to start forecast: ${response.statusText}`);
+  }
+
+  return response.json();
+}
+
+// Stream a job's forecast, calling onRows as each chunk arrives; resolves
+// with every row once the job is done
+export async function streamForecastJob(
+  jobId: string,
+  onRows?: (rows: ForecastRow[], future: boolean) => void
+): Promise<ForecastRow[]> {
+  const apiUrl = await getApiUrl();
+  const source = new EventSource(
+    `${apiUrl}/api/forecast/jobs/${encodeURIComponent(jobId)}/stream`
+  );
+  const forecast: ForecastRow[] = [];
+
+  return new Promise((resolve, reject) => {
+    const onChunk = (future: boolean) => (event: MessageEvent) => {
+      const rows: ForecastRow[] = JSON.parse(event.data);
+      forecast.push(...rows);
+      onRows?.(rows, future);
+    };
+    source.addEventListener("history", onChunk(false));
+    source.addEventListener("forecast", onChunk(true));
+    source.addEventListener("status", (event) => {
+      const job: ForecastJob = JSON.parse((event as MessageEvent).data);
+      if (job.status === "done") {
+        source.close();
+        resolve(forecast);
+      }
+    });
+    source.addEventListener("error", (event) => {
+      source.close();
+      const data = (event as MessageEvent).data;
+      reject(new Error(data ? JSON.parse(data).detail : "Forecast stream failed"));
+    });
+  });
+}